@@ -1,47 +1,84 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pydirectinput
 import threading
-import tkinter as tk
-import ttkbootstrap as ttkb
-from ttkbootstrap.constants import *
-from tkinter import messagebox
-from PIL import Image, ImageTk
+from PIL import Image
 import time
 import platform
 import logging
 import os
+import sys
 import queue
+import argparse
+import json
+import glob
+import math
+import asyncio
+import struct
+import socket
+from collections import deque
+from multiprocessing import shared_memory
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import tkinter as tk
+    import ttkbootstrap as ttkb
+    from ttkbootstrap.constants import *
+    from tkinter import messagebox
+    from PIL import ImageTk
+    TK_AVAILABLE = True
+except ImportError:
+    tk = ttkb = messagebox = ImageTk = None
+    TK_AVAILABLE = False
+
+try:
+    import pydirectinput
+    PYDIRECTINPUT_AVAILABLE = True
+except Exception:
+    pydirectinput = None
+    PYDIRECTINPUT_AVAILABLE = False
+
+try:
+    from evdev import UInput, ecodes as evdev_ecodes
+    EVDEV_AVAILABLE = True
+except Exception:
+    UInput = evdev_ecodes = None
+    EVDEV_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
 
 if platform.system() == "Windows":
     try:
         from pygrabber.dshow_graph import FilterGraph
         PYGRABBER_AVAILABLE = True
-        logging.info("pygrabber gefunden. Versuche, Kameranamen via DirectShow zu lesen.")
     except ImportError:
         PYGRABBER_AVAILABLE = False
-        logging.warning("pygrabber nicht gefunden (pip install pygrabber). Fallback auf generische Kameranamen.")
 else:
     PYGRABBER_AVAILABLE = False
-    logging.info("Nicht-Windows-System erkannt. Verwende generische Kameranamen.")
 
 mp_face_mesh = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
-face_mesh = None
 
 log_dir = os.path.dirname(os.path.abspath(__file__))
 log_file = os.path.join(log_dir, "eye_tracker_log.txt")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, mode='w', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logging.info("--- Eye Tracker Application Started ---")
+
+
+def setup_logging(path=log_file):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s',
+        handlers=[
+            logging.FileHandler(path, mode='w', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    logging.info("--- Eye Tracker Application Started ---")
 
 DEFAULT_EAR_CLOSE = 0.17
 DEFAULT_EAR_OPEN = 0.22
@@ -49,16 +86,361 @@ DEFAULT_CAM_WIDTH = 320
 DEFAULT_CAM_HEIGHT = 240
 DEFAULT_CAM_FPS = 30
 DEFAULT_PROCESS_INTERVAL = 1
+DEFAULT_CPU_BUDGET_PERCENT = 35
+DEFAULT_INFERENCE_WIDTH = 0
+DEFAULT_MAX_FACES = 1
 PREVIEW_UPDATE_DELAY_MS = 33
+PREVIEW_IDLE_DELAY_MS = 250
+PREVIEW_MAX_DISPLAY_FPS = 60
+STATUS_UPDATE_DELAY_MS = 100
+KEY_PULSE_MS = 50
+BLINK_MIN_CLOSED_MS = 50
+BLINK_MIN_OPEN_MS = 50
+BLINK_DEBOUNCE_MS = 0
+PREDICT_HORIZON_MS = 40
+PREDICT_MIN_VELOCITY = 3.0
+PREDICT_CONFIRM_MS = 80
+PREDICT_CONFIRM_MAX_MS = 240
+PREDICT_MAX_GAP_MS = 200
+ACTUATOR_KEYS = ('x', 'c')
+CAMERA_WATCH_INTERVAL_S = 1.0
+CAMERA_WATCH_PROBE_INTERVAL_S = 10.0
+CAMERA_WATCH_MAX_INDEX = 5
+CAMERA_WATCH_PROBE_RETRIES = 3
+CAMERA_EVENT_POLL_MS = 500
+RECONNECT_MAX_FAILURES = 10
+RECONNECT_FRAME_TIMEOUT_S = 1.0
+RECONNECT_READ_RETRY_S = 0.05
+RECONNECT_BACKOFF_INITIAL_S = 0.1
+RECONNECT_BACKOFF_MAX_S = 5.0
+V4L2_DEVICE_GLOB = "/dev/video*"
+CAPTURE_CMD_STOP = 'stop'
+CAPTURE_CMD_CONFIGURE = 'configure'
+THREAD_JOIN_TIMEOUT_S = 3.5
+CLOSE_JOIN_TIMEOUT_S = 5.0
+UI_STALL_PROBE_MS = 20
+UI_STALL_HISTORY = 1000
+PACER_REPORT_INTERVAL_S = 30.0
+SETTINGS_FILE = os.path.join(log_dir, "eyetracker_settings.json")
+SETTINGS_WATCH_INTERVAL_S = 0.5
+DEFAULT_PROFILE_NAME = 'standard'
+DEFAULT_KEY_MAPPING = {'x': 'x', 'c': 'c'}
+
+LIFECYCLE_IDLE = 'idle'
+LIFECYCLE_PREVIEW = 'preview'
+LIFECYCLE_STARTING = 'starting'
+LIFECYCLE_TRACKING = 'tracking'
+LIFECYCLE_STOPPING = 'stopping'
+LIFECYCLE_CLOSING = 'closing'
+LIFECYCLE_CLOSED = 'closed'
+LIFECYCLE_CMD_START_PREVIEW = 'start_preview'
+LIFECYCLE_CMD_STOP_PREVIEW = 'stop_preview'
+LIFECYCLE_CMD_SWITCH_CAMERA = 'switch_camera'
+LIFECYCLE_CMD_START_TRACKING = 'start_tracking'
+LIFECYCLE_CMD_STOP_TRACKING = 'stop_tracking'
+LIFECYCLE_CMD_CONFIGURE = 'configure'
+LIFECYCLE_CMD_CLOSE = 'close'
+
+OVERLAY_DETAIL_MINIMAL = 0
+OVERLAY_DETAIL_REDUCED = 1
+OVERLAY_DETAIL_FULL = 2
+
+MJPEG_DEFAULT_PORT = 8765
+MJPEG_MAX_FPS = 15
+MJPEG_JPEG_QUALITY = 70
+MJPEG_BOUNDARY = b"eyetrackerframe"
+MJPEG_INDEX_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>LockdownEyeProtocol Stream</title></head>
+<body style="margin:0;background:#222;display:flex;justify-content:center;align-items:center;height:100vh">
+<img src="/stream" style="max-width:100%;max-height:100%" alt="Stream">
+</body></html>
+"""
+
+RECORD_DIR = os.path.join(log_dir, "recordings")
+RECORD_FPS = 15
+RECORD_FOURCC = 'mp4v'
+RECORD_EXTENSION = '.mp4'
+RECORD_QUEUE_SIZE = 8
+RECORD_REPLAY_JPEG_QUALITY = 80
+RECORD_REPLAY_DEFAULT_S = 30
+RECORD_DROP_LOG_INTERVAL_S = 10.0
+ENGINE_EVENT_QUEUE_SIZE = 256
+ENGINE_EVENT_STATE = 'state'
+ENGINE_EVENT_FACE_FOUND = 'face_found'
+ENGINE_EVENT_FACE_LOST = 'face_lost'
+ENGINE_EVENT_EYE_CLOSED = 'eye_closed'
+ENGINE_EVENT_EYE_OPENED = 'eye_opened'
+ENGINE_EVENT_KEY_DOWN = 'key_down'
+ENGINE_EVENT_KEY_UP = 'key_up'
+ENGINE_EVENT_CAMERA_FAILED = 'camera_failed'
+ENGINE_EVENT_CAMERA_LOST = 'camera_lost'
+ENGINE_EVENT_CAMERA_RESTORED = 'camera_restored'
+ENGINE_EVENT_STOPPED = 'stopped'
+ENGINE_EVENT_CLOSED = 'closed'
+PUBLISH_SHM_NAME = "lockdown_eyetracker"
+PUBLISH_UDP_PORT = 9110
+PUBLISH_RING_SLOTS = 256
+PUBLISH_MAGIC = b"LEYE"
+PUBLISH_VERSION = 1
+PUBLISH_MAX_POINTS = 14
+# Ring-Kopf: Magic, Version, Slot-Größe, Slot-Anzahl, zuletzt veröffentlichte Sequenznummer
+PUBLISH_HEADER = struct.Struct('<4sIIIQ')
+PUBLISH_HEADER_SIZE = 64
+PUBLISH_LATEST_OFFSET = 16
+# Prozess-ID des Schreibers direkt hinter dem Kopf, 0 = unbekannt
+PUBLISH_OWNER = struct.Struct('<I')
+PUBLISH_OWNER_OFFSET = PUBLISH_HEADER.size
+# Datensatz: Sequenz, t_monotonic, t_unix, EAR links/rechts, Flags, Anzahl Punkte, Frame-Breite/-Höhe; danach Punkte als float32 x/y
+PUBLISH_RECORD = struct.Struct('<QddffBBHH')
+PUBLISH_SLOT_SIZE = (PUBLISH_RECORD.size + PUBLISH_MAX_POINTS * 8 + 7) // 8 * 8
+PUBLISH_FLAGS = ('face_detected', 'left_closed', 'right_closed', 'both_closed', 'x_key_down', 'c_key_down')
+_SEQ = struct.Struct('<Q')
+METRICS_DEFAULT_PORT = 9108
+METRICS_SNAPSHOT_INTERVAL_S = 15.0
+METRICS_WINDOW = 512
+
+GOVERNOR_EVAL_INTERVAL_S = 2.0
+GOVERNOR_RELAX_FACTOR = 0.6
+GOVERNOR_MIN_WIDTH = 160
+GOVERNOR_SEARCH_DELAY_S = 1.0
+GOVERNOR_SEARCH_WIDTH = 320
+GOVERNOR_SEARCH_HEIGHT = 240
+GOVERNOR_SEARCH_PROCESS_FPS = 5.0
+# (Auflösungsfaktor, Intervall-Zuschlag, Overlay-Detail, Vorschau jedes n-te Frame)
+GOVERNOR_LEVELS = (
+    (1.0, 0, OVERLAY_DETAIL_FULL, 1),
+    (1.0, 1, OVERLAY_DETAIL_REDUCED, 1),
+    (1.0, 1, OVERLAY_DETAIL_REDUCED, 2),
+    (0.75, 2, OVERLAY_DETAIL_MINIMAL, 2),
+    (0.5, 3, OVERLAY_DETAIL_MINIMAL, 3),
+)
+
+CAPABILITY_TIME_LIMIT_S = 4.0
+CAPABILITY_RESOLUTIONS = ((320, 240), (640, 480), (960, 540), (1280, 720))
+CAPABILITY_FPS = (30, 15)
+CAPABILITY_INTERVALS = (1, 2, 3)
+CAPABILITY_WARMUP_FRAMES = 2
+CAPABILITY_FRAMES = 15
+CAPABILITY_MIN_FRAMES = 3
+CAPABILITY_FRAME_BUDGET = 0.5
 
 GUI_PREVIEW_WIDTH = 640
 GUI_PREVIEW_HEIGHT = 480
 GUI_MIN_HEIGHT_NO_PREVIEW = 320
 GUI_PREVIEW_FRAME_BUFFER = 45
+SPARKLINE_CAPACITY = 1024
+SPARKLINE_WINDOW_S = 6.0
+SPARKLINE_MAX_FPS = 20
+SPARKLINE_HEIGHT = 64
+SPARKLINE_EAR_MAX = 0.45
+SPARKLINE_MAX_POINTS = 200
 
 LEFT_EAR_IDX = [362, 385, 387, 263, 373, 380]
 RIGHT_EAR_IDX= [33, 160, 158, 133, 153, 144]
 
+MIRROR_VIEW = True
+MIRRORED_LEFT_EAR_IDX = RIGHT_EAR_IDX
+MIRRORED_RIGHT_EAR_IDX = LEFT_EAR_IDX
+
+FACE_POLICY_LARGEST = 'largest'
+FACE_POLICY_CENTER = 'center'
+FACE_POLICY_LOCKED = 'locked'
+FACE_POLICIES = (FACE_POLICY_LARGEST, FACE_POLICY_CENTER, FACE_POLICY_LOCKED)
+FACE_MATCH_MAX_DIST = 1.5
+FACE_TRACK_TTL_S = 1.0
+
+RIGHT_IRIS_CENTER_IDX = 468
+LEFT_IRIS_CENTER_IDX = 473
+GAZE_MODE_OFF = 'off'
+GAZE_MODE_CURSOR = 'cursor'
+GAZE_MODE_KEYS = 'keys'
+GAZE_MODES = (GAZE_MODE_OFF, GAZE_MODE_CURSOR, GAZE_MODE_KEYS)
+GAZE_CALIBRATION_FRAMES = 15
+GAZE_SMOOTHING_S = 0.12
+GAZE_CURSOR_GAIN = 2.5
+GAZE_VERTICAL_GAIN = 2.0
+GAZE_KEY_ON = 0.35
+GAZE_KEY_OFF = 0.2
+GAZE_DIRECTION_KEYS = {'left': 'left', 'right': 'right', 'up': 'up', 'down': 'down'}
+BLINK_CLICK_BUTTONS = {'x': 'left', 'c': 'right'}
+
+FLOW_PATCH_MARGIN = 0.6
+FLOW_PATCH_MIN_MARGIN_PX = 6
+FLOW_WIN_SIZE = (15, 15)
+FLOW_MAX_LEVEL = 3
+FLOW_MAX_WIDTH_CHANGE = 0.25
+FLOW_CRITERIA = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+
+def eye_index_sets(mirrored=MIRROR_VIEW):
+    if mirrored: return MIRRORED_LEFT_EAR_IDX, MIRRORED_RIGHT_EAR_IDX
+    return LEFT_EAR_IDX, RIGHT_EAR_IDX
+
+def landmarks_to_pixels(landmarks, indices, w, h, mirrored=MIRROR_VIEW):
+    pts = np.array([(landmarks[idx].x, landmarks[idx].y) for idx in indices], dtype=np.float32)
+    if mirrored: pts[:, 0] = 1.0 - pts[:, 0]
+    pts[:, 0] *= w; pts[:, 1] *= h
+    return pts
+
+def iris_index_pair(mirrored=MIRROR_VIEW):
+    if mirrored: return RIGHT_IRIS_CENTER_IDX, LEFT_IRIS_CENTER_IDX
+    return LEFT_IRIS_CENTER_IDX, RIGHT_IRIS_CENTER_IDX
+
+def faces_eye_points(multi_face_landmarks, w, h, mirrored=MIRROR_VIEW, with_iris=False):
+    left_idx, right_idx = eye_index_sets(mirrored)
+    if with_iris:
+        left_iris, right_iris = iris_index_pair(mirrored)
+        indices = left_idx + [left_iris] + right_idx + [right_iris]
+    else:
+        indices = left_idx + right_idx
+    raw = np.array([[(lm[i].x, lm[i].y) for i in indices] for lm in (face.landmark for face in multi_face_landmarks)], dtype=np.float32)
+    raw = raw.reshape(len(multi_face_landmarks), 2, len(indices) // 2, 2)
+    if mirrored: raw[..., 0] = 1.0 - raw[..., 0]
+    raw[..., 0] *= w; raw[..., 1] *= h
+    return raw
+
+EAR_PAIR_A = np.array([1, 2, 0])
+EAR_PAIR_B = np.array([5, 4, 3])
+
+def batch_calculate_ear(eye_points):
+    d = eye_points[..., EAR_PAIR_A, :] - eye_points[..., EAR_PAIR_B, :]
+    lengths = np.sqrt((d * d).sum(axis=-1))
+    horizontal = lengths[..., 2]
+    ear = np.zeros(horizontal.shape, dtype=np.float64)
+    np.divide(lengths[..., 0] + lengths[..., 1], 2.0 * horizontal, out=ear, where=horizontal >= 1e-6)
+    return ear
+
+def gaze_offsets(eye_points):
+    a, b, iris = eye_points[..., 0, :], eye_points[..., 3, :], eye_points[..., 6, :]
+    axis = b - a
+    length = np.sqrt((axis * axis).sum(axis=-1))
+    safe_length = np.where(length < 1e-6, 1.0, length)
+    u = axis / safe_length[..., None]
+    u *= np.where(u[..., :1] < 0, -1.0, 1.0)
+    rel = iris - (a + b) * 0.5
+    half = safe_length * 0.5
+    ox = (rel[..., 0] * u[..., 0] + rel[..., 1] * u[..., 1]) / half
+    oy = (rel[..., 1] * u[..., 0] - rel[..., 0] * u[..., 1]) / half
+    return np.stack((ox, oy), axis=-1).mean(axis=-2)
+
+class EyeFlowTracker:
+    def __init__(self, mirrored=MIRROR_VIEW):
+        self.mirrored = mirrored
+        self._patches = None
+        self.points = None
+        self.propagated = self.lost = 0
+
+    @property
+    def active(self):
+        return self._patches is not None
+
+    def reset(self):
+        self._patches = None; self.points = None
+
+    def _mirror(self, points, w):
+        points = points.astype(np.float32, copy=True)
+        if self.mirrored: points[..., 0] = w - points[..., 0]
+        return points
+
+    def _crop(self, frame, points):
+        patches = []
+        h, w = frame.shape[:2]
+        for eye in points:
+            (x0, y0), (x1, y1) = eye.min(axis=0), eye.max(axis=0)
+            margin = max(FLOW_PATCH_MIN_MARGIN_PX, (x1 - x0) * FLOW_PATCH_MARGIN)
+            ox, oy = max(0, int(x0 - margin)), max(0, int(y0 - margin))
+            ex, ey = min(w, int(x1 + margin) + 1), min(h, int(y1 + margin) + 1)
+            if ex - ox < 4 or ey - oy < 4: return None
+            patches.append(((ox, oy, ex, ey), cv2.cvtColor(frame[oy:ey, ox:ex], cv2.COLOR_BGR2GRAY)))
+        return patches
+
+    @staticmethod
+    def _widths(points):
+        return np.sqrt(((points[:, 0] - points[:, 3]) ** 2).sum(axis=-1))
+
+    def anchor(self, frame, eye_points):
+        self.points = self._mirror(eye_points, frame.shape[1])
+        self._anchor_widths = self._widths(self.points)
+        self._patches = self._crop(frame, self.points)
+
+    def propagate(self, frame):
+        if self._patches is None: return None
+        tracked = np.empty_like(self.points)
+        for i, ((ox, oy, ex, ey), prev) in enumerate(self._patches):
+            cur = cv2.cvtColor(frame[oy:ey, ox:ex], cv2.COLOR_BGR2GRAY)
+            if cur.shape != prev.shape:
+                self.lost += 1; self.reset(); return None
+            offset = np.array((ox, oy), dtype=np.float32)
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, cur, (self.points[i] - offset).reshape(-1, 1, 2), None,
+                                                          winSize=FLOW_WIN_SIZE, maxLevel=FLOW_MAX_LEVEL, criteria=FLOW_CRITERIA)
+            if moved is None or not status.all():
+                self.lost += 1; self.reset(); return None
+            tracked[i] = moved.reshape(-1, 2) + offset
+        # Augenwinkel bewegen sich beim Blinzeln kaum: weicht die Augenbreite ab, ist der Fluss abgedriftet
+        if (np.abs(self._widths(tracked) / np.maximum(self._anchor_widths, 1e-6) - 1.0) > FLOW_MAX_WIDTH_CHANGE).any():
+            self.lost += 1; self.reset(); return None
+        self.propagated += 1
+        self.points = tracked
+        self._patches = self._crop(frame, tracked)
+        return self._mirror(tracked, frame.shape[1])
+
+def mirror_for_display(frame):
+    return cv2.flip(frame, 1) if MIRROR_VIEW else frame
+
+def prepare_preview_image(frame, target_w, target_h):
+    h_in, w_in = frame.shape[:2]
+    scale = min(target_w / w_in, target_h / h_in, 1.0)
+    new_w, new_h = int(w_in * scale), int(h_in * scale)
+    if new_w <= 0 or new_h <= 0: return None
+    resized_frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    resized_frame = mirror_for_display(resized_frame)
+    return Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
+
+class InferenceScaler:
+    def __init__(self, width=DEFAULT_INFERENCE_WIDTH):
+        self.width = int(width)
+        self._buffers = {}
+
+    def target_size(self, w, h):
+        if self.width <= 0 or self.width >= w: return w, h
+        return self.width, max(1, int(round(self.width * h / w)))
+
+    def _buffer(self, key, w, h):
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape[:2] != (h, w): buf = self._buffers[key] = np.empty((h, w, 3), dtype=np.uint8)
+        buf.flags.writeable = True
+        return buf
+
+    def prepare(self, frame):
+        # Halbieren mit INTER_AREA (schneller Pfad) glättet Sensorrauschen, der Rest (< 2x) linear
+        tw, th = self.target_size(frame.shape[1], frame.shape[0])
+        level = 0
+        while frame.shape[1] >= 2 * tw:
+            hw, hh = frame.shape[1] // 2, frame.shape[0] // 2
+            frame = cv2.resize(frame, (hw, hh), dst=self._buffer(level, hw, hh), interpolation=cv2.INTER_AREA); level += 1
+        if frame.shape[:2] != (th, tw):
+            frame = cv2.resize(frame, (tw, th), dst=self._buffer('scaled', tw, th), interpolation=cv2.INTER_LINEAR)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._buffer('rgb', tw, th))
+        rgb.flags.writeable = False
+        return rgb
+
+def draw_face_overlay(image, face_landmarks, detail=OVERLAY_DETAIL_FULL):
+    if detail >= OVERLAY_DETAIL_FULL:
+        mp_drawing.draw_landmarks(image=image, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_TESSELATION, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style())
+    if detail >= OVERLAY_DETAIL_REDUCED:
+        mp_drawing.draw_landmarks(image=image, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_CONTOURS, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style())
+    else:
+        mp_drawing.draw_landmarks(image=image, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_LEFT_EYE | mp_face_mesh.FACEMESH_RIGHT_EYE, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style())
+    mp_drawing.draw_landmarks(image=image, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_IRISES, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style())
+
+def draw_other_faces(image, eye_points, selected_index):
+    w = image.shape[1]
+    for i, points in enumerate(eye_points):
+        if i == selected_index: continue
+        x0, y0 = points.reshape(-1, 2).min(axis=0); x1, y1 = points.reshape(-1, 2).max(axis=0)
+        if MIRROR_VIEW: x0, x1 = w - x1, w - x0
+        pad = (x1 - x0) * 0.25
+        cv2.rectangle(image, (int(x0 - pad), int(y0 - pad)), (int(x1 + pad), int(y1 + pad * 2)), (128, 128, 128), 1)
+
 def calculate_ear(eye_landmarks_pixels):
     try:
         p1, p2, p3, p4, p5, p6 = eye_landmarks_pixels
@@ -70,39 +452,1697 @@ def calculate_ear(eye_landmarks_pixels):
     except (IndexError, ValueError, TypeError):
         return 0.0
 
-def get_directshow_camera_names():
+class FramePacer:
+    def __init__(self, fps, name="Pacer", follow_source=False, min_fps=1.0, max_fps=PREVIEW_MAX_DISPLAY_FPS, window=90):
+        self.name = name
+        self.follow_source = follow_source
+        self.min_fps, self.max_fps = min_fps, max_fps
+        self.period = 1.0 / self._clamp_fps(fps)
+        self._next_deadline = None
+        self._last_tick = None
+        self._last_arrival = None
+        self._tick_intervals = deque(maxlen=window)
+        self._arrival_intervals = deque(maxlen=window)
+        self._last_report = time.monotonic()
+
+    def _clamp_fps(self, fps):
+        try: fps = float(fps)
+        except (TypeError, ValueError): fps = self.max_fps
+        return min(max(fps, self.min_fps), self.max_fps)
+
+    def set_fps(self, fps):
+        self.period = 1.0 / self._clamp_fps(fps)
+        self._next_deadline = None
+
+    def reset(self):
+        self._next_deadline = None; self._last_tick = None; self._last_arrival = None
+        self._tick_intervals.clear(); self._arrival_intervals.clear()
+
+    def observe_arrival(self, t=None):
+        t = time.monotonic() if t is None else t
+        if self._last_arrival is not None:
+            self._arrival_intervals.append(t - self._last_arrival)
+        self._last_arrival = t
+
+    def source_fps(self):
+        intervals = list(self._arrival_intervals)
+        if len(intervals) < 5: return None
+        median = float(np.median(intervals))
+        return 1.0 / median if median > 1e-6 else None
+
+    def _effective_period(self):
+        if self.follow_source:
+            fps = self.source_fps()
+            if fps is not None: return 1.0 / self._clamp_fps(fps)
+        return self.period
+
+    def next_delay(self, now=None):
+        now = time.monotonic() if now is None else now
+        period = self._effective_period()
+        if self._next_deadline is None or now - self._next_deadline > period:
+            self._next_deadline = now
+        delay = max(0.0, self._next_deadline - now)
+        self._next_deadline += period
+        return delay
+
+    def wait(self, should_continue=None):
+        delay = self.next_delay()
+        if delay > 0: time.sleep(delay)
+        now = time.monotonic()
+        self.tick(now)
+        return should_continue() if should_continue else True
+
+    def tick(self, t=None):
+        t = time.monotonic() if t is None else t
+        if self._last_tick is not None:
+            self._tick_intervals.append(t - self._last_tick)
+        self._last_tick = t
+
+    def stats(self):
+        intervals = np.fromiter(self._tick_intervals, dtype=np.float64)
+        if intervals.size < 2: return 0.0, 0.0
+        mean = intervals.mean()
+        return (float(1.0 / mean) if mean > 1e-9 else 0.0), float(intervals.std() * 1000.0)
+
+    def log_stats_if_due(self):
+        now = time.monotonic()
+        if now - self._last_report < PACER_REPORT_INTERVAL_S: return
+        self._last_report = now
+        fps, jitter_ms = self.stats()
+        source = self.source_fps()
+        source_text = f", Quelle {source:.1f} FPS" if source else ""
+        logging.info(f"{self.name}: {fps:.1f} FPS erreicht (Ziel {1.0 / self._effective_period():.1f}), Jitter {jitter_ms:.2f} ms{source_text}")
+
+
+def start_local_http_server(handler_cls, port, host='127.0.0.1', name="HttpServerThread", **server_attrs):
+    httpd = ThreadingHTTPServer((host, port), handler_cls)
+    httpd.daemon_threads = True
+    for key, value in server_attrs.items(): setattr(httpd, key, value)
+    threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.25}, name=name, daemon=True).start()
+    return httpd
+
+def stop_local_http_server(httpd):
+    if httpd is None: return
+    threading.Thread(target=lambda: (httpd.shutdown(), httpd.server_close()), name="HttpShutdownThread", daemon=True).start()
+
+
+class _MjpegRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.debug("MJPEG-HTTP %s: %s" % (self.address_string(), format % args))
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            body = MJPEG_INDEX_HTML.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == '/stream':
+            self.server.stream.serve_client(self)
+        else:
+            self.send_error(404)
+
+
+class MjpegStreamServer:
+    def __init__(self, port=MJPEG_DEFAULT_PORT, host='127.0.0.1', max_fps=MJPEG_MAX_FPS, quality=MJPEG_JPEG_QUALITY):
+        self.host, self.port = host, port
+        self.max_fps, self.quality = max_fps, quality
+        self.client_count = 0
+        self._running = False
+        self._latest_frame = None
+        self._frame_event = threading.Event()
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._httpd = None
+        self._encoder_thread = None
+
+    def start(self):
+        self._httpd = start_local_http_server(_MjpegRequestHandler, self.port, self.host, name="MjpegServerThread", stream=self)
+        self.port = self._httpd.server_address[1]
+        self._running = True
+        self._encoder_thread = threading.Thread(target=self._encoder_worker, name="MjpegEncoderThread", daemon=True)
+        self._encoder_thread.start()
+        logging.info(f"MJPEG-Stream aktiv: http://{self.host}:{self.port}/ (max. {self.max_fps} FPS, Qualität {self.quality})")
+
+    def stop(self):
+        if not self._running: return
+        self._running = False
+        self._frame_event.set()
+        with self._cond: self._cond.notify_all()
+        stop_local_http_server(self._httpd); self._httpd = None
+        logging.info("MJPEG-Stream gestoppt.")
+
+    def submit(self, frame):
+        if not self.client_count or frame is None: return
+        self._latest_frame = frame
+        self._frame_event.set()
+
+    def _encoder_worker(self):
+        pacer = FramePacer(self.max_fps, name="MJPEG-Encoder")
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), int(self.quality)]
+        while self._running:
+            if not self._frame_event.wait(timeout=0.5): continue
+            self._frame_event.clear()
+            frame, self._latest_frame = self._latest_frame, None
+            if frame is None or not self.client_count: continue
+            try:
+                ok, buf = cv2.imencode('.jpg', mirror_for_display(frame), params)
+            except Exception as e:
+                logging.error(f"Fehler beim JPEG-Encoding: {e}"); ok = False
+            if ok:
+                with self._cond:
+                    self._jpeg = buf.tobytes(); self._jpeg_seq += 1
+                    self._cond.notify_all()
+            pacer.wait()
+            pacer.log_stats_if_due()
+
+    def serve_client(self, handler):
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=' + MJPEG_BOUNDARY.decode('ascii'))
+        handler.send_header('Cache-Control', 'no-cache, private')
+        handler.send_header('Pragma', 'no-cache')
+        handler.end_headers()
+        with self._cond: self.client_count += 1
+        logging.info(f"MJPEG-Client verbunden: {handler.address_string()} (aktiv: {self.client_count})")
+        last_seq = self._jpeg_seq
+        try:
+            while self._running:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._jpeg_seq != last_seq or not self._running, timeout=1.0)
+                    jpeg, seq = self._jpeg, self._jpeg_seq
+                if not self._running: break
+                if jpeg is None or seq == last_seq: continue
+                last_seq = seq
+                handler.wfile.write(b"--" + MJPEG_BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(jpeg)).encode('ascii') + b"\r\n\r\n")
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            with self._cond: self.client_count -= 1
+            logging.info(f"MJPEG-Client getrennt: {handler.address_string()} (aktiv: {self.client_count})")
+
+
+class TimedVideoWriter:
+    def __init__(self, path, fps, size):
+        self.path, self.fps, self.size = path, fps, size
+        self.frames = 0
+        self._t0 = None
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*RECORD_FOURCC), fps, size)
+
+    def is_opened(self):
+        return self._writer.isOpened()
+
+    def write(self, t, frame):
+        if (frame.shape[1], frame.shape[0]) != self.size: frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if self._t0 is None: self._t0 = t
+        target = int(round((t - self._t0) * self.fps)) + 1
+        # Lücken (verworfene/ausgelassene Frames) durch Wiederholen füllen, damit die Zeitachse stimmt; lange Pausen nicht
+        if target - self.frames > self.fps:
+            self._t0 += (target - self.frames - 1) / self.fps; target = self.frames + 1
+        for _ in range(max(1, target - self.frames)): self._writer.write(frame)
+        self.frames = max(self.frames + 1, target)
+
+    def release(self):
+        self._writer.release()
+
+
+class SessionRecorder:
+    def __init__(self, directory=RECORD_DIR, fps=RECORD_FPS, replay_s=0, queue_size=RECORD_QUEUE_SIZE, metrics=None):
+        self.directory, self.fps, self.replay_s = directory, fps, replay_s
+        self.metrics = metrics
+        self.recording = False
+        self.frames_dropped = 0
+        self._interval = 1.0 / fps
+        self._next_due = 0.0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._replay = deque(maxlen=max(1, int(fps * replay_s))) if replay_s > 0 else None
+        self._replay_lock = threading.Lock()
+        self._writer = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def active(self):
+        return self.recording or self._replay is not None
+
+    def start(self):
+        if self._running: return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="SessionRecorderThread", daemon=True)
+        self._thread.start()
+        if self._replay is not None: logging.info(f"Replay-Puffer aktiv: letzte {self.replay_s:g} s bei {self.fps} FPS.")
+
+    def stop(self):
+        if not self._running: return
+        self._running = False; self.recording = False
+        self._thread.join(timeout=THREAD_JOIN_TIMEOUT_S)
+        if self._thread.is_alive(): logging.warning("Aufnahme-Thread nicht beendet.")
+
+    def set_recording(self, enabled):
+        self.recording = enabled
+        if enabled: self.start()
+
+    def submit(self, frame):
+        if not self.active or frame is None: return
+        now = time.monotonic()
+        if now < self._next_due: return
+        self._next_due = max(self._next_due + self._interval, now)
+        item = (now, frame)
+        try: self._queue.put_nowait(item); return
+        except queue.Full: pass
+        try: self._queue.get_nowait()
+        except queue.Empty: pass
+        self.frames_dropped += 1
+        if self.metrics is not None: self.metrics.record_recorder_drop()
+        try: self._queue.put_nowait(item)
+        except queue.Full: pass
+
+    def _new_path(self, prefix):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{RECORD_EXTENSION}")
+
+    def _close_writer(self):
+        writer, self._writer = self._writer, None
+        if writer is None: return
+        writer.release()
+        logging.info(f"Aufnahme beendet: {writer.path} ({writer.frames} Frames, bisher {self.frames_dropped} verworfen).")
+
+    def _worker(self):
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), RECORD_REPLAY_JPEG_QUALITY]
+        reported_drops, last_report = 0, time.monotonic()
+        while self._running:
+            try: t, frame = self._queue.get(timeout=0.5)
+            except queue.Empty: t = frame = None
+            if not self.recording: self._close_writer()
+            if frame is not None:
+                frame = mirror_for_display(frame)
+                try:
+                    if self.recording:
+                        if self._writer is None:
+                            writer = TimedVideoWriter(self._new_path("session"), self.fps, (frame.shape[1], frame.shape[0]))
+                            if not writer.is_opened():
+                                logging.error(f"Videodatei konnte nicht geöffnet werden: {writer.path}"); self.recording = False
+                            else:
+                                self._writer = writer; logging.info(f"Aufnahme gestartet: {writer.path}")
+                        if self._writer is not None: self._writer.write(t, frame)
+                    if self._replay is not None:
+                        ok, buf = cv2.imencode('.jpg', frame, params)
+                        if ok:
+                            with self._replay_lock: self._replay.append((t, buf))
+                    if self.metrics is not None: self.metrics.record_recorder_frame()
+                except Exception as e:
+                    logging.error(f"Fehler bei der Aufnahme: {e}", exc_info=True)
+            now = time.monotonic()
+            if now - last_report >= RECORD_DROP_LOG_INTERVAL_S:
+                if self.frames_dropped > reported_drops:
+                    logging.warning(f"Aufnahme: {self.frames_dropped - reported_drops} Frames in {now - last_report:.0f} s verworfen (gesamt {self.frames_dropped}), Kodierung kommt nicht hinterher.")
+                reported_drops, last_report = self.frames_dropped, now
+        self._close_writer()
+
+    def save_replay(self, on_done=None):
+        if self._replay is None: return False
+        with self._replay_lock: frames = list(self._replay)
+        if not frames: return False
+        threading.Thread(target=self._write_replay, args=(frames, on_done), name="ReplaySaveThread", daemon=True).start()
+        return True
+
+    def _write_replay(self, frames, on_done):
+        started = time.perf_counter()
+        path = self._new_path("replay")
+        writer = None
+        try:
+            for t, buf in frames:
+                frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+                if frame is None: continue
+                if writer is None: writer = TimedVideoWriter(path, self.fps, (frame.shape[1], frame.shape[0]))
+                writer.write(t, frame)
+            if writer is not None: writer.release()
+            logging.info(f"Replay gespeichert: {path} ({frames[-1][0] - frames[0][0]:.1f} s, {len(frames)} Frames) in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        except Exception as e:
+            logging.error(f"Replay konnte nicht gespeichert werden: {e}", exc_info=True); path = None
+        if on_done is not None: on_done(path)
+
+
+class TrackerMetrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.frames_read = 0
+        self.frames_processed = 0
+        self.frames_with_face = 0
+        self.camera_read_failures = 0
+        self.preview_frames_dropped = 0
+        self.key_events = 0
+        self.camera_opens = 0
+        self.camera_reopens = 0
+        self.camera_recovery_s_last = 0.0
+        self.camera_downtime_s = 0.0
+        self.predicted_blinks = 0
+        self.predicted_false_fires = 0
+        self.ui_stall_s_max = 0.0
+        self.flow_frames = 0
+        self.flow_lost = 0
+        self.recorder_frames = 0
+        self.recorder_dropped = 0
+        self._frame_times = deque(maxlen=METRICS_WINDOW)
+        self._inference_s = deque(maxlen=METRICS_WINDOW)
+        self._key_event_times = deque(maxlen=METRICS_WINDOW)
+        self._cpu_sample = (time.monotonic(), time.process_time())
+        self._cpu_percent = 0.0
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+
+    def record_frame(self, t):
+        self.frames_read += 1
+        self._frame_times.append(t)
+
+    def record_inference(self, seconds, face_detected):
+        self.frames_processed += 1
+        if face_detected: self.frames_with_face += 1
+        self._inference_s.append(seconds)
+
+    def record_read_failure(self):
+        self.camera_read_failures += 1
+
+    def record_preview_drop(self):
+        self.preview_frames_dropped += 1
+
+    def record_key_event(self):
+        self.key_events += 1
+        self._key_event_times.append(time.monotonic())
+
+    def record_prediction(self, confirmed):
+        self.predicted_blinks += 1
+        if not confirmed: self.predicted_false_fires += 1
+
+    def record_flow(self, tracked):
+        if tracked: self.flow_frames += 1
+        else: self.flow_lost += 1
+
+    def record_recorder_frame(self):
+        self.recorder_frames += 1
+
+    def record_recorder_drop(self):
+        self.recorder_dropped += 1
+
+    def record_ui_stall(self, seconds):
+        if seconds > self.ui_stall_s_max: self.ui_stall_s_max = seconds
+
+    def record_camera_open(self, reopen=False):
+        self.camera_opens += 1
+        if reopen: self.camera_reopens += 1
+
+    def record_reconnect(self, recovery_s):
+        self.camera_recovery_s_last = recovery_s
+        self.camera_downtime_s += recovery_s
+
+    def _tracking_fps(self, now):
+        times = list(self._frame_times)
+        if len(times) < 2 or now - times[-1] > 2.0: return 0.0
+        span = times[-1] - times[0]
+        return (len(times) - 1) / span if span > 1e-6 else 0.0
+
+    def _cpu(self, now):
+        last_wall, last_cpu = self._cpu_sample
+        if now - last_wall >= 1.0:
+            cpu_now = time.process_time()
+            self._cpu_percent = (cpu_now - last_cpu) / (now - last_wall) * 100.0
+            self._cpu_sample = (now, cpu_now)
+        return self._cpu_percent
+
+    def _rss_bytes(self):
+        try:
+            if self._process is not None: return self._process.memory_info().rss
+            if os.path.exists('/proc/self/statm'):
+                with open('/proc/self/statm') as f: return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except Exception: pass
+        return None
+
+    def snapshot(self):
+        now = time.monotonic()
+        inference_ms = np.fromiter(self._inference_s, dtype=np.float64) * 1000.0
+        if inference_ms.size:
+            p50, p90, p99 = (float(v) for v in np.percentile(inference_ms, [50, 90, 99]))
+        else:
+            p50 = p90 = p99 = 0.0
+        key_events_last_minute = sum(1 for t in list(self._key_event_times) if now - t <= 60.0)
+        processed = self.frames_processed
+        return {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.started_at,
+            'tracking_fps': self._tracking_fps(now),
+            'inference_ms_p50': p50, 'inference_ms_p90': p90, 'inference_ms_p99': p99,
+            'frames_read_total': self.frames_read,
+            'frames_processed_total': processed,
+            'frames_dropped_total': self.camera_read_failures + self.preview_frames_dropped,
+            'camera_read_failures_total': self.camera_read_failures,
+            'preview_frames_dropped_total': self.preview_frames_dropped,
+            'face_detected_ratio': self.frames_with_face / processed if processed else 0.0,
+            'key_events_total': self.key_events,
+            'key_events_per_minute': key_events_last_minute,
+            'camera_opens_total': self.camera_opens,
+            'camera_reopens_total': self.camera_reopens,
+            'camera_recovery_seconds_last': self.camera_recovery_s_last,
+            'camera_downtime_seconds_total': self.camera_downtime_s,
+            'predicted_blinks_total': self.predicted_blinks,
+            'predicted_false_fires_total': self.predicted_false_fires,
+            'ui_stall_ms_max': self.ui_stall_s_max * 1000.0,
+            'flow_frames_total': self.flow_frames,
+            'flow_lost_total': self.flow_lost,
+            'recorder_frames_total': self.recorder_frames,
+            'recorder_frames_dropped_total': self.recorder_dropped,
+            'process_cpu_percent': self._cpu(now),
+            'process_rss_bytes': self._rss_bytes(),
+        }
+
+    def to_prometheus(self):
+        lines = []
+        for key, value in self.snapshot().items():
+            if value is None or key == 'timestamp': continue
+            name = f"eyetracker_{key}"
+            kind = 'counter' if key.endswith('_total') else 'gauge'
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {float(value):.6g}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.debug("Metrics-HTTP %s: %s" % (self.address_string(), format % args))
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        metrics = self.server.metrics
+        if path == '/metrics':
+            body, content_type = metrics.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body, content_type = json.dumps(metrics.snapshot()).encode('utf-8'), 'application/json'
+        else:
+            self.send_error(404); return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsExporter:
+    def __init__(self, metrics, port=None, snapshot_path=None, snapshot_interval=METRICS_SNAPSHOT_INTERVAL_S, host='127.0.0.1'):
+        self.metrics = metrics
+        self.port, self.host = port, host
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._httpd = None
+        self._stop_event = threading.Event()
+        self._snapshot_thread = None
+
+    def start(self):
+        if self.port is not None:
+            self._httpd = start_local_http_server(_MetricsRequestHandler, self.port, self.host, name="MetricsServerThread", metrics=self.metrics)
+            self.port = self._httpd.server_address[1]
+            logging.info(f"Metrics-Endpunkt aktiv: http://{self.host}:{self.port}/metrics")
+        if self.snapshot_path:
+            self._snapshot_thread = threading.Thread(target=self._snapshot_worker, name="MetricsSnapshotThread", daemon=True)
+            self._snapshot_thread.start()
+            logging.info(f"Metrics-Snapshots alle {self.snapshot_interval:.0f}s nach '{self.snapshot_path}'.")
+
+    def stop(self):
+        self._stop_event.set()
+        stop_local_http_server(self._httpd); self._httpd = None
+        if self.snapshot_path: self.write_snapshot()
+
+    def write_snapshot(self):
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(self.metrics.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logging.warning(f"Metrics-Snapshot konnte nicht geschrieben werden: {e}")
+
+    def _snapshot_worker(self):
+        while not self._stop_event.wait(self.snapshot_interval):
+            self.write_snapshot()
+
+
+def decode_state(data):
+    seq, t_mono, t_unix, left_ear, right_ear, flags, n_points, width, height = PUBLISH_RECORD.unpack_from(data)
+    state = {'seq': seq, 't_monotonic': t_mono, 't_unix': t_unix, 'left_ear': left_ear, 'right_ear': right_ear,
+             'frame_width': width, 'frame_height': height}
+    for bit, name in enumerate(PUBLISH_FLAGS): state[name] = bool(flags >> bit & 1)
+    state['points'] = np.frombuffer(data, '<f4', n_points * 2, PUBLISH_RECORD.size).reshape(-1, 2) if n_points else None
+    return state
+
+
+def _process_alive(pid):
+    if pid <= 0: return False
+    # Unter Windows existiert ein Segment nur, solange es ein Prozess geöffnet hat; os.kill würde dort beenden
+    if os.name == 'nt': return True
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+
+class StatePublisher:
+    def __init__(self, shm_name=None, udp_port=None, landmarks=False, slots=PUBLISH_RING_SLOTS, host='127.0.0.1'):
+        self.shm_name, self.udp_port, self.host = shm_name, udp_port, host
+        self.landmarks = landmarks
+        self.slots = slots
+        self.seq = 0
+        self.send_errors = 0
+        self._shm = None
+        self._sock = None
+
+    def start(self):
+        if self.shm_name:
+            size = PUBLISH_HEADER_SIZE + self.slots * PUBLISH_SLOT_SIZE
+            try:
+                self._shm = shared_memory.SharedMemory(name=self.shm_name, create=True, size=size)
+            except FileExistsError:
+                self._shm = self._take_over_stale(size)
+            self._shm.buf[:size] = bytes(size)
+            PUBLISH_HEADER.pack_into(self._shm.buf, 0, PUBLISH_MAGIC, PUBLISH_VERSION, PUBLISH_SLOT_SIZE, self.slots, 0)
+            PUBLISH_OWNER.pack_into(self._shm.buf, PUBLISH_OWNER_OFFSET, os.getpid())
+            logging.info(f"Zustand im Shared Memory '{self.shm_name}' ({self.slots} Slots à {PUBLISH_SLOT_SIZE} Byte).")
+        if self.udp_port is not None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+            self._udp_addr = (self.host, self.udp_port)
+            logging.info(f"Zustand per UDP an {self.host}:{self.udp_port}.")
+
+    def _take_over_stale(self, size):
+        # Nur den Rest eines abgestürzten Laufs übernehmen; fremde oder laufende Segmente nie überschreiben
+        existing = shared_memory.SharedMemory(name=self.shm_name)
+        magic, version = b'', 0
+        if existing.size >= PUBLISH_HEADER_SIZE:
+            magic, version = PUBLISH_HEADER.unpack_from(existing.buf)[:2]
+            owner, = PUBLISH_OWNER.unpack_from(existing.buf, PUBLISH_OWNER_OFFSET)
+        if magic != PUBLISH_MAGIC or version != PUBLISH_VERSION:
+            existing.close()
+            raise OSError(f"Shared Memory '{self.shm_name}' existiert bereits mit fremdem Inhalt (Magic {magic!r}, Version {version}). Anderen Namen wählen.")
+        if owner != os.getpid() and _process_alive(owner):
+            existing.close()
+            raise OSError(f"Shared Memory '{self.shm_name}' wird bereits von Prozess {owner} beschrieben. Anderen Namen wählen.")
+        logging.warning(f"Shared Memory '{self.shm_name}' eines beendeten Laufs{f' (Prozess {owner})' if owner else ''} gefunden, übernehme es.")
+        if existing.size >= size: return existing
+        existing.close(); existing.unlink()
+        return shared_memory.SharedMemory(name=self.shm_name, create=True, size=size)
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close(); self._sock = None
+        if self._shm is not None:
+            shm, self._shm = self._shm, None
+            shm.close()
+            try: shm.unlink()
+            except FileNotFoundError: pass
+        if self.send_errors: logging.info(f"Zustands-Veröffentlichung beendet ({self.seq} Datensätze, {self.send_errors} UDP-Sendefehler).")
+
+    def publish(self, state, points=None, frame_size=(0, 0)):
+        self.seq += 1
+        flags = (state.face_detected | state.left_closed << 1 | state.right_closed << 2 | state.both_closed << 3
+                 | state.x_key_down << 4 | state.c_key_down << 5)
+        payload = b''
+        if self.landmarks and points is not None:
+            payload = np.ascontiguousarray(points.reshape(-1, 2)[:PUBLISH_MAX_POINTS], dtype='<f4').tobytes()
+        fields = (state.timestamp, time.time(), state.left_ear, state.right_ear, flags, len(payload) // 8, frame_size[0], frame_size[1])
+        shm = self._shm
+        if shm is not None:
+            # Seqlock je Slot: erst Sequenz 0 (ungültig), dann Daten, zuletzt die Sequenz; Leser prüfen sie vor und nach dem Kopieren
+            buf = shm.buf
+            offset = PUBLISH_HEADER_SIZE + (self.seq % self.slots) * PUBLISH_SLOT_SIZE
+            PUBLISH_RECORD.pack_into(buf, offset, 0, *fields)
+            if payload: buf[offset + PUBLISH_RECORD.size:offset + PUBLISH_RECORD.size + len(payload)] = payload
+            _SEQ.pack_into(buf, offset, self.seq)
+            _SEQ.pack_into(buf, PUBLISH_LATEST_OFFSET, self.seq)
+        if self._sock is not None:
+            try: self._sock.sendto(PUBLISH_RECORD.pack(self.seq, *fields) + payload, self._udp_addr)
+            except OSError: self.send_errors += 1
+
+
+class StateSubscriber:
+    def __init__(self, shm_name=PUBLISH_SHM_NAME):
+        self._shm = shared_memory.SharedMemory(name=shm_name)
+        if sys.version_info < (3, 13):
+            # Sonst löscht der resource_tracker des Lesers das Segment beim Beenden
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        magic, version, self.slot_size, self.slots, _ = PUBLISH_HEADER.unpack_from(self._shm.buf)
+        if magic != PUBLISH_MAGIC or version != PUBLISH_VERSION:
+            self._shm.close()
+            raise ValueError(f"Unbekanntes Shared-Memory-Format in '{shm_name}'.")
+
+    @property
+    def latest_seq(self):
+        return _SEQ.unpack_from(self._shm.buf, PUBLISH_LATEST_OFFSET)[0]
+
+    def read(self, seq):
+        buf = self._shm.buf
+        offset = PUBLISH_HEADER_SIZE + (seq % self.slots) * self.slot_size
+        data = bytes(buf[offset:offset + self.slot_size])
+        if _SEQ.unpack_from(data)[0] != seq or _SEQ.unpack_from(buf, offset)[0] != seq: return None
+        return decode_state(data)
+
+    def read_since(self, last_seq):
+        latest = self.latest_seq
+        states = []
+        for seq in range(max(last_seq + 1, latest - self.slots + 1), latest + 1):
+            state = self.read(seq)
+            if state is not None: states.append(state)
+        return states
+
+    def close(self):
+        self._shm.close()
+
+
+class GovernorSettings:
+    __slots__ = ('width', 'height', 'process_interval', 'overlay_detail', 'preview_every', 'search_mode')
+
+    def __init__(self, width, height, process_interval, overlay_detail=OVERLAY_DETAIL_FULL, preview_every=1, search_mode=False):
+        self.width = width; self.height = height
+        self.process_interval = process_interval
+        self.overlay_detail = overlay_detail
+        self.preview_every = preview_every
+        self.search_mode = search_mode
+
+    def key(self):
+        return (self.width, self.height, self.process_interval, self.overlay_detail, self.preview_every, self.search_mode)
+
+
+class CpuGovernor:
+    def __init__(self, budget_percent, cam_width, cam_height, process_interval, cam_fps):
+        self.budget_percent = float(budget_percent)
+        self.enabled = self.budget_percent > 0
+        self.level = 0
+        self.search_mode = False
+        self.cpu_percent = 0.0
+        self._cpu_count = os.cpu_count() or 1
+        self._inference_times = deque(maxlen=120)
+        self._face_lost_since = time.monotonic()
+        self._last_eval_wall = time.monotonic()
+        self._last_eval_cpu = time.process_time()
+        self.set_base(cam_width, cam_height, process_interval, cam_fps)
+
+    def set_base(self, cam_width, cam_height, process_interval, cam_fps):
+        self.base_width, self.base_height = cam_width, cam_height
+        self.base_interval = max(1, int(process_interval))
+        self.cam_fps = max(1.0, float(cam_fps))
+        self.current = self._compute_settings()
+
+    def set_budget(self, budget_percent):
+        self.budget_percent = float(budget_percent)
+        self.enabled = self.budget_percent > 0
+        if not self.enabled: self.level = 0; self.search_mode = False
+        self.current = self._compute_settings()
+
+    def _compute_settings(self):
+        if not self.enabled:
+            return GovernorSettings(self.base_width, self.base_height, self.base_interval)
+        if self.search_mode:
+            width = min(self.base_width, GOVERNOR_SEARCH_WIDTH)
+            height = min(self.base_height, GOVERNOR_SEARCH_HEIGHT)
+            interval = max(self.base_interval, int(round(self.cam_fps / GOVERNOR_SEARCH_PROCESS_FPS)))
+            return GovernorSettings(width, height, interval, OVERLAY_DETAIL_MINIMAL, 2, search_mode=True)
+        scale, extra_interval, overlay_detail, preview_every = GOVERNOR_LEVELS[self.level]
+        width = max(GOVERNOR_MIN_WIDTH, int(self.base_width * scale) // 2 * 2)
+        height = max(1, int(round(width * self.base_height / max(1, self.base_width))) // 2 * 2)
+        return GovernorSettings(width, height, self.base_interval + extra_interval, overlay_detail, preview_every)
+
+    def record_inference(self, seconds):
+        self._inference_times.append(seconds)
+
+    def mean_inference_ms(self):
+        if not self._inference_times: return 0.0
+        return sum(self._inference_times) / len(self._inference_times) * 1000.0
+
+    def on_face_detected(self, detected, now=None):
+        now = time.monotonic() if now is None else now
+        if detected:
+            self._face_lost_since = None
+            if self.search_mode:
+                self.search_mode = False
+                logging.info(f"CPU-Governor: Gesicht gefunden -> verlasse Suchmodus (Stufe {self.level}).")
+        elif self._face_lost_since is None:
+            self._face_lost_since = now
+
+    def update(self, now=None):
+        if not self.enabled: return False
+        now = time.monotonic() if now is None else now
+        previous = self.current.key()
+
+        if not self.search_mode and self._face_lost_since is not None and now - self._face_lost_since >= GOVERNOR_SEARCH_DELAY_S:
+            self.search_mode = True
+            logging.info("CPU-Governor: Kein Gesicht -> Suchmodus mit reduzierter Auflösung/Rate.")
+
+        wall_delta = now - self._last_eval_wall
+        if wall_delta >= GOVERNOR_EVAL_INTERVAL_S:
+            cpu_now = time.process_time()
+            self.cpu_percent = (cpu_now - self._last_eval_cpu) / wall_delta / self._cpu_count * 100.0
+            self._last_eval_wall, self._last_eval_cpu = now, cpu_now
+            if not self.search_mode:
+                if self.cpu_percent > self.budget_percent and self.level < len(GOVERNOR_LEVELS) - 1:
+                    self.level += 1
+                    logging.info(f"CPU-Governor: CPU {self.cpu_percent:.1f}% > Budget {self.budget_percent:.0f}% (Inferenz {self.mean_inference_ms():.1f} ms) -> Stufe {self.level}.")
+                elif self.cpu_percent < self.budget_percent * GOVERNOR_RELAX_FACTOR and self.level > 0:
+                    self.level -= 1
+                    logging.info(f"CPU-Governor: CPU {self.cpu_percent:.1f}% unter Budget {self.budget_percent:.0f}% -> Stufe {self.level}.")
+
+        self.current = self._compute_settings()
+        return self.current.key() != previous
+
+
+def synthetic_face_frame(w, h, eye_open=1.0):
+    img = np.full((h, w, 3), (90, 110, 120), dtype=np.uint8)
+    s = h / 480.0; cx, cy = w // 2, h // 2
+    p = lambda v: int(round(v * s))
+    cv2.ellipse(img, (cx, cy), (p(110), p(150)), 0, 0, 360, (150, 180, 225), -1)
+    for dx in (-45, 45):
+        eye = (cx + p(dx), cy - p(30))
+        cv2.ellipse(img, eye, (p(24), max(1, p(12 * eye_open))), 0, 0, 360, (255, 255, 255), -1)
+        if eye_open > 0.3: cv2.circle(img, eye, p(9 * min(1.0, eye_open)), (60, 40, 30), -1)
+        cv2.line(img, (cx + p(dx - 28), cy - p(58)), (cx + p(dx + 28), cy - p(60)), (40, 40, 60), max(1, p(5)))
+    cv2.line(img, (cx, cy - p(20)), (cx - p(10), cy + p(30)), (110, 140, 190), max(1, p(4)))
+    cv2.ellipse(img, (cx, cy + p(70)), (p(40), p(12)), 0, 0, 360, (80, 80, 170), -1)
+    return cv2.GaussianBlur(img, (5, 5), 0)
+
+
+class CapabilityCost:
+    __slots__ = ('inference_ms', 'inference_cpu_ms', 'overlay_ms', 'overlay_cpu_ms', 'preview_ms', 'preview_cpu_ms', 'face_found')
+
+    def __init__(self, inference, overlay, preview, face_found):
+        self.inference_ms, self.inference_cpu_ms = inference
+        self.overlay_ms, self.overlay_cpu_ms = overlay
+        self.preview_ms, self.preview_cpu_ms = preview
+        self.face_found = face_found
+
+
+class CapabilityChoice:
+    __slots__ = ('width', 'height', 'fps', 'process_interval', 'frame_ms', 'cpu_percent', 'fits')
+
+    def __init__(self, width, height, fps, process_interval, frame_ms, cpu_percent, fits):
+        self.width, self.height, self.fps, self.process_interval = width, height, fps, process_interval
+        self.frame_ms, self.cpu_percent, self.fits = frame_ms, cpu_percent, fits
+
+    def quality(self):
+        # Analyse-Rate vor Auflösung: Blinzel-Latenz zählt mehr als eine scharfe Vorschau
+        return (self.fps / self.process_interval, self.width * self.height, self.fps)
+
+    def settings(self):
+        return {'cam_width': self.width, 'cam_height': self.height, 'cam_fps': self.fps, 'process_interval': self.process_interval}
+
+
+def _time_calls(fn, count, deadline):
+    t0, c0, n = time.perf_counter(), time.process_time(), 0
+    while n < count and (n < CAPABILITY_MIN_FRAMES or time.monotonic() < deadline):
+        fn(); n += 1
+    return (time.perf_counter() - t0) / n * 1000.0, (time.process_time() - c0) / n * 1000.0
+
+def measure_capability(time_limit=CAPABILITY_TIME_LIMIT_S, resolutions=CAPABILITY_RESOLUTIONS, frames=CAPABILITY_FRAMES):
+    # Kleine Auflösungen zuerst: reicht die Zeit nicht, fehlen nur die teuersten Stufen.
+    # Die kleinste wird immer gemessen, damit es eine sparsame Rückfalloption gibt.
+    t0 = time.monotonic(); deadline = t0 + time_limit
+    mesh = mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    costs = {}
+    try:
+        for w, h in sorted(resolutions, key=lambda r: r[0] * r[1]):
+            if costs and time.monotonic() >= deadline:
+                logging.warning(f"Leistungstest: Zeitlimit erreicht, {w}x{h} und größer nicht gemessen."); break
+            frame = synthetic_face_frame(w, h)
+            canvas = frame.copy()
+            scaler = InferenceScaler(0)
+            for _ in range(CAPABILITY_WARMUP_FRAMES): results = mesh.process(scaler.prepare(frame))
+            face = results.multi_face_landmarks[0] if results.multi_face_landmarks else None
+            inference = _time_calls(lambda: mesh.process(scaler.prepare(frame)), frames, deadline)
+            overlay = _time_calls(lambda: draw_face_overlay(canvas, face), frames, deadline) if face is not None else (0.0, 0.0)
+            preview = _time_calls(lambda: prepare_preview_image(frame, GUI_PREVIEW_WIDTH - 10, GUI_PREVIEW_HEIGHT - 30), frames, deadline)
+            costs[(w, h)] = cost = CapabilityCost(inference, overlay, preview, face is not None)
+            logging.info(f"Leistungstest {w}x{h}: Inferenz {cost.inference_ms:.1f} ms, Overlay {cost.overlay_ms:.1f} ms, Vorschau {cost.preview_ms:.1f} ms"
+                         f"{'' if cost.face_found else ' (kein Gesicht erkannt)'}")
+    finally:
+        mesh.close()
+    logging.info(f"Leistungstest nach {time.monotonic() - t0:.2f} s beendet.")
+    return costs
+
+def choose_capability_settings(costs, cpu_budget=DEFAULT_CPU_BUDGET_PERCENT, frame_budget=CAPABILITY_FRAME_BUDGET, fps_options=CAPABILITY_FPS,
+                               intervals=CAPABILITY_INTERVALS, cpu_count=None):
+    # Pro Kamera-Frame: Vorschau immer, Inferenz und Overlay nur auf jedem n-ten Frame.
+    # Passen muss die Wandzeit ins Frame-Budget und die CPU-Zeit ins Budget des Governors.
+    cpu_count = cpu_count or os.cpu_count() or 1
+    choices = []
+    for (w, h), cost in costs.items():
+        for fps in fps_options:
+            for interval in intervals:
+                frame_ms = cost.preview_ms + (cost.inference_ms + cost.overlay_ms) / interval
+                cpu_ms = cost.preview_cpu_ms + (cost.inference_cpu_ms + cost.overlay_cpu_ms) / interval
+                cpu_percent = cpu_ms * fps / 10.0 / cpu_count
+                fits = frame_ms <= frame_budget * 1000.0 / fps and (cpu_budget <= 0 or cpu_percent <= cpu_budget)
+                choices.append(CapabilityChoice(w, h, fps, interval, frame_ms, cpu_percent, fits))
+    if not choices:
+        logging.warning("Leistungstest ohne Messwerte, Einstellungen bleiben unverändert."); return None
+    fitting = [c for c in choices if c.fits]
+    choice = max(fitting, key=CapabilityChoice.quality) if fitting else min(choices, key=lambda c: c.cpu_percent)
+    logging.info(f"Leistungstest wählt {choice.width}x{choice.height} @{choice.fps}FPS, Intervall {choice.process_interval}: "
+                 f"{choice.frame_ms:.1f} ms pro Frame, CPU {choice.cpu_percent:.0f}%{'' if choice.fits else ' (kein Kandidat im Budget, sparsamster gewählt)'}")
+    return choice
+
+
+def open_camera(camera_index, width, height, fps):
+    cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY)
+    if not cap or not cap.isOpened():
+        logging.warning(f"Fallback: Versuche Kamera {camera_index} ohne DSHOW...")
+        cap = cv2.VideoCapture(camera_index)
+    if not cap or not cap.isOpened(): return None, None
+    return cap, configure_camera(cap, width, height, fps)
+
+
+def configure_camera(cap, width, height, fps):
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    actual_fps = cap.get(cv2.CAP_PROP_FPS)
+    if actual_fps <= 0: actual_fps = fps
+    return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), actual_fps
+
+
+def reconfigure_camera(cap, camera_index, width, height, fps, previous_size, label, camera_name, requested_at=None):
+    t0 = time.monotonic()
+    actual = configure_camera(cap, width, height, fps)
+    reopened = False
+    if actual[:2] == previous_size and previous_size != (width, height):
+        logging.info(f"{label}-Kamera '{camera_name}' übernimmt {width}x{height} nicht im laufenden Betrieb. Öffne neu...")
+        release_camera(cap, label, camera_name)
+        cap, actual = open_camera(camera_index, width, height, fps)
+        reopened = True
+        if cap is None:
+            logging.error(f"{label}-Kamera '{camera_name}' konnte nach Umkonfiguration nicht neu geöffnet werden.")
+            return None, None
+    t1 = time.monotonic()
+    since_change = f", {(t1 - requested_at) * 1000:.0f} ms nach Änderung" if requested_at is not None else ""
+    logging.info(f"{label}-Kamera '{camera_name}' umkonfiguriert ({'neu geöffnet' if reopened else 'im laufenden Betrieb'}): angefordert {width}x{height} @{fps}FPS, "
+                 f"tatsächlich {actual[0]}x{actual[1]} @{actual[2]:.2f}FPS in {(t1 - t0) * 1000:.0f} ms{since_change}")
+    return cap, actual
+
+
+def release_camera(cap, label, camera_name):
+    if cap is None: return
+    logging.info(f"Gebe {label}-Kamera frei ('{camera_name}')...")
+    try: cap.release()
+    except Exception as e: logging.error(f"Fehler Freigabe {label} ('{camera_name}'): {e}")
+    else: logging.info(f"{label}-Kamera ('{camera_name}') freigegeben.")
+
+
+class CaptureChannel:
+    def __init__(self):
+        self._commands = queue.Queue()
+
+    def send(self, command, *args):
+        self._commands.put((command, args))
+
+    def stop(self):
+        self.send(CAPTURE_CMD_STOP)
+
+    def pending(self):
+        while True:
+            try: yield self._commands.get_nowait()
+            except queue.Empty: return
+
+
+class LifecycleController:
+    def __init__(self, on_transition=None):
+        self.state = LIFECYCLE_IDLE
+        self.on_transition = on_transition
+        self.closed = threading.Event()
+        self._handlers = {}
+        self._commands = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="LifecycleThread", daemon=True)
+
+    def register(self, command, handler):
+        self._handlers[command] = handler
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, command, *args):
+        if self.closed.is_set(): return
+        logging.debug(f"Lebenszyklus: Befehl '{command}' eingereiht (Zustand {self.state}).")
+        self._commands.put((command, args))
+
+    def set_state(self, state):
+        if state != self.state: logging.info(f"Lebenszyklus: {self.state} -> {state}")
+        self.state = state
+
+    def _run(self):
+        while True:
+            command, args = self._commands.get()
+            before, t0 = self.state, time.monotonic()
+            try:
+                state = self._handlers[command](*args)
+                if state is not None: self.set_state(state)
+            except Exception as e:
+                logging.error(f"Lebenszyklus: Fehler bei '{command}' im Zustand {before}: {e}", exc_info=True)
+            if self.on_transition is not None:
+                try: self.on_transition(command, before, self.state, t0, time.monotonic())
+                except Exception as e: logging.warning(f"Lebenszyklus: Fehler im Übergangs-Callback: {e}")
+            if command == LIFECYCLE_CMD_CLOSE:
+                self.closed.set()
+                return
+
+
+class UiStallMonitor:
+    def __init__(self, root, metrics=None, interval_ms=UI_STALL_PROBE_MS):
+        self.root = root
+        self.metrics = metrics
+        self.interval_s = interval_ms / 1000.0
+        self.max_s = 0.0
+        self._samples = deque(maxlen=UI_STALL_HISTORY)
+        self._last = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._last = time.monotonic()
+        self.root.after(int(self.interval_s * 1000), self._probe)
+
+    def stop(self):
+        self._running = False
+
+    def _probe(self):
+        if not self._running: return
+        now = time.monotonic()
+        stall = max(0.0, now - self._last - self.interval_s)
+        self._last = now
+        self._samples.append((now, stall))
+        if stall > self.max_s: self.max_s = stall
+        if self.metrics is not None: self.metrics.record_ui_stall(stall)
+        self.root.after(int(self.interval_s * 1000), self._probe)
+
+    def worst_since(self, t0):
+        return max((stall for t, stall in list(self._samples) if t >= t0), default=0.0)
+
+
+class CameraReconnectSupervisor:
+    def __init__(self, max_failures=RECONNECT_MAX_FAILURES, frame_timeout_s=RECONNECT_FRAME_TIMEOUT_S,
+                 backoff_initial_s=RECONNECT_BACKOFF_INITIAL_S, backoff_max_s=RECONNECT_BACKOFF_MAX_S):
+        self.max_failures, self.frame_timeout_s = max_failures, frame_timeout_s
+        self.backoff_initial_s, self.backoff_max_s = backoff_initial_s, backoff_max_s
+        self.failures = 0
+        self.last_frame = None
+        self.outage_started = None
+        self.attempts = 0
+        self.reconnects = 0
+        self.last_recovery_s = 0.0
+
+    def on_frame(self, now):
+        self.failures = 0
+        self.last_frame = now
+
+    def on_failure(self, now):
+        self.failures += 1
+        if self.last_frame is None: self.last_frame = now
+        return self.failures >= self.max_failures or now - self.last_frame >= self.frame_timeout_s
+
+    def begin_outage(self, now):
+        self.outage_started = now
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = min(self.backoff_max_s, self.backoff_initial_s * (2 ** self.attempts))
+        self.attempts += 1
+        return delay
+
+    def end_outage(self, now):
+        self.last_recovery_s = now - self.outage_started if self.outage_started is not None else 0.0
+        self.outage_started = None
+        self.reconnects += 1
+        self.on_frame(now)
+        return self.last_recovery_s
+
+
+class FaceTracker:
+    def __init__(self, policy=FACE_POLICY_LARGEST, match_dist=FACE_MATCH_MAX_DIST, ttl_s=FACE_TRACK_TTL_S):
+        self.policy = policy
+        self.match_dist, self.ttl_s = match_dist, ttl_s
+        self.tracks = {}
+        self.next_id = 1
+        self.locked_id = None
+        self.selected_id = None
+
+    def set_policy(self, policy):
+        if policy == self.policy: return
+        logging.info(f"Gesichtsauswahl: {self.policy} -> {policy}")
+        self.policy = policy
+        self.locked_id = self.selected_id if policy == FACE_POLICY_LOCKED else None
+
+    def reset(self):
+        self.tracks.clear(); self.selected_id = None; self.locked_id = None
+
+    def update(self, eye_points, now):
+        eye_centers = eye_points[:, :, :6].mean(axis=2)
+        centroids = (eye_centers[:, 0] + eye_centers[:, 1]) * 0.5
+        gap = eye_centers[:, 0] - eye_centers[:, 1]
+        sizes = np.maximum(np.sqrt((gap * gap).sum(axis=-1)), 1.0)
+        for track_id in [t for t, (_, _, seen) in self.tracks.items() if now - seen > self.ttl_s]:
+            del self.tracks[track_id]
+        ids = [None] * len(centroids)
+        if self.tracks:
+            track_ids = list(self.tracks)
+            delta = centroids[:, None, :] - np.array([self.tracks[t][0] for t in track_ids])[None, :, :]
+            dist = np.sqrt((delta * delta).sum(axis=-1)) / sizes[:, None]
+            used = set()
+            for flat in np.argsort(dist, axis=None):
+                face_i, track_j = divmod(int(flat), len(track_ids))
+                if dist[face_i, track_j] > self.match_dist: break
+                if ids[face_i] is not None or track_j in used: continue
+                ids[face_i] = track_ids[track_j]; used.add(track_j)
+        for face_i in range(len(ids)):
+            if ids[face_i] is None:
+                ids[face_i] = self.next_id; self.next_id += 1
+            self.tracks[ids[face_i]] = (centroids[face_i], float(sizes[face_i]), now)
+        return ids, centroids, sizes
+
+    def select(self, ids, centroids, sizes, w, h):
+        if not ids: return None
+        if self.policy == FACE_POLICY_LOCKED and self.locked_id is not None:
+            if self.locked_id in ids: return self._selected(ids, ids.index(self.locked_id))
+            if self.locked_id in self.tracks: return None
+            logging.info(f"Gesichtsauswahl: Gesperrte ID {self.locked_id} verschwunden, sperre neu auf größtes Gesicht.")
+            self.locked_id = None
+        if self.policy == FACE_POLICY_CENTER:
+            index = int(np.argmin(np.linalg.norm(centroids - np.array([w / 2.0, h / 2.0]), axis=-1)))
+        else:
+            index = int(np.argmax(sizes))
+        if self.policy == FACE_POLICY_LOCKED: self.locked_id = ids[index]
+        return self._selected(ids, index)
+
+    def _selected(self, ids, index):
+        if ids[index] != self.selected_id:
+            logging.info(f"Gesichtsauswahl ({self.policy}): ID {ids[index]} aus {len(ids)} Gesicht(ern).")
+            self.selected_id = ids[index]
+        return index
+
+
+class Actuator:
+    name = "basis"
+
+    def __init__(self):
+        self.held = set()
+
+    def _down(self, key): pass
+    def _up(self, key): pass
+
+    def keyDown(self, key):
+        self._down(key); self.held.add(key)
+
+    def keyUp(self, key):
+        self._up(key); self.held.discard(key)
+
+    def press(self, key):
+        self.keyDown(key); self.keyUp(key)
+
+    def _mouse(self, button, down): pass
+    def _move(self, x, y): pass
+
+    def mouse_down(self, button):
+        self._mouse(button, True); self.held.add(f"mouse:{button}")
+
+    def mouse_up(self, button):
+        self._mouse(button, False); self.held.discard(f"mouse:{button}")
+
+    def move_to(self, x, y):
+        self._move(x, y)
+
+    def release_all(self, context=None):
+        for key in sorted(self.held):
+            try:
+                if key.startswith("mouse:"): self.mouse_up(key[6:])
+                else: self.keyUp(key)
+                if context: logging.info(f"{context}: Löse '{key}'.")
+            except Exception as e: logging.warning(f"Fehler keyUp('{key}') ({context}): {e}")
+        self.held.clear()
+
+    def close(self):
+        self.release_all()
+
+
+class NullActuator(Actuator):
+    name = "null"
+
+
+class PyDirectInputActuator(Actuator):
+    name = "pydirectinput"
+
+    def __init__(self):
+        if not PYDIRECTINPUT_AVAILABLE: raise RuntimeError("pydirectinput nicht verfügbar (pip install pydirectinput)")
+        super().__init__()
+
+    def _down(self, key): pydirectinput.keyDown(key)
+    def _up(self, key): pydirectinput.keyUp(key)
+
+    def press(self, key):
+        pydirectinput.press(key)
+
+    def _mouse(self, button, down):
+        if down: pydirectinput.mouseDown(button=button)
+        else: pydirectinput.mouseUp(button=button)
+
+    def _move(self, x, y): pydirectinput.moveTo(int(x), int(y))
+
+
+class LinuxInputActuator(Actuator):
+    name = "uinput"
+
+    def __init__(self):
+        if not EVDEV_AVAILABLE: raise RuntimeError("evdev nicht verfügbar (pip install evdev)")
+        super().__init__()
+        self._codes = {name[4:].lower(): code for name, code in evdev_ecodes.ecodes.items() if name.startswith("KEY_") and code < evdev_ecodes.KEY_MAX}
+        self._buttons = {'left': evdev_ecodes.BTN_LEFT, 'right': evdev_ecodes.BTN_RIGHT}
+        self._device = UInput({evdev_ecodes.EV_KEY: list(self._codes.values()) + list(self._buttons.values()),
+                               evdev_ecodes.EV_REL: [evdev_ecodes.REL_X, evdev_ecodes.REL_Y]}, name="LockdownEyeProtocol")
+        self._pos = None
+
+    def _emit(self, key, value):
+        self._device.write(evdev_ecodes.EV_KEY, self._codes[key], value)
+        self._device.syn()
+
+    def _down(self, key): self._emit(key, 1)
+    def _up(self, key): self._emit(key, 0)
+
+    def _mouse(self, button, down):
+        self._device.write(evdev_ecodes.EV_KEY, self._buttons[button], 1 if down else 0)
+        self._device.syn()
+
+    def _move(self, x, y):
+        x, y = int(x), int(y)
+        if self._pos is not None:
+            self._device.write(evdev_ecodes.EV_REL, evdev_ecodes.REL_X, x - self._pos[0])
+            self._device.write(evdev_ecodes.EV_REL, evdev_ecodes.REL_Y, y - self._pos[1])
+            self._device.syn()
+        self._pos = (x, y)
+
+    def close(self):
+        super().close()
+        try: self._device.close()
+        except Exception as e: logging.warning(f"Fehler beim Schließen des uinput-Geräts: {e}")
+
+
+class RecordingActuator(Actuator):
+    name = "recording"
+
+    def __init__(self, inner=None, clock=time.monotonic):
+        super().__init__()
+        self.inner = inner
+        self.clock = clock
+        self.events = []
+
+    def _down(self, key):
+        if self.inner is not None: self.inner.keyDown(key)
+        self.events.append((self.clock(), 'down', key))
+
+    def _up(self, key):
+        if self.inner is not None: self.inner.keyUp(key)
+        self.events.append((self.clock(), 'up', key))
+
+    def _mouse(self, button, down):
+        if self.inner is not None: (self.inner.mouse_down if down else self.inner.mouse_up)(button)
+        self.events.append((self.clock(), 'mouse_down' if down else 'mouse_up', button))
+
+    def _move(self, x, y):
+        if self.inner is not None: self.inner.move_to(x, y)
+        self.events.append((self.clock(), 'move', (x, y)))
+
+    def clear(self):
+        self.events.clear()
+
+    def close(self):
+        super().close()
+        if self.inner is not None: self.inner.close()
+
+
+class ClickMappingActuator(Actuator):
+    name = "click"
+
+    def __init__(self, inner, mapping=BLINK_CLICK_BUTTONS):
+        super().__init__()
+        self.inner, self.mapping = inner, mapping
+
+    def _down(self, key):
+        if key in self.mapping: self.inner.mouse_down(self.mapping[key])
+        else: self.inner.keyDown(key)
+
+    def _up(self, key):
+        if key in self.mapping: self.inner.mouse_up(self.mapping[key])
+        else: self.inner.keyUp(key)
+
+    def _move(self, x, y): self.inner.move_to(x, y)
+
+
+class KeyMappingActuator(Actuator):
+    name = "keymap"
+
+    def __init__(self, inner, mapping=DEFAULT_KEY_MAPPING):
+        super().__init__()
+        self.inner, self.mapping = inner, dict(mapping)
+        self._pressed = {}
+
+    def _down(self, key):
+        self._pressed[key] = self.mapping.get(key, key)
+        self.inner.keyDown(self._pressed[key])
+
+    def _up(self, key):
+        self.inner.keyUp(self._pressed.pop(key, self.mapping.get(key, key)))
+
+    def press(self, key): self.inner.press(self.mapping.get(key, key))
+    def _mouse(self, button, down): (self.inner.mouse_down if down else self.inner.mouse_up)(button)
+    def _move(self, x, y): self.inner.move_to(x, y)
+
+
+class GazeController:
+    def __init__(self, actuator, mode=GAZE_MODE_CURSOR, screen_size=(1920, 1080), smoothing_s=GAZE_SMOOTHING_S, gain=GAZE_CURSOR_GAIN):
+        self.actuator, self.mode = actuator, mode
+        self.screen_w, self.screen_h = screen_size
+        self.smoothing_s, self.gain = smoothing_s, gain
+        self.neutral = None
+        self._calibration = []
+        self.smoothed = None
+        self._last_t = None
+        self._last_cursor = None
+        self.held_directions = set()
+
+    def recenter(self):
+        self.neutral = None; self._calibration = []; self.smoothed = None
+        self.release()
+        logging.info("Blicksteuerung: Neutralposition wird neu erfasst...")
+
+    def update(self, offset, now):
+        ox, oy = float(offset[0]), float(offset[1])
+        if self.neutral is None:
+            self._calibration.append((ox, oy))
+            if len(self._calibration) < GAZE_CALIBRATION_FRAMES: return None
+            n = len(self._calibration)
+            self.neutral = (sum(p[0] for p in self._calibration) / n, sum(p[1] for p in self._calibration) / n)
+            logging.info(f"Blicksteuerung: Neutralposition ({self.neutral[0]:+.3f}, {self.neutral[1]:+.3f}) erfasst.")
+            return None
+        rx, ry = ox - self.neutral[0], (oy - self.neutral[1]) * GAZE_VERTICAL_GAIN
+        if self.smoothed is None or self._last_t is None:
+            self.smoothed = (rx, ry)
+        else:
+            alpha = 1.0 - math.exp(-max(0.0, now - self._last_t) / self.smoothing_s) if self.smoothing_s > 0 else 1.0
+            sx, sy = self.smoothed
+            self.smoothed = (sx + alpha * (rx - sx), sy + alpha * (ry - sy))
+        self._last_t = now
+        if self.mode == GAZE_MODE_CURSOR: self._apply_cursor()
+        elif self.mode == GAZE_MODE_KEYS: self._apply_keys()
+        return self.smoothed
+
+    def _apply_cursor(self):
+        sx, sy = self.smoothed
+        x = min(max(self.screen_w * 0.5 * (1.0 + sx * self.gain), 0), self.screen_w - 1)
+        y = min(max(self.screen_h * 0.5 * (1.0 + sy * self.gain), 0), self.screen_h - 1)
+        cursor = (int(x), int(y))
+        if cursor != self._last_cursor:
+            self.actuator.move_to(*cursor); self._last_cursor = cursor
+
+    def _apply_keys(self):
+        sx, sy = self.smoothed
+        for direction, value in (('right', sx), ('left', -sx), ('down', sy), ('up', -sy)):
+            key = GAZE_DIRECTION_KEYS[direction]
+            if key in self.held_directions:
+                if value < GAZE_KEY_OFF:
+                    self.actuator.keyUp(key); self.held_directions.discard(key)
+            elif value > GAZE_KEY_ON:
+                self.actuator.keyDown(key); self.held_directions.add(key)
+
+    def release(self):
+        for key in list(self.held_directions):
+            try: self.actuator.keyUp(key)
+            except Exception as e: logging.warning(f"Fehler keyUp('{key}') (Blicksteuerung): {e}")
+        self.held_directions.clear()
+        self.smoothed = None; self._last_t = None
+
+
+ACTUATOR_BACKENDS = {
+    'pydirectinput': PyDirectInputActuator,
+    'uinput': LinuxInputActuator,
+    'null': NullActuator,
+}
+
+
+def create_actuator(backend="auto", record=False):
+    actuator = None
+    if backend == "auto":
+        for candidate in ('pydirectinput', 'uinput'):
+            try: actuator = ACTUATOR_BACKENDS[candidate](); break
+            except Exception as e: logging.info(f"Tastenausgabe '{candidate}' nicht nutzbar: {e}")
+        if actuator is None:
+            logging.warning("Keine Tastenausgabe verfügbar. Verwende Null-Backend (keine Tastendrücke).")
+            actuator = NullActuator()
+    else:
+        actuator = ACTUATOR_BACKENDS[backend]()
+    logging.info(f"Tastenausgabe-Backend: {actuator.name}")
+    return RecordingActuator(actuator) if record else actuator
+
+
+class EarTrend:
+    __slots__ = ('t', 'ear', 'prev_t', 'prev_ear', 'velocity', 'accel')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.t = self.prev_t = None
+        self.ear = self.prev_ear = self.velocity = self.accel = 0.0
+
+    def update(self, ear, now):
+        if self.t is None or not 0.0 < now - self.t <= PREDICT_MAX_GAP_MS / 1000.0:
+            self.reset()
+        elif self.prev_t is None:
+            self.velocity = (ear - self.ear) / (now - self.t)
+        else:
+            slope = (ear - self.ear) / (now - self.t)
+            self.accel = 2.0 * (slope - (self.ear - self.prev_ear) / (self.t - self.prev_t)) / (now - self.prev_t)
+            self.velocity = slope + 0.5 * self.accel * (now - self.t)
+        self.prev_t, self.prev_ear, self.t, self.ear = self.t, self.ear, now, ear
+
+    def projected(self, horizon_s):
+        return self.ear + self.velocity * horizon_s + 0.5 * max(0.0, self.accel) * horizon_s * horizon_s
+
+    def predicts_closure(self, ear_close, ear_open, horizon_s):
+        return self.ear < ear_open and self.velocity < -PREDICT_MIN_VELOCITY and self.projected(horizon_s) < ear_close
+
+
+class BlinkStateMachine:
+    def __init__(self, key_output, ear_close=DEFAULT_EAR_CLOSE, ear_open=DEFAULT_EAR_OPEN, metrics=None, pulse_ms=KEY_PULSE_MS, both_eyes_action=True,
+                 min_closed_ms=BLINK_MIN_CLOSED_MS, min_open_ms=BLINK_MIN_OPEN_MS, debounce_ms=BLINK_DEBOUNCE_MS, predict_ms=0):
+        self.keys = key_output
+        self.both_eyes_action = both_eyes_action
+        self.ear_close, self.ear_open = ear_close, ear_open
+        self.metrics = metrics
+        self.pulse_ms = pulse_ms
+        self.min_closed_ms, self.min_open_ms, self.debounce_ms = min_closed_ms, min_open_ms, debounce_ms
+        self.predict_ms = predict_ms
+        self._trends = (EarTrend(), EarTrend())
+        self.face_detected = False
+        self.left_ear = self.right_ear = 0.0
+        self.reset()
+
+    def reset(self):
+        self.left_closed = self.right_closed = self.both_were_closed = False
+        self.x_key_down = self.c_key_down = False
+        self.pulse_until = None
+        self._changed_at = [float('-inf'), float('-inf')]
+        self._pending_since = [None, None]
+        self._predicted_at = [None, None]
+        self._changed_before_prediction = [float('-inf'), float('-inf')]
+        for trend in self._trends: trend.reset()
+
+    def _key_event(self):
+        if self.metrics is not None: self.metrics.record_key_event()
+
+    def _eye_state(self, eye, closed, ear, now):
+        predicting = self.predict_ms > 0
+        if predicting:
+            predicted_at = self._predicted_at[eye]
+            if predicted_at is not None:
+                if ear < self.ear_close:
+                    self._predicted_at[eye] = None
+                    if self.metrics is not None: self.metrics.record_prediction(True)
+                elif ear > self.ear_open or self._prediction_expired(eye, (now - predicted_at) * 1000.0):
+                    logging.debug(f"Vorhersage {'links' if eye == 0 else 'rechts'} nicht bestätigt, verwerfe (EAR {ear:.3f}).")
+                    self._predicted_at[eye] = self._pending_since[eye] = None
+                    # Zustand vor der Vorhersage wiederherstellen, keine neue Mindest-Offen-Zeit
+                    self._changed_at[eye] = self._changed_before_prediction[eye]
+                    if self.metrics is not None: self.metrics.record_prediction(False)
+                    return False
+        raw = not ear > self.ear_open if closed else ear < self.ear_close
+        if predicting and not closed and not raw:
+            other, horizon_s = self._trends[1 - eye], self.predict_ms / 1000.0
+            raw = self._trends[eye].predicts_closure(self.ear_close, self.ear_open, horizon_s)
+            if raw and other.velocity < -0.5 * PREDICT_MIN_VELOCITY and not other.ear < self.ear_close:
+                raw = other.predicts_closure(self.ear_close, self.ear_open, horizon_s)
+        if raw == closed:
+            self._pending_since[eye] = None
+            return closed
+        if self._pending_since[eye] is None: self._pending_since[eye] = now
+        hold_ms = self.min_closed_ms if closed else self.min_open_ms
+        if (now - self._changed_at[eye]) * 1000.0 < hold_ms or (now - self._pending_since[eye]) * 1000.0 < self.debounce_ms:
+            return closed
+        self._pending_since[eye] = None
+        if raw and not ear < self.ear_close:
+            self._predicted_at[eye] = now
+            self._changed_before_prediction[eye] = self._changed_at[eye]
+        self._changed_at[eye] = now
+        return raw
+
+    def _prediction_expired(self, eye, age_ms):
+        # Langsames Schließen: solange das EAR noch fällt, weiter auf die Bestätigung warten
+        if age_ms > PREDICT_CONFIRM_MAX_MS: return True
+        return age_ms > PREDICT_CONFIRM_MS and not self._trends[eye].velocity < 0.0
+
+    def tick(self, now=None):
+        if self.pulse_until is None: return
+        if now is None: now = time.monotonic()
+        if now < self.pulse_until: return
+        self.pulse_until = None
+        try:
+            if self.x_key_down: self.keys.keyUp('x'); self.x_key_down = False
+            if self.c_key_down: self.keys.keyUp('c'); self.c_key_down = False
+            logging.debug("Puls X & C beendet.")
+        except Exception as e: logging.error(f"Fehler beim Beenden des X & C Pulses: {e}")
+
+    def release_keys(self, context=None):
+        if self.x_key_down:
+            try:
+                self.keys.keyUp('x')
+                if context: logging.info(f"{context}: Löse 'x'.")
+            except Exception as e: logging.warning(f"Fehler keyUp('x') ({context}): {e}")
+            self.x_key_down = False
+        if self.c_key_down:
+            try:
+                self.keys.keyUp('c')
+                if context: logging.info(f"{context}: Löse 'c'.")
+            except Exception as e: logging.warning(f"Fehler keyUp('c') ({context}): {e}")
+            self.c_key_down = False
+        self.pulse_until = None
+
+    def set_face_detected(self, detected):
+        if detected == self.face_detected: return False
+        self.face_detected = detected
+        if not detected:
+            logging.info("Gesicht verloren.")
+            self.release_keys("Gesichtsverlust")
+            self.reset()
+            self.left_ear = self.right_ear = 0.0
+        else:
+            logging.info("Gesicht gefunden.")
+            self.reset()
+        return True
+
+    def update(self, left_ear, right_ear, now=None):
+        if now is None: now = time.monotonic()
+        self.left_ear, self.right_ear = left_ear, right_ear
+        keys = self.keys
+        try:
+            self.tick(now)
+            if self.predict_ms > 0:
+                self._trends[0].update(left_ear, now); self._trends[1].update(right_ear, now)
+            is_left_now = self._eye_state(0, self.left_closed, left_ear, now)
+            is_right_now = self._eye_state(1, self.right_closed, right_ear, now)
+
+            both_closed_now = is_left_now and is_right_now
+
+            if both_closed_now != self.both_were_closed:
+                try:
+                    if self.x_key_down: keys.keyUp('x'); self.x_key_down = False; logging.debug("Beide Augen Wechsel: Löse 'x'.")
+                    if self.c_key_down: keys.keyUp('c'); self.c_key_down = False; logging.debug("Beide Augen Wechsel: Löse 'c'.")
+                    self.pulse_until = None
+
+                    if not self.both_eyes_action:
+                        logging.debug("Beide Augen Wechsel ignoriert (normales Blinzeln).")
+                    elif both_closed_now:
+                        logging.info("BEIDE AUGEN GESCHLOSSEN -> Drücke X & C")
+                        keys.keyDown('x'); self.x_key_down = True
+                        keys.keyDown('c'); self.c_key_down = True; self._key_event()
+                        self.pulse_until = now + self.pulse_ms / 1000.0
+                        self.tick(now)
+                    else:
+                        logging.info("BEIDE AUGEN GEÖFFNET (von geschlossen) -> Drücke X")
+                        keys.press('x'); self._key_event()
+
+                except Exception as e: logging.error(f"Fehler Tastenausgabe bei 'beide Augen' Wechsel: {e}")
+                self.both_were_closed = both_closed_now
+
+            if is_left_now and not is_right_now:
+                if not self.x_key_down:
+                    if self.c_key_down:
+                        try: keys.keyUp('c'); self.c_key_down = False; logging.debug("Wechsel zu Links: Löse 'c'.")
+                        except Exception as e: logging.error(f"Fehler keyUp('c') beim Wechsel zu links: {e}")
+                    try:
+                        logging.info("NUR LINKS GESCHLOSSEN -> Halte X")
+                        keys.keyDown('x'); self.x_key_down = True; self._key_event()
+                    except Exception as e: logging.error(f"Fehler keyDown('x'): {e}")
+
+            elif is_right_now and not is_left_now:
+                if not self.c_key_down:
+                    if self.x_key_down:
+                        try: keys.keyUp('x'); self.x_key_down = False; logging.debug("Wechsel zu Rechts: Löse 'x'.")
+                        except Exception as e: logging.error(f"Fehler keyUp('x') beim Wechsel zu rechts: {e}")
+                    try:
+                        logging.info("NUR RECHTS GESCHLOSSEN -> Halte C")
+                        keys.keyDown('c'); self.c_key_down = True; self._key_event()
+                    except Exception as e: logging.error(f"Fehler keyDown('c'): {e}")
+
+            elif not is_left_now and not is_right_now:
+                if self.x_key_down:
+                    try: keys.keyUp('x'); self.x_key_down = False; logging.info("Beide Augen offen: Löse 'x'.")
+                    except Exception as e: logging.error(f"Fehler keyUp('x'): {e}")
+                if self.c_key_down:
+                    try: keys.keyUp('c'); self.c_key_down = False; logging.info("Beide Augen offen: Löse 'c'.")
+                    except Exception as e: logging.error(f"Fehler keyUp('c'): {e}")
+
+            self.left_closed = is_left_now
+            self.right_closed = is_right_now
+
+        except Exception as e:
+            logging.error(f"Fehler bei EAR/Keypress Verarbeitung: {e}", exc_info=True)
+            self.release_keys()
+
+
+class EarRingBuffer:
+    def __init__(self, capacity=SPARKLINE_CAPACITY):
+        self.capacity = capacity
+        self._data = np.full((capacity, 3), np.nan)
+        self.count = 0
+        # Tracking-Thread schreibt, Tk-Thread liest; ohne Sperre könnte window() eine halb überschriebene Zeile sehen
+        self._lock = threading.Lock()
+
+    def append(self, t, left_ear, right_ear):
+        with self._lock:
+            row = self._data[self.count % self.capacity]
+            row[1] = left_ear; row[2] = right_ear; row[0] = t
+            self.count += 1
+
+    def window(self, since):
+        with self._lock:
+            count = self.count
+            n = min(count, self.capacity)
+            rows = self._data[np.arange(count - n, count) % self.capacity]
+        rows = rows[rows[:, 0] >= since]
+        return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+def sparkline_coords(t, values, t_end, width, height, window_s=SPARKLINE_WINDOW_S, ear_max=SPARKLINE_EAR_MAX, max_points=SPARKLINE_MAX_POINTS):
+    valid = ~np.isnan(values)
+    t, values = t[valid], values[valid]
+    if len(t) > max_points:
+        # Minimum je Abschnitt, damit kurze Blinzler beim Ausdünnen sichtbar bleiben
+        starts = np.linspace(0, len(t), max_points, endpoint=False).astype(np.intp)
+        t, values = t[starts], np.minimum.reduceat(values, starts)
+    coords = np.empty((len(t), 2))
+    coords[:, 0] = width - (t_end - t) / window_s * width
+    coords[:, 1] = height - 1 - np.clip(values / ear_max, 0.0, 1.0) * (height - 2)
+    return coords.ravel().tolist()
+
+
+class EarSparkline:
+    def __init__(self, canvas, left_color, right_color, close_color, open_color):
+        self.canvas = canvas
+        self._close_line = canvas.create_line(0, 0, 0, 0, fill=close_color, dash=(3, 3))
+        self._open_line = canvas.create_line(0, 0, 0, 0, fill=open_color, dash=(3, 3))
+        self._left = canvas.create_line(0, 0, 0, 0, fill=left_color, width=1.5)
+        self._right = canvas.create_line(0, 0, 0, 0, fill=right_color, width=1.5)
+        self._drawn = (None,) * 5
+
+    def render(self, history, now, ear_close, ear_open):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        key = (history.count, width, height, ear_close, ear_open)
+        if key == self._drawn or width < 10 or height < 10: return False
+        if key[1:] != self._drawn[1:]:
+            for item, ear in ((self._close_line, ear_close), (self._open_line, ear_open)):
+                y = height - 1 - min(ear / SPARKLINE_EAR_MAX, 1.0) * (height - 2)
+                self.canvas.coords(item, 0, y, width, y)
+        t, left, right = history.window(now - SPARKLINE_WINDOW_S)
+        for item, values in ((self._left, left), (self._right, right)):
+            coords = sparkline_coords(t, values, now, width, height)
+            self.canvas.coords(item, *(coords if len(coords) >= 4 else (0, 0, 0, 0)))
+        self._drawn = key
+        return True
+
+
+class EyeStateSnapshot:
+    __slots__ = ('seq', 'timestamp', 'face_detected', 'left_ear', 'right_ear',
+                 'left_closed', 'right_closed', 'both_closed', 'x_key_down', 'c_key_down')
+
+    def __init__(self, seq=0, timestamp=0.0, face_detected=False, left_ear=0.0, right_ear=0.0,
+                 left_closed=False, right_closed=False, both_closed=False, x_key_down=False, c_key_down=False):
+        self.seq = seq; self.timestamp = timestamp
+        self.face_detected = face_detected
+        self.left_ear = left_ear; self.right_ear = right_ear
+        self.left_closed = left_closed; self.right_closed = right_closed; self.both_closed = both_closed
+        self.x_key_down = x_key_down; self.c_key_down = c_key_down
+
+def get_directshow_camera_names(log=True):
     devices = []
     if not PYGRABBER_AVAILABLE: return devices
     try:
         graph = FilterGraph(); devices = graph.get_input_devices(); del graph
-        logging.info(f"DirectShow Geräte gefunden: {devices}")
+        if log: logging.info(f"DirectShow Geräte gefunden: {devices}")
         return devices
     except Exception as e:
         logging.error(f"Fehler beim Abrufen der DirectShow-Geräte mit pygrabber: {e}", exc_info=False)
         return []
 
+def get_v4l2_camera_names():
+    names = {}
+    if platform.system() != "Linux": return names
+    for path in glob.glob(V4L2_DEVICE_GLOB):
+        try: index = int(path[len(V4L2_DEVICE_GLOB) - 1:])
+        except ValueError: continue
+        try:
+            with open(f"/sys/class/video4linux/video{index}/name", encoding='utf-8') as f: names[index] = f.read().strip()
+        except OSError:
+            names[index] = ""
+    return names
+
+def camera_name_hints(log=False):
+    if platform.system() == "Windows":
+        if log and PYGRABBER_AVAILABLE: logging.info("pygrabber gefunden. Versuche, Kameranamen via DirectShow zu lesen.")
+        elif log: logging.warning("pygrabber nicht gefunden (pip install pygrabber). Fallback auf generische Kameranamen.")
+        return dict(enumerate(get_directshow_camera_names(log))) if PYGRABBER_AVAILABLE else None
+    if platform.system() == "Linux" and os.path.isdir("/sys/class/video4linux"):
+        return get_v4l2_camera_names()
+    if log: logging.info("Keine Quelle für Kameranamen auf diesem System. Verwende generische Kameranamen.")
+    return None
+
+def probe_camera(index):
+    backend = cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened(): cap = cv2.VideoCapture(index)
+    try: return cap.isOpened()
+    finally: cap.release()
+
+def unique_camera_name(name, existing):
+    original_name = name; count = 1
+    while name in existing:
+        name = f"{original_name} ({count})"; count += 1
+    return name
+
 def find_available_cameras(max_cameras_to_check=5):
     cam_generic_name = EyeTrackerApp.translations[EyeTrackerApp.current_language].get('cam_generic_name', "Kamera {}")
 
     available_cameras = {}
-    camera_names_dshow = get_directshow_camera_names()
+    name_hints = camera_name_hints(log=True) or {}
     logging.info("Suche nach verfügbaren Kameras...")
     for i in range(max_cameras_to_check):
-        backend = cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY
-        cap = cv2.VideoCapture(i, backend)
-        if not cap.isOpened(): cap = cv2.VideoCapture(i)
-        if cap.isOpened():
+        if probe_camera(i):
             display_name = cam_generic_name.format(i)
-            if i < len(camera_names_dshow) and camera_names_dshow[i]:
-                display_name = camera_names_dshow[i].strip()
-                logging.info(f"  Gefunden: '{display_name}' (Index {i}, via DirectShow).")
+            if name_hints.get(i):
+                display_name = name_hints[i].strip()
+                logging.info(f"  Gefunden: '{display_name}' (Index {i}, Gerätename).")
             else:
                 logging.info(f"  Gefunden: '{display_name}' (Index {i}, generisch).")
-            original_display_name = display_name; count = 1
-            while display_name in available_cameras:
-                 display_name = f"{original_display_name} ({count})"; count += 1
-            available_cameras[display_name] = i
-            cap.release()
+            available_cameras[unique_camera_name(display_name, available_cameras)] = i
         else:
             if i > 0 and not available_cameras: break
             elif i >= 2 and not available_cameras: break
@@ -112,6 +2152,606 @@ def find_available_cameras(max_cameras_to_check=5):
     return available_cameras
 
 
+class CameraHotplugWatcher:
+    def __init__(self, known_indices, on_change, busy_indices=lambda: set(),
+                 interval=CAMERA_WATCH_INTERVAL_S, probe_interval=CAMERA_WATCH_PROBE_INTERVAL_S, max_index=CAMERA_WATCH_MAX_INDEX):
+        self.on_change = on_change
+        self.busy_indices = busy_indices
+        self.interval, self.probe_interval, self.max_index = interval, probe_interval, max_index
+        self.known = set(known_indices)
+        self.rejected = {}
+        self._last_hints = camera_name_hints()
+        if self._last_hints is not None:
+            self.rejected = {i: (name, CAMERA_WATCH_PROBE_RETRIES - 1) for i, name in self._last_hints.items() if i not in self.known}
+        self._last_probe = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        mode = "Geräteliste" if self._last_hints is not None else f"Abfrage alle {self.probe_interval:.0f} s"
+        logging.info(f"Kamera-Hotplug-Überwachung gestartet ({mode}).")
+        self._thread = threading.Thread(target=self._run, name="CameraWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout=2.0); self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try: self.check()
+            except Exception as e: logging.error(f"Fehler in Kamera-Überwachung: {e}", exc_info=True)
+
+    def check(self):
+        busy = set(self.busy_indices())
+        hints = camera_name_hints()
+        if hints is None:
+            now = time.monotonic()
+            if now - self._last_probe < self.probe_interval: return
+            self._last_probe = now
+            candidates = set(range(self.max_index)) | self.known
+            present = {i for i in candidates - busy if probe_camera(i)}
+            added = present - self.known
+            removed = (self.known - busy) - present
+            hints = {}
+        else:
+            added, removed = set(), set()
+            last_hints = self._last_hints or {}
+            for i in (self.known | set(self.rejected)) - busy:
+                if i in self.known:
+                    if i not in hints or (i in last_hints and hints[i] != last_hints[i]): removed.add(i)
+                elif i not in hints or hints[i] != self.rejected[i][0]:
+                    self.rejected.pop(i, None)
+            for i in set(hints) - (self.known - removed) - busy:
+                name, attempts = self.rejected.get(i, (hints[i], 0))
+                if attempts >= CAMERA_WATCH_PROBE_RETRIES: continue
+                if probe_camera(i):
+                    added.add(i); self.rejected.pop(i, None)
+                else:
+                    self.rejected[i] = (name, attempts + 1)
+            self._last_hints = hints
+        for i in sorted(removed):
+            self.known.discard(i)
+            logging.info(f"Kamera-Hotplug: Index {i} entfernt.")
+            self.on_change('removed', i, None)
+        for i in sorted(added):
+            self.known.add(i)
+            logging.info(f"Kamera-Hotplug: Index {i} hinzugefügt ('{hints.get(i, '')}').")
+            self.on_change('added', i, hints.get(i, "").strip())
+
+
+def default_profile():
+    return {'ear_close': DEFAULT_EAR_CLOSE, 'ear_open': DEFAULT_EAR_OPEN, 'cam_width': DEFAULT_CAM_WIDTH, 'cam_height': DEFAULT_CAM_HEIGHT,
+            'cam_fps': DEFAULT_CAM_FPS, 'process_interval': DEFAULT_PROCESS_INTERVAL, 'cpu_budget': DEFAULT_CPU_BUDGET_PERCENT,
+            'inference_width': DEFAULT_INFERENCE_WIDTH, 'optical_flow': False, 'face_policy': FACE_POLICY_LARGEST, 'keys': dict(DEFAULT_KEY_MAPPING)}
+
+
+def validate_profile(raw):
+    values, errors = default_profile(), []
+
+    def number(key, cast, label, valid, invalid_text):
+        if key not in raw: return
+        try: value = cast(raw[key])
+        except (TypeError, ValueError):
+            errors.append(f"{label} muss {'eine ganze Zahl' if cast is int else 'eine Zahl'} sein."); return
+        if not valid(value): errors.append(invalid_text)
+        else: values[key] = value
+
+    try:
+        ear_close = float(raw.get('ear_close', values['ear_close'])); ear_open = float(raw.get('ear_open', values['ear_open']))
+        if not (0 < ear_close < ear_open < 1.0): errors.append("EAR Schwellenwerte ungültig (Bedingung: 0 < CLOSE < OPEN < 1.0)")
+        else: values['ear_close'], values['ear_open'] = ear_close, ear_open
+    except (TypeError, ValueError): errors.append("EAR Schwellenwerte müssen Zahlen sein (z.B. 0.17).")
+    number('cam_width', int, "Kamera Breite", lambda v: v > 0, "Kamera Breite muss > 0 sein.")
+    number('cam_height', int, "Kamera Höhe", lambda v: v > 0, "Kamera Höhe muss > 0 sein.")
+    number('cam_fps', int, "Kamera FPS", lambda v: v > 0, "Kamera FPS muss > 0 sein.")
+    number('process_interval', int, "Verarbeitungsintervall", lambda v: v > 0, "Verarbeitungsintervall muss > 0 sein.")
+    number('cpu_budget', float, "CPU-Budget", lambda v: 0 <= v <= 100, "CPU-Budget muss zwischen 0 und 100 liegen.")
+    number('inference_width', int, "Inferenz-Breite", lambda v: v >= 0, "Inferenz-Breite muss >= 0 sein (0 = Kameraauflösung).")
+    if 'optical_flow' in raw:
+        if isinstance(raw['optical_flow'], bool): values['optical_flow'] = raw['optical_flow']
+        else: errors.append("optical_flow muss true oder false sein.")
+    if 'face_policy' in raw:
+        if raw['face_policy'] in FACE_POLICIES: values['face_policy'] = raw['face_policy']
+        else: errors.append("Ungültige Gesichtsauswahl.")
+    if 'keys' in raw:
+        keys = raw['keys']
+        if not isinstance(keys, dict) or any(k not in DEFAULT_KEY_MAPPING for k in keys) or not all(isinstance(v, str) and v.strip() for v in keys.values()):
+            errors.append(f"Tastenbelegung ungültig (erlaubt: {', '.join(DEFAULT_KEY_MAPPING)} -> Tastenname).")
+        else: values['keys'].update({k: v.strip().lower() for k, v in keys.items()})
+    return values, errors
+
+
+class SettingsStore:
+    def __init__(self, path=SETTINGS_FILE, profile=None):
+        self.path = path
+        self.pinned_profile = profile
+        self.profile_name = profile or DEFAULT_PROFILE_NAME
+        self.data = {'active': self.profile_name, 'profiles': {}}
+        self._stamp = None
+        # Watcher-Thread lädt, Tk-Thread liest und speichert
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try: st = os.stat(self.path)
+        except OSError: return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self):
+        stamp = self._file_stamp()
+        with self._lock: return stamp != self._stamp
+
+    def load(self):
+        with self._lock:
+            stamp = self._file_stamp()
+            self._stamp = stamp
+            if stamp is not None:
+                with open(self.path, encoding='utf-8') as f: data = json.load(f)
+                if not isinstance(data, dict) or not isinstance(data.get('profiles', {}), dict):
+                    raise ValueError("Erwartet: {\"active\": NAME, \"profiles\": {NAME: {...}}}")
+                self.data = {'active': str(data.get('active', DEFAULT_PROFILE_NAME)), 'profiles': data.get('profiles', {})}
+            self.profile_name = self.pinned_profile or self.data['active']
+            return self.profile_name, self.data['profiles'].get(self.profile_name, {})
+
+    def profile_names(self):
+        with self._lock: return sorted(set(self.data['profiles']) | {self.profile_name})
+
+    def raw_profile(self, name):
+        with self._lock: return self.data['profiles'].get(name, {})
+
+    def save_profile(self, name, values):
+        with self._lock:
+            self.profile_name = name
+            if self.pinned_profile is not None: self.pinned_profile = name
+            profiles = dict(self.data['profiles']); profiles[name] = values
+            data = {'active': name, 'profiles': profiles}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.data = data
+            self._stamp = self._file_stamp()
+
+
+class SettingsFileWatcher:
+    def __init__(self, store, on_change, interval=SETTINGS_WATCH_INTERVAL_S):
+        self.store = store
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        logging.info(f"Überwache Einstellungsdatei '{self.store.path}' (alle {self.interval:.1f} s).")
+        self._thread = threading.Thread(target=self._run, name="SettingsWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout=2.0); self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.store.changed(): continue
+            detected_at = time.monotonic()
+            try: name, raw = self.store.load()
+            except (OSError, ValueError) as e:
+                logging.error(f"Einstellungsdatei '{self.store.path}' ungültig, behalte aktuelle Werte: {e}"); continue
+            logging.info(f"Einstellungsdatei geändert, wende Profil '{name}' an...")
+            self.on_change(name, raw, detected_at)
+
+
+class EngineConfig:
+    def __init__(self, **values):
+        self.__dict__.update(default_profile())
+        self.max_faces = DEFAULT_MAX_FACES
+        self.gaze_mode = GAZE_MODE_OFF
+        self.min_closed_ms, self.min_open_ms, self.debounce_ms = BLINK_MIN_CLOSED_MS, BLINK_MIN_OPEN_MS, BLINK_DEBOUNCE_MS
+        self.predict_ms = 0
+        self.overlay = True
+        self.screen_size = (1920, 1080)
+        self.update(values)
+
+    def update(self, values):
+        for key, value in values.items():
+            if key not in self.__dict__: raise TypeError(f"Unbekannte Einstellung: {key}")
+            setattr(self, key, value)
+
+    def profile(self):
+        values = {key: getattr(self, key) for key in default_profile()}
+        values['keys'] = dict(self.keys)
+        return values
+
+
+class EngineEvent:
+    __slots__ = ('kind', 'timestamp', 'data')
+
+    def __init__(self, kind, timestamp, data=None):
+        self.kind, self.timestamp, self.data = kind, timestamp, data
+
+    def __repr__(self):
+        return f"EngineEvent({self.kind!r}, {self.timestamp:.3f}, {self.data!r})"
+
+
+class TrackerEngine:
+    def __init__(self, config=None, actuator=None, metrics=None, publisher=None, frame_callback=None):
+        self.config = config if config is not None else EngineConfig()
+        self.actuator = actuator if actuator is not None else NullActuator()
+        self.key_mapper = KeyMappingActuator(self.actuator, self.config.keys)
+        self.metrics = metrics if metrics is not None else TrackerMetrics()
+        self.publisher = publisher
+        self.frame_callback = frame_callback
+        self.state = EyeStateSnapshot()
+        self.running = False
+        self.camera_index = None
+        self.camera_reconnecting = False
+        self.gaze_recenter_requested = False
+        self._face_mesh = None
+        self._thread = None
+        self._channel = None
+        self._listeners = ()
+
+    def load_model(self):
+        if self._face_mesh is None:
+            logging.info("Initialisiere Mediapipe FaceMesh (CPU)...")
+            self._face_mesh = mp_face_mesh.FaceMesh(max_num_faces=max(1, self.config.max_faces), refine_landmarks=True,
+                                                    min_detection_confidence=0.5, min_tracking_confidence=0.5)
+            logging.info("Mediapipe FaceMesh initialisiert.")
+        return self._face_mesh
+
+    def add_listener(self, callback):
+        self._listeners = self._listeners + (callback,)
+        return callback
+
+    def remove_listener(self, callback):
+        self._listeners = tuple(listener for listener in self._listeners if listener is not callback)
+
+    def _emit(self, kind, data=None, timestamp=None):
+        listeners = self._listeners
+        if not listeners: return
+        event = EngineEvent(kind, time.monotonic() if timestamp is None else timestamp, data)
+        for listener in listeners:
+            try: listener(event)
+            except Exception as e: logging.error(f"Fehler in Engine-Listener: {e}", exc_info=True)
+
+    async def events(self, kinds=None, maxsize=ENGINE_EVENT_QUEUE_SIZE):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue(maxsize)
+
+        def put(event):
+            # Langsamer Konsument: ältestes Ereignis verwerfen, der Tracking-Thread wartet nie
+            if events.full(): events.get_nowait()
+            events.put_nowait(event)
+
+        def listener(event):
+            if kinds is None or event.kind in kinds or event.kind == ENGINE_EVENT_CLOSED:
+                loop.call_soon_threadsafe(put, event)
+
+        self.add_listener(listener)
+        try:
+            while True:
+                event = await events.get()
+                if event.kind == ENGINE_EVENT_CLOSED: return
+                yield event
+        finally:
+            self.remove_listener(listener)
+
+    def start(self, camera_index=0, camera_name=None):
+        if self.running: return False
+        self.load_model()
+        camera_name = camera_name or f"Kamera {camera_index}"
+        logging.info(f"Starte Tracking für '{camera_name}' (Index {camera_index})...")
+        self.state = EyeStateSnapshot()
+        self.running = True
+        self.camera_index = camera_index
+        self._channel = CaptureChannel()
+        self._thread = threading.Thread(target=self._run, args=(camera_index, camera_name, self._channel), name=f"TrackingThread-{camera_index}", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=THREAD_JOIN_TIMEOUT_S):
+        if not self.running: return False
+        stop_t0 = time.perf_counter()
+        self.running = False
+        if self._channel is not None: self._channel.stop()
+        logging.info(f"Stopp-Anfrage an Tracking-Kamera in {(time.perf_counter() - stop_t0) * 1000:.3f} ms gestellt.")
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            logging.info("Warte auf Tracking-Thread...")
+            thread.join(timeout=timeout)
+            if thread.is_alive(): logging.warning("Tracking-Thread nicht beendet.")
+            else: logging.info("Tracking-Thread beendet.")
+        self.actuator.release_all("Stop")
+        self.state = EyeStateSnapshot()
+        self.camera_index = None; self._channel = None
+        return True
+
+    def close(self):
+        self.stop(CLOSE_JOIN_TIMEOUT_S)
+        face_mesh, self._face_mesh = self._face_mesh, None
+        if face_mesh is not None:
+            try:
+                logging.info("Schließe Mediapipe FaceMesh...")
+                face_mesh.close()
+                logging.info("Mediapipe geschlossen.")
+            except Exception as e: logging.warning(f"Fehler beim Schließen von Mediapipe: {e}")
+        self._emit(ENGINE_EVENT_CLOSED)
+
+    def apply_camera_config(self, requested_at=None):
+        channel = self._channel
+        if not self.running or channel is None: return False
+        logging.info("Kameraeinstellungen geändert. Laufende Kamera wird umkonfiguriert.")
+        channel.send(CAPTURE_CMD_CONFIGURE, self.config.cam_width, self.config.cam_height, self.config.cam_fps, requested_at)
+        return True
+
+    def request_gaze_recenter(self):
+        logging.info("Blick zentrieren angefordert.")
+        self.gaze_recenter_requested = True
+
+    def _publish(self, machine, points=None, frame_size=(0, 0)):
+        previous = self.state
+        state = EyeStateSnapshot(previous.seq + 1, time.monotonic(), machine.face_detected, machine.left_ear, machine.right_ear,
+                                 machine.left_closed, machine.right_closed, machine.both_were_closed, machine.x_key_down, machine.c_key_down)
+        self.state = state
+        if self.publisher is not None: self.publisher.publish(state, points, frame_size)
+        if not self._listeners: return
+        t = state.timestamp
+        if state.face_detected != previous.face_detected: self._emit(ENGINE_EVENT_FACE_FOUND if state.face_detected else ENGINE_EVENT_FACE_LOST, None, t)
+        for side, closed, was_closed in (('left', state.left_closed, previous.left_closed), ('right', state.right_closed, previous.right_closed)):
+            if closed != was_closed: self._emit(ENGINE_EVENT_EYE_CLOSED if closed else ENGINE_EVENT_EYE_OPENED, side, t)
+        for key, down, was_down in (('x', state.x_key_down, previous.x_key_down), ('c', state.c_key_down, previous.c_key_down)):
+            if down != was_down: self._emit(ENGINE_EVENT_KEY_DOWN if down else ENGINE_EVENT_KEY_UP, key, t)
+        self._emit(ENGINE_EVENT_STATE, state, t)
+
+    def _emit_frame(self, frame, preview_due):
+        callback = self.frame_callback
+        if callback is not None: callback(frame, preview_due)
+
+    def _run(self, camera_index, camera_name, channel):
+        logging.info(f"Tracking-Worker für '{camera_name}' gestartet.")
+        config = self.config
+        face_mesh = self._face_mesh
+        cap = None
+        error_logged = False
+        gaze_cursor = config.gaze_mode == GAZE_MODE_CURSOR
+        machine = BlinkStateMachine(ClickMappingActuator(self.actuator) if gaze_cursor else self.key_mapper, config.ear_close, config.ear_open,
+                                    metrics=self.metrics, both_eyes_action=not gaze_cursor, min_closed_ms=config.min_closed_ms,
+                                    min_open_ms=config.min_open_ms, debounce_ms=config.debounce_ms, predict_ms=config.predict_ms)
+        gaze = GazeController(self.actuator, config.gaze_mode, config.screen_size) if config.gaze_mode != GAZE_MODE_OFF else None
+
+        try:
+            logging.info(f"Öffne Tracking-Kamera '{camera_name}'...");
+            cap, actual = open_camera(camera_index, config.cam_width, config.cam_height, config.cam_fps)
+
+            if cap is not None:
+                 actual_w, actual_h, actual_fps = actual
+                 logging.info(f"Tracking-Kamera '{camera_name}' offen. Angefordert: {config.cam_width}x{config.cam_height} @{config.cam_fps}FPS. Tatsächlich: {actual_w}x{actual_h} @{actual_fps:.2f}FPS")
+                 self.metrics.record_camera_open()
+            else:
+                logging.error(f"FEHLER Öffnen Tracking '{camera_name}'!")
+                self._emit(ENGINE_EVENT_CAMERA_FAILED, camera_name)
+                return
+
+            logging.info("Starte Tracking Loop...");
+            frame_skip_counter = 0
+            preview_counter = 0
+            governor = CpuGovernor(config.cpu_budget, actual_w, actual_h, config.process_interval, actual_fps)
+            tuning = governor.current
+            capture_size = (actual_w, actual_h)
+            supervisor = CameraReconnectSupervisor()
+            face_tracker = FaceTracker(config.face_policy)
+            scaler = InferenceScaler(config.inference_width)
+            flow = EyeFlowTracker()
+            publish_landmarks = self.publisher is not None and self.publisher.landmarks
+            if scaler.width > 0: logging.info(f"Inferenz-Auflösung: {'x'.join(map(str, scaler.target_size(*capture_size)))} bei Aufnahme {capture_size[0]}x{capture_size[1]}.")
+            supervisor.on_frame(time.monotonic())
+            self._publish(machine)
+
+            while self.running:
+                frame_original = None; current_time = time.monotonic()
+
+                try:
+                     success = False; frame_original = None; camera_lost = False
+                     stop_requested = camera_failed = False
+                     for command, args in channel.pending():
+                         if command == CAPTURE_CMD_STOP: stop_requested = True
+                         elif command == CAPTURE_CMD_CONFIGURE and cap is not None:
+                             cap, actual = reconfigure_camera(cap, camera_index, *args[:3], capture_size, "Tracking", camera_name, args[3])
+                             if cap is None: camera_failed = True; break
+                             actual_w, actual_h, actual_fps = actual
+                             governor.set_base(actual_w, actual_h, config.process_interval, actual_fps)
+                             tuning = governor.current
+                             capture_size = (actual_w, actual_h)
+                             if capture_size != (tuning.width, tuning.height):
+                                 capture_size = self._set_tracking_resolution(cap, tuning.width, tuning.height, capture_size)
+                     if camera_failed:
+                         # Kamera nach Umkonfiguration verloren: Worker beenden statt neu verbinden, restliche Befehle sind hinfällig
+                         for command, _ in channel.pending(): logging.info(f"Verwerfe Kamera-Befehl '{command}' (Tracking-Kamera verloren).")
+                         self._emit(ENGINE_EVENT_CAMERA_FAILED, camera_name)
+                         break
+                     if stop_requested or not self.running: break
+                     if cap is None or not cap.isOpened():
+                         logging.warning(f"Tracking-Kamera '{camera_name}' wurde unerwartet geschlossen.")
+                         camera_lost = True
+                     else:
+                         success, frame_original = cap.read()
+
+                     if camera_lost or not success or frame_original is None or frame_original.size == 0:
+                         if not camera_lost: self.metrics.record_read_failure()
+                         if camera_lost or supervisor.on_failure(time.monotonic()):
+                             cap, actual = self._reconnect_tracking_camera(camera_index, camera_name, supervisor, machine, cap)
+                             if cap is None: break
+                             # Die neu geöffnete Kamera kann einen anderen Modus liefern als vor dem Ausfall
+                             actual_w, actual_h, actual_fps = actual
+                             governor.set_base(actual_w, actual_h, config.process_interval, actual_fps)
+                             tuning = governor.current
+                             capture_size = (actual_w, actual_h)
+                             if capture_size != (tuning.width, tuning.height):
+                                 capture_size = self._set_tracking_resolution(cap, tuning.width, tuning.height, capture_size)
+                             error_logged = False
+                             continue
+                         if not error_logged:
+                             logging.warning(f"Lesefehler oder leerer Frame beim Tracking '{camera_name}'. Warte kurz."); error_logged = True
+                         time.sleep(RECONNECT_READ_RETRY_S); continue
+                     error_logged = False
+                     supervisor.on_frame(current_time)
+                     frame_time = time.monotonic()
+                     self.metrics.record_frame(frame_time)
+                     machine.tick(frame_time)
+
+                     frame_to_show = frame_original
+
+                     if governor.base_interval != config.process_interval:
+                         governor.set_base(governor.base_width, governor.base_height, config.process_interval, governor.cam_fps)
+                     if governor.budget_percent != config.cpu_budget:
+                         governor.set_budget(config.cpu_budget)
+                     if self.key_mapper.mapping != config.keys: self.key_mapper.mapping = dict(config.keys)
+                     if governor.update(current_time) or tuning is not governor.current:
+                         tuning = governor.current
+                         if (tuning.width, tuning.height) != capture_size:
+                             capture_size = self._set_tracking_resolution(cap, tuning.width, tuning.height, capture_size)
+
+                     preview_counter += 1
+                     preview_due = preview_counter >= tuning.preview_every
+                     if preview_due: preview_counter = 0
+
+                     frame_skip_counter += 1
+                     if frame_skip_counter >= tuning.process_interval:
+                         frame_skip_counter = 0
+
+                         if scaler.width != config.inference_width:
+                             scaler.width = config.inference_width
+                             logging.info(f"Inferenz-Auflösung: {'x'.join(map(str, scaler.target_size(*capture_size)))} bei Aufnahme {capture_size[0]}x{capture_size[1]}.")
+                         rgb_frame = scaler.prepare(frame_original)
+                         inference_start = time.perf_counter()
+                         results = face_mesh.process(rgb_frame)
+                         inference_time = time.perf_counter() - inference_start
+
+                         faces = results.multi_face_landmarks
+                         selected_face = None
+                         if faces:
+                             h, w = frame_original.shape[:2]
+                             eye_points = faces_eye_points(faces, w, h, with_iris=(gaze is not None or publish_landmarks) and len(faces[0].landmark) > LEFT_IRIS_CENTER_IDX)
+                             face_ears = batch_calculate_ear(eye_points)
+                             face_tracker.set_policy(config.face_policy)
+                             face_ids, centroids, sizes = face_tracker.update(eye_points, current_time)
+                             selected_face = face_tracker.select(face_ids, centroids, sizes, w, h)
+                         current_face_detected = selected_face is not None
+                         governor.record_inference(inference_time)
+                         self.metrics.record_inference(inference_time, current_face_detected)
+
+                         if machine.set_face_detected(current_face_detected):
+                             governor.on_face_detected(current_face_detected)
+                         if config.optical_flow and current_face_detected: flow.anchor(frame_original, eye_points[selected_face])
+                         elif flow.active: flow.reset()
+
+                         if gaze is not None:
+                             if self.gaze_recenter_requested:
+                                 self.gaze_recenter_requested = False; gaze.recenter()
+                             if current_face_detected and eye_points.shape[2] == 7:
+                                 gaze.update(gaze_offsets(eye_points[selected_face]), current_time)
+                             else:
+                                 gaze.release()
+
+                         if current_face_detected:
+                             face_landmarks = faces[selected_face]
+
+                             if config.overlay and self.frame_callback is not None:
+                                  try:
+                                      draw_face_overlay(frame_to_show, face_landmarks, tuning.overlay_detail)
+                                      if len(faces) > 1: draw_other_faces(frame_to_show, eye_points, selected_face)
+                                  except AttributeError:
+                                      logging.warning("Konnte Overlay nicht zeichnen (mp_drawing Fehler).")
+                                  except Exception as e:
+                                      logging.error(f"Unbekannter Fehler beim Overlay zeichnen: {e}")
+
+                             try:
+                                 left_ear, right_ear = (float(v) for v in face_ears[selected_face])
+                                 machine.ear_close, machine.ear_open = config.ear_close, config.ear_open
+                                 machine.update(left_ear, right_ear, frame_time)
+                             except Exception as e:
+                                logging.error(f"Fehler bei EAR Berechnung: {e}", exc_info=True);
+                                machine.release_keys()
+
+                         self._publish(machine, eye_points[selected_face] if current_face_detected else None, (frame_original.shape[1], frame_original.shape[0]))
+                         self._emit_frame(frame_to_show, preview_due)
+
+                     else:
+                         if flow.active and config.optical_flow and machine.face_detected:
+                             points = flow.propagate(frame_original)
+                             self.metrics.record_flow(points is not None)
+                             if points is not None:
+                                 left_ear, right_ear = (float(v) for v in batch_calculate_ear(points))
+                                 machine.ear_close, machine.ear_open = config.ear_close, config.ear_open
+                                 machine.update(left_ear, right_ear, frame_time)
+                                 if gaze is not None and points.shape[1] == 7: gaze.update(gaze_offsets(points), current_time)
+                                 self._publish(machine, points, (frame_original.shape[1], frame_original.shape[0]))
+                         if not config.overlay: self._emit_frame(frame_to_show, preview_due)
+
+                except Exception as e:
+                    if self.running: logging.error(f"Schwerer Fehler in Tracking-Loop-Body: {e}", exc_info=True)
+                    machine.release_keys()
+                    self._publish(machine)
+                    time.sleep(0.5)
+        finally:
+            logging.info(f"Tracking-Worker '{camera_name}' wird beendet...");
+            machine.release_keys("Worker Ende")
+            if gaze is not None: gaze.release()
+            self.state = EyeStateSnapshot()
+
+            release_camera(cap, "Tracking", camera_name)
+            # Von selbst beendet (Kamera nicht zu öffnen o.ä.): Engine wieder startbar machen
+            unexpected = self.running and self._channel is channel
+            if unexpected:
+                self.running = False
+                self.actuator.release_all("Worker Ende")
+                self._thread = None; self._channel = None; self.camera_index = None
+            logging.info(f"Tracking-Worker '{camera_name}' sauber beendet.")
+            self._emit(ENGINE_EVENT_STOPPED, unexpected)
+
+    def _reconnect_tracking_camera(self, camera_index, camera_name, supervisor, machine, cap):
+        supervisor.begin_outage(time.monotonic())
+        logging.warning(f"Tracking-Kamera '{camera_name}' liefert keine Bilder ({supervisor.failures} Fehlversuche). Löse Tasten und verbinde neu...")
+        machine.set_face_detected(False)
+        machine.release_keys("Kamera-Ausfall")
+        self.camera_reconnecting = True
+        self._publish(machine)
+        self._emit(ENGINE_EVENT_CAMERA_LOST, camera_name)
+        release_camera(cap, "Tracking", camera_name)
+
+        while self.running:
+            delay = supervisor.next_delay()
+            deadline = time.monotonic() + delay
+            while self.running and time.monotonic() < deadline: time.sleep(min(0.05, delay))
+            if not self.running: break
+            cap, actual = open_camera(camera_index, self.config.cam_width, self.config.cam_height, self.config.cam_fps)
+            if cap is not None:
+                success, frame = cap.read()
+                if not success or frame is None or frame.size == 0:
+                    cap.release(); cap = None
+            if cap is None:
+                logging.info(f"Neuverbindung '{camera_name}' Versuch {supervisor.attempts} fehlgeschlagen (Wartezeit {delay:.1f}s).")
+                continue
+            if not self.running:
+                cap.release(); break
+            recovery_s = supervisor.end_outage(time.monotonic())
+            self.metrics.record_camera_open(reopen=True)
+            self.metrics.record_reconnect(recovery_s)
+            self.camera_reconnecting = False
+            self._emit(ENGINE_EVENT_CAMERA_RESTORED, camera_name)
+            logging.info(f"Tracking-Kamera '{camera_name}' wieder verbunden nach {recovery_s:.2f}s ({supervisor.attempts} Versuche, {supervisor.reconnects} Neuverbindungen gesamt). Schwellwerte EAR {machine.ear_close:.3f}/{machine.ear_open:.3f} beibehalten.")
+            return cap, actual
+        self.camera_reconnecting = False
+        return None, None
+
+    def _set_tracking_resolution(self, cap, width, height, current_size):
+        if not cap or not cap.isOpened(): return current_size
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        logging.info(f"CPU-Governor: Tracking-Auflösung {current_size[0]}x{current_size[1]} -> angefordert {width}x{height}, tatsächlich {actual[0]}x{actual[1]}.")
+        return actual
+
+
 class EyeTrackerApp:
     translations = {
         'de': {
@@ -128,6 +2768,16 @@ class EyeTrackerApp:
             'options_frame_title': " Optionen ",
             'preview_toggle_button': "Vorschau",
             'overlay_checkbutton': "Overlay",
+            'stream_checkbutton': "Stream",
+            'sparkline_checkbutton': "EAR-Verlauf",
+            'record_checkbutton': "Aufnahme",
+            'replay_button': "Letzte {} s speichern",
+            'replay_saved_title': "Replay gespeichert",
+            'replay_saved_text': "Gespeichert unter:\n{}",
+            'replay_failed_text': "Das Replay konnte nicht gespeichert werden (siehe Log).",
+            'gaze_recenter_button': "Blick zentrieren",
+            'stream_error_title': "Stream-Fehler",
+            'stream_error_text_template': "MJPEG-Stream konnte nicht auf Port {} gestartet werden:\n{}",
             'advanced_settings_button_tooltip': "Erweiterte Einstellungen",
             'advanced_frame_title': " Erweiterte Einstellungen ",
             'ear_close_label': "EAR Schließen:",
@@ -136,12 +2786,27 @@ class EyeTrackerApp:
             'cam_height_label': "Kamera Höhe:",
             'cam_fps_label': "Kamera FPS (Ziel):",
             'process_interval_label': "Frame Intervall:",
+            'cpu_budget_label': "CPU-Budget (%, 0=aus):",
+            'inference_width_label': "Inferenz-Breite (0=Kamera):",
+            'profile_label': "Profil:",
+            'settings_saved_suffix': "\nGespeichert im Profil '{}'.",
+            'settings_save_error_suffix': "\nProfil konnte nicht gespeichert werden: {}",
+            'face_policy_label': "Gesichtsauswahl:",
+            'face_policy_largest': "Größtes Gesicht",
+            'face_policy_center': "Nächstes zur Bildmitte",
+            'face_policy_locked': "Gesperrte ID",
             'apply_settings_button': "Anwenden & Schließen",
+            'benchmark_button': "Leistung messen",
+            'benchmark_title': "Leistungstest",
+            'benchmark_done_text': "Gewählt: {}x{} @{} FPS, jedes {}. Frame wird analysiert.\nGeschätzt {:.1f} ms pro Frame, CPU {:.0f}%.",
+            'benchmark_unfit_suffix': "\nKeine Einstellung passt ins Budget. Es wurde die sparsamste gewählt.",
+            'benchmark_failed_text': "Der Leistungstest ist fehlgeschlagen (siehe Log).",
             'language_label': "Sprache:",
             'cam_generic_name': "Kamera {}",
             'left_eye_status_prefix': "Links:",
             'right_eye_status_prefix': "Rechts:",
             'searching_face': "Suche Gesicht...",
+            'camera_reconnecting': "Kamera getrennt, verbinde neu...",
             'status_closed': "GESCHLOSSEN",
             'status_open': "OFFEN",
             'ear_label': "EAR:",
@@ -151,7 +2816,7 @@ class EyeTrackerApp:
             'settings_error_prefix': "Einige Eingaben waren ungültig:\n\n",
             'settings_applied_title': "Einstellungen angewendet",
             'settings_applied_text': "Einstellungen wurden übernommen.",
-            'settings_applied_restart_suffix': "\nBitte Tracking/Vorschau neu starten, um Kamera-Änderungen zu aktivieren.",
+            'settings_applied_restart_suffix': "\nDie laufende Kamera wird mit den neuen Werten umkonfiguriert.",
             'camera_error_title': "Kamerafehler",
             'camera_error_text_template': "Kamera '{}' konnte nicht geöffnet werden.",
             'no_camera_warning_title': "Keine Kamera",
@@ -171,6 +2836,16 @@ class EyeTrackerApp:
             'options_frame_title': " Options ",
             'preview_toggle_button': "Preview",
             'overlay_checkbutton': "Overlay",
+            'stream_checkbutton': "Stream",
+            'sparkline_checkbutton': "EAR plot",
+            'record_checkbutton': "Record",
+            'replay_button': "Save last {} s",
+            'replay_saved_title': "Replay saved",
+            'replay_saved_text': "Saved to:\n{}",
+            'replay_failed_text': "Could not save the replay (see log).",
+            'gaze_recenter_button': "Recenter gaze",
+            'stream_error_title': "Stream Error",
+            'stream_error_text_template': "Could not start MJPEG stream on port {}:\n{}",
             'advanced_settings_button_tooltip': "Advanced Settings",
             'advanced_frame_title': " Advanced Settings ",
             'ear_close_label': "EAR Close:",
@@ -179,12 +2854,27 @@ class EyeTrackerApp:
             'cam_height_label': "Camera Height:",
             'cam_fps_label': "Camera FPS (Target):",
             'process_interval_label': "Frame Interval:",
+            'cpu_budget_label': "CPU Budget (%, 0=off):",
+            'inference_width_label': "Inference Width (0=camera):",
+            'profile_label': "Profile:",
+            'settings_saved_suffix': "\nSaved to profile '{}'.",
+            'settings_save_error_suffix': "\nProfile could not be saved: {}",
+            'face_policy_label': "Face selection:",
+            'face_policy_largest': "Largest face",
+            'face_policy_center': "Closest to center",
+            'face_policy_locked': "Locked ID",
             'apply_settings_button': "Apply & Close",
+            'benchmark_button': "Measure performance",
+            'benchmark_title': "Performance test",
+            'benchmark_done_text': "Selected: {}x{} @{} FPS, analysing every frame number {}.\nEstimated {:.1f} ms per frame, CPU {:.0f}%.",
+            'benchmark_unfit_suffix': "\nNo setting fits the budget. The most economical one was selected.",
+            'benchmark_failed_text': "The performance test failed (see log).",
             'language_label': "Language:",
             'cam_generic_name': "Camera {}",
             'left_eye_status_prefix': "Left:",
             'right_eye_status_prefix': "Right:",
             'searching_face': "Searching for face...",
+            'camera_reconnecting': "Camera lost, reconnecting...",
             'status_closed': "CLOSED",
             'status_open': "OPEN",
             'ear_label': "EAR:",
@@ -194,7 +2884,7 @@ class EyeTrackerApp:
             'settings_error_prefix': "Some inputs were invalid:\n\n",
             'settings_applied_title': "Settings Applied",
             'settings_applied_text': "Settings have been applied.",
-            'settings_applied_restart_suffix': "\nPlease restart tracking/preview to activate camera changes.",
+            'settings_applied_restart_suffix': "\nThe running camera is reconfigured with the new values.",
             'camera_error_title': "Camera Error",
             'camera_error_text_template': "Could not open camera '{}'.",
             'no_camera_warning_title': "No Camera",
@@ -203,33 +2893,46 @@ class EyeTrackerApp:
     }
     current_language = 'de'
 
-    def __init__(self, root_window: ttkb.Window):
+    def __init__(self, root_window, engine=None, mjpeg_port=None, show_preview=True, metrics_exporter=None, settings_store=None, profile_overrides=None,
+                 record_video=False, replay_s=0, self_benchmark=None):
         self.root = root_window
         self.root.title('LockdownEyeProtocol v 1.1.1')
         self.root.minsize(760, 580)
         logging.info("Initialisiere GUI...")
 
-        self.tracking_running = False
+        self.engine = engine if engine is not None else TrackerEngine()
+        self.config = self.engine.config
         self.preview_running = False
         self.is_closing = False
-        self.tracking_thread = None
         self.preview_thread = None
         self.camera_name_to_index = find_available_cameras()
         self.camera_display_names = list(self.camera_name_to_index.keys())
         self.selected_camera_name = tk.StringVar()
         self.selected_camera_index = tk.IntVar(value=-1)
-        self.left_eye_closed_state = False
-        self.right_eye_closed_state = False
-        self.left_ear_value = 0.0
-        self.right_ear_value = 0.0
-        self.face_detected_status = False
-        self.camera_lock = threading.Lock()
+        self._camera_users = {}
+        self.camera_events = queue.Queue()
+        self._status_label_cache = {}
+        self.preview_channel = None
+        self.lifecycle = LifecycleController(on_transition=self._on_lifecycle_transition)
+        self.transition_stall_s = {}
         self.frame_queue = queue.Queue(maxsize=1)
-        self.x_key_down = False
-        self.c_key_down = False
-        self.both_were_closed = False
+        self.display_pacer = FramePacer(1000.0 / PREVIEW_UPDATE_DELAY_MS, name="Vorschau-Anzeige", follow_source=True)
         self.show_overlay_var = tk.BooleanVar(value=True)
-        self.show_preview_var = tk.BooleanVar(value=True)
+        self.show_preview_var = tk.BooleanVar(value=show_preview)
+        self.mjpeg_port = mjpeg_port if mjpeg_port is not None else MJPEG_DEFAULT_PORT
+        self.mjpeg_stream = None
+        self.metrics = self.engine.metrics
+        self.metrics_exporter = metrics_exporter
+        self.actuator = self.engine.actuator
+        self.stream_var = tk.BooleanVar(value=False)
+        self.show_sparkline_var = tk.BooleanVar(value=False)
+        self.recorder = SessionRecorder(replay_s=replay_s, metrics=self.metrics)
+        if replay_s > 0: self.recorder.start()
+        self.record_var = tk.BooleanVar(value=record_video)
+        if record_video: self.recorder.set_recording(True)
+        self.ear_history = EarRingBuffer()
+        self.sparkline = None
+        self._sparkline_after_id = None
         self.advanced_settings_visible = tk.BooleanVar(value=False)
         self.selected_language = tk.StringVar(value='Deutsch' if self.current_language == 'de' else 'English')
 
@@ -239,8 +2942,19 @@ class EyeTrackerApp:
         self.cam_height_var = tk.StringVar(value=str(DEFAULT_CAM_HEIGHT))
         self.cam_fps_var = tk.StringVar(value=str(DEFAULT_CAM_FPS))
         self.process_interval_var = tk.StringVar(value=str(DEFAULT_PROCESS_INTERVAL))
-
-        self.apply_initial_settings()
+        self.cpu_budget_var = tk.StringVar(value=str(DEFAULT_CPU_BUDGET_PERCENT))
+        self.inference_width_var = tk.StringVar(value=str(DEFAULT_INFERENCE_WIDTH))
+        self.settings_store = settings_store if settings_store is not None else SettingsStore()
+        self.profile_var = tk.StringVar(value=self.settings_store.profile_name)
+        self.face_policy_var = tk.StringVar(value=self._face_policy_text(self.config.face_policy))
+        self.config.screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.config.overlay = self.show_overlay_var.get()
+        self.engine.frame_callback = self._on_engine_frame
+        self.engine.add_listener(self._on_engine_event)
+        self.capability_thread = None
+
+        first_run = not os.path.exists(self.settings_store.path)
+        self.apply_initial_settings(profile_overrides)
 
         try: theme_bg = self.root.style.colors.get('bg') or '#303030'
         except: theme_bg = '#303030'
@@ -278,17 +2992,150 @@ class EyeTrackerApp:
             elif hasattr(self, 'preview_outer_frame'):
                  self.preview_outer_frame.grid_forget()
 
+        if mjpeg_port is not None:
+            self.stream_var.set(True)
+            self.toggle_stream()
+
+        self.camera_watcher = CameraHotplugWatcher(
+            self.camera_name_to_index.values(),
+            lambda kind, index, name: self.camera_events.put((kind, index, name)),
+            busy_indices=lambda: set(self._camera_users.copy().values()))
+        self.camera_watcher.start()
+        self.settings_watcher = SettingsFileWatcher(self.settings_store, self._on_settings_file_changed)
+        self.settings_watcher.start()
+        if self_benchmark or (self_benchmark is None and first_run):
+            logging.info("Erster Start ohne Einstellungsdatei. Starte Leistungstest." if first_run else "Leistungstest angefordert.")
+            self.run_capability_benchmark()
+
+        for command, handler in ((LIFECYCLE_CMD_START_PREVIEW, self._start_preview_thread), (LIFECYCLE_CMD_SWITCH_CAMERA, self._start_preview_thread),
+                                 (LIFECYCLE_CMD_STOP_PREVIEW, self._stop_preview_thread), (LIFECYCLE_CMD_START_TRACKING, self._restoring_gui(self._start_tracking_worker)),
+                                 (LIFECYCLE_CMD_STOP_TRACKING, self._restoring_gui(self._stop_tracking_worker)), (LIFECYCLE_CMD_CONFIGURE, self._configure_camera),
+                                 (LIFECYCLE_CMD_CLOSE, self._shutdown)):
+            self.lifecycle.register(command, handler)
+        self.lifecycle.start()
+        self.ui_monitor = UiStallMonitor(self.root, self.metrics)
+        self.ui_monitor.start()
+
         logging.info("App Initialisierung abgeschlossen.")
         self.root.after(PREVIEW_UPDATE_DELAY_MS, self.update_preview_from_queue)
-
-    def apply_initial_settings(self):
-        self.applied_ear_close = DEFAULT_EAR_CLOSE
-        self.applied_ear_open = DEFAULT_EAR_OPEN
-        self.applied_cam_width = DEFAULT_CAM_WIDTH
-        self.applied_cam_height = DEFAULT_CAM_HEIGHT
-        self.applied_cam_fps = DEFAULT_CAM_FPS
-        self.applied_process_interval = DEFAULT_PROCESS_INTERVAL
-        logging.info("Standard-Einstellungen initial angewendet.")
+        self.root.after(STATUS_UPDATE_DELAY_MS, self._poll_eye_state)
+        self.root.after(CAMERA_EVENT_POLL_MS, self._poll_camera_events)
+
+    def apply_initial_settings(self, overrides=None):
+        try: name, raw = self.settings_store.load()
+        except (OSError, ValueError) as e:
+            logging.error(f"Einstellungsdatei '{self.settings_store.path}' nicht lesbar: {e}. Verwende Standardwerte.")
+            name, raw = self.settings_store.profile_name, {}
+        values, errors = validate_profile(raw)
+        for msg in errors: logging.warning(f"Profil '{name}': {msg} Verwende Standardwert.")
+        self.profile_overrides = {key: value for key, value in (overrides or {}).items() if value is not None}
+        values = self._with_overrides(values)
+        self.config.update(values)
+        self.profile_var.set(name)
+        self._set_setting_vars(values)
+        logging.info(f"Profil '{name}' {'aus ' + self.settings_store.path if raw else 'mit Standardwerten'} geladen.")
+
+    # Kommandozeilen-Werte gelten nur für die Sitzung und landen nie im gespeicherten Profil
+    def _with_overrides(self, values):
+        values = dict(values); values.update(self.profile_overrides)
+        return values
+
+    def _stored_profile(self, name):
+        values, _ = validate_profile(self.settings_store.raw_profile(name))
+        return values
+
+    def _without_overrides(self, name, values):
+        if not self.profile_overrides: return values
+        stored = self._stored_profile(name)
+        return {key: stored[key] if key in self.profile_overrides else value for key, value in values.items()}
+
+    @property
+    def tracking_running(self):
+        return self.engine.running
+
+    def _set_setting_vars(self, values):
+        for var, key in ((self.ear_close_var, 'ear_close'), (self.ear_open_var, 'ear_open'), (self.cam_width_var, 'cam_width'),
+                         (self.cam_height_var, 'cam_height'), (self.cam_fps_var, 'cam_fps'), (self.process_interval_var, 'process_interval'),
+                         (self.cpu_budget_var, 'cpu_budget'), (self.inference_width_var, 'inference_width')):
+            var.set(str(values[key]))
+        self.face_policy_var.set(self._face_policy_text(values['face_policy']))
+
+    def _apply_profile(self, name, values, source, started_at):
+        config, changes = self.config, []
+        if (values['ear_close'], values['ear_open']) != (config.ear_close, config.ear_open):
+            changes.append(f"EAR {values['ear_close']:.3f}/{values['ear_open']:.3f}")
+        camera_changed = (values['cam_width'], values['cam_height'], values['cam_fps']) != (config.cam_width, config.cam_height, config.cam_fps)
+        if camera_changed:
+            changes.append(f"Kamera {values['cam_width']}x{values['cam_height']} @{values['cam_fps']}FPS")
+        if values['process_interval'] != config.process_interval: changes.append(f"Intervall {values['process_interval']}")
+        if abs(values['cpu_budget'] - config.cpu_budget) > 1e-6: changes.append(f"CPU-Budget {values['cpu_budget']:.0f}%")
+        if values['inference_width'] != config.inference_width: changes.append(f"Inferenz-Breite {values['inference_width'] or 'Kamera'}")
+        if values['optical_flow'] != config.optical_flow: changes.append(f"optischer Fluss {'an' if values['optical_flow'] else 'aus'}")
+        if values['face_policy'] != config.face_policy: changes.append(f"Gesichtsauswahl {values['face_policy']}")
+        if values['keys'] != config.keys:
+            changes.append("Tasten " + ", ".join(f"{k}->{v}" for k, v in sorted(values['keys'].items())))
+        config.update(values)
+        self.profile_var.set(name)
+        self._set_setting_vars(values)
+        logging.info(f"Profil '{name}' ({source}) angewendet in {(time.monotonic() - started_at) * 1000:.1f} ms: {', '.join(changes) or 'keine Änderungen'}")
+        if camera_changed:
+            self.lifecycle.submit(LIFECYCLE_CMD_CONFIGURE, config.cam_width, config.cam_height, config.cam_fps, started_at)
+        return camera_changed
+
+    def _on_settings_file_changed(self, name, raw, detected_at):
+        try: self.root.after(0, lambda: self._apply_file_profile(name, raw, detected_at))
+        except (tk.TclError, RuntimeError): pass
+
+    def _apply_file_profile(self, name, raw, detected_at):
+        if self.is_closing: return
+        values, errors = validate_profile(raw)
+        if errors:
+            logging.error(f"Profil '{name}' in '{self.settings_store.path}' ungültig, behalte aktuelle Werte:\n" + "\n".join(errors)); return
+        if hasattr(self, 'profile_combobox'): self.profile_combobox.config(values=self.settings_store.profile_names())
+        self._apply_profile(name, self._with_overrides(values), "Datei", detected_at)
+
+    def _on_profile_select(self, event=None):
+        name = self.profile_var.get().strip()
+        started_at = time.monotonic()
+        values, errors = validate_profile(self.settings_store.raw_profile(name))
+        if errors:
+            logging.error(f"Profil '{name}' ungültig:\n" + "\n".join(errors)); return
+        self._apply_profile(name, self._with_overrides(values), "Auswahl", started_at)
+        try: self.settings_store.save_profile(name, values)
+        except OSError as e: logging.error(f"Aktives Profil konnte nicht gespeichert werden: {e}")
+
+    def run_capability_benchmark(self, on_demand=False):
+        if self.capability_thread is not None and self.capability_thread.is_alive(): return
+        if hasattr(self, 'benchmark_button'): self.benchmark_button.config(state=DISABLED)
+        cpu_budget = self.config.cpu_budget
+
+        def worker():
+            try: choice = choose_capability_settings(measure_capability(), cpu_budget)
+            except Exception as e:
+                logging.error(f"Leistungstest fehlgeschlagen: {e}", exc_info=True); choice = None
+            try: self.root.after(0, lambda: self._apply_capability_choice(choice, on_demand))
+            except (tk.TclError, RuntimeError): pass
+
+        self.capability_thread = threading.Thread(target=worker, name="CapabilityBenchmark", daemon=True)
+        self.capability_thread.start()
+
+    def _apply_capability_choice(self, choice, on_demand):
+        if self.is_closing: return
+        if hasattr(self, 'benchmark_button'): self.benchmark_button.config(state=NORMAL)
+        lang_texts = self.translations[self.current_language]
+        if choice is None:
+            if on_demand: messagebox.showerror(lang_texts['benchmark_title'], lang_texts['benchmark_failed_text'])
+            return
+        name = self.profile_var.get().strip() or DEFAULT_PROFILE_NAME
+        values = self._stored_profile(name); values.update(choice.settings())
+        self._apply_profile(name, self._with_overrides(values), "Leistungstest", time.monotonic())
+        try:
+            self.settings_store.save_profile(name, values)
+            if hasattr(self, 'profile_combobox'): self.profile_combobox.config(values=self.settings_store.profile_names())
+        except OSError as e: logging.error(f"Profil '{name}' konnte nicht gespeichert werden: {e}")
+        if on_demand:
+            text = lang_texts['benchmark_done_text'].format(choice.width, choice.height, choice.fps, choice.process_interval, choice.frame_ms, choice.cpu_percent)
+            messagebox.showinfo(lang_texts['benchmark_title'], text + ('' if choice.fits else lang_texts['benchmark_unfit_suffix']))
 
     def _setup_gui(self):
         lang_texts = self.translations[self.current_language]
@@ -353,13 +3200,30 @@ class EyeTrackerApp:
         self.left_eye_status_label.grid(row=0, column=0, padx=(0, 5), pady=2, sticky="ew")
         self.right_eye_status_label = ttkb.Label(self.status_frame, text=lang_texts['right_eye_status_initial'], anchor="center", padding=(5,2))
         self.right_eye_status_label.grid(row=0, column=1, padx=(5, 0), pady=2, sticky="ew")
+        self.sparkline_canvas = tk.Canvas(self.status_frame, height=SPARKLINE_HEIGHT, background=self.placeholder_bg, highlightthickness=0)
+        try: colors = self.root.style.colors; spark_colors = (colors.info, colors.warning, colors.danger, colors.success)
+        except Exception: spark_colors = ('#5bc0de', '#f0ad4e', '#d9534f', '#5cb85c')
+        self.sparkline = EarSparkline(self.sparkline_canvas, *spark_colors)
 
         self.options_frame = ttkb.LabelFrame(self.bottom_bar, text=lang_texts['options_frame_title'], padding=(8, 5), bootstyle=SECONDARY)
         self.options_frame.grid(row=0, column=1, padx=(15, 0), sticky="e")
         self.preview_toggle_button = ttkb.Checkbutton(self.options_frame, text=lang_texts['preview_toggle_button'], variable=self.show_preview_var, bootstyle="success-toolbutton", command=self.toggle_preview)
         self.preview_toggle_button.pack(side=LEFT, padx=(0,5))
-        self.overlay_checkbutton = ttkb.Checkbutton(self.options_frame, text=lang_texts['overlay_checkbutton'], variable=self.show_overlay_var, bootstyle="info-toolbutton", state=DISABLED)
+        self.overlay_checkbutton = ttkb.Checkbutton(self.options_frame, text=lang_texts['overlay_checkbutton'], variable=self.show_overlay_var, bootstyle="info-toolbutton", state=DISABLED, command=self.toggle_overlay)
         self.overlay_checkbutton.pack(side=LEFT, padx=5)
+        self.stream_checkbutton = ttkb.Checkbutton(self.options_frame, text=lang_texts['stream_checkbutton'], variable=self.stream_var, bootstyle="info-toolbutton", command=self.toggle_stream)
+        self.stream_checkbutton.pack(side=LEFT, padx=5)
+        self.sparkline_checkbutton = ttkb.Checkbutton(self.options_frame, text=lang_texts['sparkline_checkbutton'], variable=self.show_sparkline_var, bootstyle="info-toolbutton", command=self.toggle_sparkline)
+        self.sparkline_checkbutton.pack(side=LEFT, padx=5)
+        self.record_checkbutton = ttkb.Checkbutton(self.options_frame, text=lang_texts['record_checkbutton'], variable=self.record_var, bootstyle="danger-toolbutton", command=self.toggle_recording)
+        self.record_checkbutton.pack(side=LEFT, padx=5)
+        if self.recorder.replay_s > 0:
+            self.replay_button = ttkb.Button(self.options_frame, text=lang_texts['replay_button'].format(f"{self.recorder.replay_s:g}"), bootstyle="danger-outline", command=self.save_replay)
+            self.replay_button.pack(side=LEFT, padx=5)
+            self.root.bind("<F9>", lambda event: self.save_replay())
+        if self.config.gaze_mode != GAZE_MODE_OFF:
+            self.gaze_recenter_button = ttkb.Button(self.options_frame, text=lang_texts['gaze_recenter_button'], bootstyle="info-outline", command=self.request_gaze_recenter)
+            self.gaze_recenter_button.pack(side=LEFT, padx=5)
         self.advanced_settings_button = ttkb.Button(self.options_frame, text="⚙", bootstyle="secondary-outline", command=self._toggle_advanced_settings, width=3)
         self.advanced_settings_button.pack(side=LEFT, padx=(5,0))
 
@@ -375,6 +3239,11 @@ class EyeTrackerApp:
         self.advanced_frame = ttkb.LabelFrame(self.main_container, text=lang_texts['advanced_frame_title'], padding=(15, 10), bootstyle=SECONDARY)
         self.advanced_frame.columnconfigure(1, weight=1)
         adv_row = 0
+        self.profile_label_widget = ttkb.Label(self.advanced_frame, text=lang_texts['profile_label'], anchor='w')
+        self.profile_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
+        self.profile_combobox = ttkb.Combobox(self.advanced_frame, textvariable=self.profile_var, values=self.settings_store.profile_names(), width=18)
+        self.profile_combobox.grid(row=adv_row, column=1, padx=5, pady=4, sticky="ew"); adv_row += 1
+        self.profile_combobox.bind("<<ComboboxSelected>>", self._on_profile_select)
         self.ear_close_label_widget = ttkb.Label(self.advanced_frame, text=lang_texts['ear_close_label'], anchor='w')
         self.ear_close_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
         ear_close_entry = ttkb.Entry(self.advanced_frame, textvariable=self.ear_close_var, width=10)
@@ -405,6 +3274,21 @@ class EyeTrackerApp:
         self.process_interval_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
         process_interval_entry = ttkb.Entry(self.advanced_frame, textvariable=self.process_interval_var, width=10)
         process_interval_entry.grid(row=adv_row, column=1, padx=5, pady=4, sticky="ew"); adv_row += 1
+        self.cpu_budget_label_widget = ttkb.Label(self.advanced_frame, text=lang_texts['cpu_budget_label'], anchor='w')
+        self.cpu_budget_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
+        cpu_budget_entry = ttkb.Entry(self.advanced_frame, textvariable=self.cpu_budget_var, width=10)
+        cpu_budget_entry.grid(row=adv_row, column=1, padx=5, pady=4, sticky="ew"); adv_row += 1
+        self.inference_width_label_widget = ttkb.Label(self.advanced_frame, text=lang_texts['inference_width_label'], anchor='w')
+        self.inference_width_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
+        inference_width_entry = ttkb.Entry(self.advanced_frame, textvariable=self.inference_width_var, width=10)
+        inference_width_entry.grid(row=adv_row, column=1, padx=5, pady=4, sticky="ew"); adv_row += 1
+        self.face_policy_label_widget = ttkb.Label(self.advanced_frame, text=lang_texts['face_policy_label'], anchor='w')
+        self.face_policy_label_widget.grid(row=adv_row, column=0, padx=5, pady=4, sticky="w")
+        self.face_policy_combobox = ttkb.Combobox(self.advanced_frame, textvariable=self.face_policy_var, values=[self._face_policy_text(p) for p in FACE_POLICIES],
+                                                  state="readonly" if self.config.max_faces > 1 else DISABLED, width=18)
+        self.face_policy_combobox.grid(row=adv_row, column=1, padx=5, pady=4, sticky="ew"); adv_row += 1
+        self.benchmark_button = ttkb.Button(self.advanced_frame, text=lang_texts['benchmark_button'], command=lambda: self.run_capability_benchmark(on_demand=True), bootstyle="info-outline")
+        self.benchmark_button.grid(row=adv_row, column=0, columnspan=2, pady=(10, 0), sticky="ew"); adv_row += 1
         self.apply_button = ttkb.Button(self.advanced_frame, text=lang_texts['apply_settings_button'], command=self._apply_settings, bootstyle="success")
         self.apply_button.grid(row=adv_row, column=0, columnspan=2, pady=(15, 5), sticky="ew")
 
@@ -413,6 +3297,12 @@ class EyeTrackerApp:
         if not self.show_preview_var.get():
              self.preview_outer_frame.grid_remove()
 
+    def request_gaze_recenter(self):
+        self.engine.request_gaze_recenter()
+
+    def _face_policy_text(self, policy):
+        return self.translations[self.current_language].get(f'face_policy_{policy}', policy)
+
     def _on_language_select(self, event=None):
         selected = self.selected_language.get()
         new_lang_code = 'en' if selected == 'English' else 'de'
@@ -451,10 +3341,7 @@ class EyeTrackerApp:
 
             if hasattr(self, 'status_frame'):
                 self.status_frame.config(text=lang_texts['eye_status_frame_title'])
-            if hasattr(self, 'left_eye_status_label'):
-                self.left_eye_status_label.config(text=lang_texts['left_eye_status_initial'])
-            if hasattr(self, 'right_eye_status_label'):
-                self.right_eye_status_label.config(text=lang_texts['right_eye_status_initial'])
+            self.update_eye_status_display()
 
             if hasattr(self, 'options_frame'):
                 self.options_frame.config(text=lang_texts['options_frame_title'])
@@ -462,11 +3349,23 @@ class EyeTrackerApp:
                 self.preview_toggle_button.config(text=lang_texts['preview_toggle_button'])
             if hasattr(self, 'overlay_checkbutton'):
                 self.overlay_checkbutton.config(text=lang_texts['overlay_checkbutton'])
+            if hasattr(self, 'stream_checkbutton'):
+                self.stream_checkbutton.config(text=lang_texts['stream_checkbutton'])
+            if hasattr(self, 'sparkline_checkbutton'):
+                self.sparkline_checkbutton.config(text=lang_texts['sparkline_checkbutton'])
+            if hasattr(self, 'record_checkbutton'):
+                self.record_checkbutton.config(text=lang_texts['record_checkbutton'])
+            if hasattr(self, 'replay_button'):
+                self.replay_button.config(text=lang_texts['replay_button'].format(f"{self.recorder.replay_s:g}"))
+            if hasattr(self, 'gaze_recenter_button'):
+                self.gaze_recenter_button.config(text=lang_texts['gaze_recenter_button'])
             if hasattr(self, 'language_label'):
                 self.language_label.config(text=lang_texts['language_label'])
 
             if hasattr(self, 'advanced_frame'):
                 self.advanced_frame.config(text=lang_texts['advanced_frame_title'])
+            if hasattr(self, 'profile_label_widget'):
+                self.profile_label_widget.config(text=lang_texts['profile_label'])
             if hasattr(self, 'ear_close_label_widget'):
                 self.ear_close_label_widget.config(text=lang_texts['ear_close_label'])
             if hasattr(self, 'ear_open_label_widget'):
@@ -479,6 +3378,17 @@ class EyeTrackerApp:
                 self.cam_fps_label_widget.config(text=lang_texts['cam_fps_label'])
             if hasattr(self, 'process_interval_label_widget'):
                 self.process_interval_label_widget.config(text=lang_texts['process_interval_label'])
+            if hasattr(self, 'cpu_budget_label_widget'):
+                self.cpu_budget_label_widget.config(text=lang_texts['cpu_budget_label'])
+            if hasattr(self, 'inference_width_label_widget'):
+                self.inference_width_label_widget.config(text=lang_texts['inference_width_label'])
+            if hasattr(self, 'face_policy_label_widget'):
+                self.face_policy_label_widget.config(text=lang_texts['face_policy_label'])
+            if hasattr(self, 'face_policy_combobox'):
+                self.face_policy_combobox.config(values=[self._face_policy_text(p) for p in FACE_POLICIES])
+                self.face_policy_var.set(self._face_policy_text(self.config.face_policy))
+            if hasattr(self, 'benchmark_button'):
+                self.benchmark_button.config(text=lang_texts['benchmark_button'])
             if hasattr(self, 'apply_button'):
                 self.apply_button.config(text=lang_texts['apply_settings_button'])
 
@@ -503,6 +3413,7 @@ class EyeTrackerApp:
 
     def _apply_settings(self):
         logging.info("Versuche, Einstellungen anzuwenden...")
+        started_at = time.monotonic()
         lang_texts = self.translations[self.current_language]
         settings_error_title = lang_texts.get('settings_error_title', "Fehler bei Einstellungen")
         settings_error_prefix = lang_texts.get('settings_error_prefix', "Einige Eingaben waren ungültig:\n\n")
@@ -510,71 +3421,43 @@ class EyeTrackerApp:
         settings_applied_text = lang_texts.get('settings_applied_text', "Einstellungen wurden übernommen.")
         settings_applied_restart_suffix = lang_texts.get('settings_applied_restart_suffix', "\n...")
 
-        restart_required = False
-        error_messages = []
-
-        try:
-            new_ear_close = float(self.ear_close_var.get())
-            new_ear_open = float(self.ear_open_var.get())
-            if not (0 < new_ear_close < new_ear_open < 1.0): error_messages.append("EAR Schwellenwerte ungültig (Bedingung: 0 < CLOSE < OPEN < 1.0)")
-            else:
-                if abs(new_ear_close - self.applied_ear_close) > 1e-6 or abs(new_ear_open - self.applied_ear_open) > 1e-6:
-                     logging.info(f"EAR Thresholds geändert: CLOSE={new_ear_close:.3f}, OPEN={new_ear_open:.3f}")
-                     self.applied_ear_close = new_ear_close
-                     self.applied_ear_open = new_ear_open
-        except ValueError: error_messages.append("EAR Schwellenwerte müssen Zahlen sein (z.B. 0.17).")
-        except Exception as e: error_messages.append(f"Fehler bei EAR-Werten: {e}")
-        try:
-            new_width = int(self.cam_width_var.get())
-            if new_width <= 0: error_messages.append("Kamera Breite muss > 0 sein.")
-            elif new_width != self.applied_cam_width:
-                 logging.info(f"Kamera Breite geändert: {new_width}")
-                 self.applied_cam_width = new_width; restart_required = True
-        except ValueError: error_messages.append("Kamera Breite muss eine ganze Zahl sein.")
-        except Exception as e: error_messages.append(f"Fehler bei Kamera Breite: {e}")
-        try:
-            new_height = int(self.cam_height_var.get())
-            if new_height <= 0: error_messages.append("Kamera Höhe muss > 0 sein.")
-            elif new_height != self.applied_cam_height:
-                 logging.info(f"Kamera Höhe geändert: {new_height}")
-                 self.applied_cam_height = new_height; restart_required = True
-        except ValueError: error_messages.append("Kamera Höhe muss eine ganze Zahl sein.")
-        except Exception as e: error_messages.append(f"Fehler bei Kamera Höhe: {e}")
-        try:
-            new_fps = int(self.cam_fps_var.get())
-            if new_fps <= 0: error_messages.append("Kamera FPS muss > 0 sein.")
-            elif new_fps != self.applied_cam_fps:
-                 logging.info(f"Kamera FPS geändert: {new_fps}")
-                 self.applied_cam_fps = new_fps; restart_required = True
-        except ValueError: error_messages.append("Kamera FPS muss eine ganze Zahl sein.")
-        except Exception as e: error_messages.append(f"Fehler bei Kamera FPS: {e}")
-        try:
-            new_interval = int(self.process_interval_var.get())
-            if new_interval <= 0: error_messages.append("Verarbeitungsintervall muss > 0 sein.")
-            elif new_interval != self.applied_process_interval:
-                 logging.info(f"Verarbeitungsintervall geändert: {new_interval}")
-                 self.applied_process_interval = new_interval
-        except ValueError: error_messages.append("Verarbeitungsintervall muss eine ganze Zahl sein.")
-        except Exception as e: error_messages.append(f"Fehler bei Intervall: {e}")
-
+        raw = {'ear_close': self.ear_close_var.get(), 'ear_open': self.ear_open_var.get(), 'cam_width': self.cam_width_var.get(),
+               'cam_height': self.cam_height_var.get(), 'cam_fps': self.cam_fps_var.get(), 'process_interval': self.process_interval_var.get(),
+               'cpu_budget': self.cpu_budget_var.get(), 'inference_width': self.inference_width_var.get(), 'optical_flow': self.config.optical_flow,
+               'keys': self.config.keys}
+        new_policy = next((p for p in FACE_POLICIES if self._face_policy_text(p) == self.face_policy_var.get()), None)
+        raw['face_policy'] = new_policy
+        values, error_messages = validate_profile(raw)
+        name = self.profile_var.get().strip() or DEFAULT_PROFILE_NAME
 
         if error_messages:
             logging.error("Fehler beim Anwenden der Einstellungen:\n" + "\n".join(error_messages))
             messagebox.showerror(settings_error_title, settings_error_prefix + "\n".join(f"- {msg}" for msg in error_messages))
-        else:
-            logging.info("Einstellungen erfolgreich validiert und übernommen.")
-            full_applied_text = settings_applied_text
-            if restart_required:
-                full_applied_text += settings_applied_restart_suffix
-            messagebox.showinfo(settings_applied_title, full_applied_text)
-            if self.advanced_settings_visible.get(): self._toggle_advanced_settings()
-            if restart_required:
-                if self.tracking_running:
-                    logging.warning("Kameraeinstellungen geändert. Tracking wird gestoppt. Bitte neu starten.")
-                    self.stop_tracking()
-                elif self.preview_running:
-                    logging.warning("Kameraeinstellungen geändert. Vorschau wird neu gestartet.")
-                    self._start_preview_thread()
+            return
+        logging.info("Einstellungen erfolgreich validiert und übernommen.")
+        # Im GUI geänderte Werte ersetzen die Kommandozeilen-Vorgabe und werden gespeichert
+        self.profile_overrides = {key: value for key, value in self.profile_overrides.items() if values[key] == value}
+        restart_required = self._apply_profile(name, values, "GUI", started_at)
+        full_applied_text = settings_applied_text
+        if restart_required:
+            full_applied_text += settings_applied_restart_suffix
+        try:
+            self.settings_store.save_profile(name, self._without_overrides(name, values))
+            full_applied_text += lang_texts.get('settings_saved_suffix', "\nGespeichert im Profil '{}'.").format(name)
+            self.profile_combobox.config(values=self.settings_store.profile_names())
+        except OSError as e:
+            logging.error(f"Profil '{name}' konnte nicht gespeichert werden: {e}")
+            full_applied_text += lang_texts.get('settings_save_error_suffix', "\nProfil konnte nicht gespeichert werden: {}").format(e)
+        messagebox.showinfo(settings_applied_title, full_applied_text)
+        if self.advanced_settings_visible.get(): self._toggle_advanced_settings()
+
+    def _configure_camera(self, width, height, fps, requested_at=None):
+        if self.tracking_running:
+            self.engine.apply_camera_config(requested_at); return
+        channel = self.preview_channel if self.preview_running else None
+        if channel is not None:
+            logging.info("Kameraeinstellungen geändert. Laufende Kamera wird umkonfiguriert.")
+            channel.send(CAPTURE_CMD_CONFIGURE, width, height, fps, requested_at)
 
     def toggle_preview(self):
         preview_wanted = self.show_preview_var.get()
@@ -592,10 +3475,10 @@ class EyeTrackerApp:
         if not self.tracking_running:
             if preview_wanted:
                 if not self.preview_running:
-                    self._start_preview_thread()
+                    self.request_preview()
             else:
                 if self.preview_running:
-                    self._stop_preview_thread()
+                    self.lifecycle.submit(LIFECYCLE_CMD_STOP_PREVIEW)
         else:
             if not preview_wanted:
                 logging.info("Vorschau während Tracking deaktiviert. Leere Queue.")
@@ -605,6 +3488,57 @@ class EyeTrackerApp:
             else:
                 logging.info("Vorschau während Tracking aktiviert.")
 
+    def toggle_overlay(self):
+        self.config.overlay = self.show_overlay_var.get()
+
+    def toggle_stream(self):
+        if self.stream_var.get():
+            if self.mjpeg_stream is not None: return
+            stream = MjpegStreamServer(self.mjpeg_port)
+            try:
+                stream.start()
+                self.mjpeg_stream = stream
+            except OSError as e:
+                logging.error(f"MJPEG-Stream konnte nicht gestartet werden (Port {self.mjpeg_port}): {e}")
+                self.stream_var.set(False)
+                lang_texts = self.translations[self.current_language]
+                messagebox.showerror(lang_texts.get('stream_error_title', "Stream-Fehler"), lang_texts.get('stream_error_text_template', "{} {}").format(self.mjpeg_port, e))
+        else:
+            stream = self.mjpeg_stream; self.mjpeg_stream = None
+            if stream is not None: stream.stop()
+
+    def toggle_recording(self):
+        self.recorder.set_recording(self.record_var.get())
+
+    def save_replay(self):
+        if not self.recorder.save_replay(lambda path: self.root.after(0, self._on_replay_saved, path)):
+            logging.info("Replay-Puffer ist noch leer.")
+
+    def _on_replay_saved(self, path):
+        if self.is_closing: return
+        lang_texts = self.translations[self.current_language]
+        if path: messagebox.showinfo(lang_texts['replay_saved_title'], lang_texts['replay_saved_text'].format(path))
+        else: messagebox.showerror(lang_texts['replay_saved_title'], lang_texts['replay_failed_text'])
+
+    def toggle_sparkline(self):
+        if self.show_sparkline_var.get():
+            self.sparkline_canvas.grid(row=1, column=0, columnspan=2, pady=(4, 0), sticky="ew")
+            if self._sparkline_after_id is None: self._update_sparkline()
+        else:
+            self.sparkline_canvas.grid_remove()
+
+    def _update_sparkline(self):
+        # Eigene, gedrosselte Schleife; läuft nur solange der Verlauf sichtbar ist
+        self._sparkline_after_id = None
+        if self.is_closing or not self.show_sparkline_var.get(): return
+        self.sparkline.render(self.ear_history, time.monotonic(), self.config.ear_close, self.config.ear_open)
+        self._sparkline_after_id = self.root.after(1000 // SPARKLINE_MAX_FPS, self._update_sparkline)
+
+    def _emit_frame(self, frame):
+        if self.show_preview_var.get(): self._enqueue_frame(frame)
+        stream = self.mjpeg_stream
+        if stream is not None: stream.submit(frame)
+
     def update_preview_from_queue(self):
         if self.is_closing: return
         frame = None
@@ -617,16 +3551,25 @@ class EyeTrackerApp:
                  self.preview_outer_frame.grid(row=1, column=0, pady=10, sticky="nsew")
                  self.main_container.rowconfigure(1, weight=1)
             self._display_frame(frame)
+            self.display_pacer.tick()
+            self.display_pacer.log_stats_if_due()
 
-        self.root.after(PREVIEW_UPDATE_DELAY_MS, self.update_preview_from_queue)
+        if self.show_preview_var.get() and (self.preview_running or self.tracking_running):
+            delay_ms = max(1, int(self.display_pacer.next_delay() * 1000))
+        else:
+            self.display_pacer.reset()
+            delay_ms = PREVIEW_IDLE_DELAY_MS
+        self.root.after(delay_ms, self.update_preview_from_queue)
 
 
     def _enqueue_frame(self, frame):
         if frame is None or self.is_closing: return
         if self.tracking_running or self.show_preview_var.get():
              try:
-                 while not self.frame_queue.empty(): self.frame_queue.get_nowait()
+                 while not self.frame_queue.empty():
+                     self.frame_queue.get_nowait(); self.metrics.record_preview_drop()
                  self.frame_queue.put_nowait(frame)
+                 self.display_pacer.observe_arrival()
              except queue.Full: pass
              except Exception as e: logging.warning(f"Fehler Enqueue: {e}")
         else:
@@ -650,14 +3593,8 @@ class EyeTrackerApp:
                 target_h = self.preview_outer_frame.winfo_height() - 30
             if target_w <= 1 or target_h <= 1: return
 
-            scale = min(target_w / w_in, target_h / h_in)
-            scale = min(scale, 1.0)
-            new_w, new_h = int(w_in * scale), int(h_in * scale)
-            if new_w <=0 or new_h <= 0: return
-
-            resized_frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            cv2image = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(cv2image)
+            img = prepare_preview_image(frame, target_w, target_h)
+            if img is None: return
             imgtk = ImageTk.PhotoImage(image=img)
 
             self.preview_label.imgtk = imgtk
@@ -671,62 +3608,44 @@ class EyeTrackerApp:
                     self.preview_label.imgtk = None
                 except: pass
 
-    def _release_camera(self, cap_type):
-        with self.camera_lock:
-            cap, cap_name_internal = (self.preview_cap, "Vorschau") if cap_type == "preview" else (self.tracking_cap, "Tracking")
-            if cap and cap.isOpened():
-                cam_display_name = ""
-                try:
-                    cam_display_name = self.selected_camera_name.get()
-                    if not cam_display_name or cam_display_name == self.translations[self.current_language].get('no_camera_found', "Keine Kamera"):
-                         idx = self.selected_camera_index.get()
-                         for name, index in self.camera_name_to_index.items():
-                              if index == idx: cam_display_name = name; break
-                         if not cam_display_name: cam_display_name = f"({cap_name_internal}-Kamera Index {idx})"
-                except Exception:
-                    cam_display_name = f"({cap_name_internal}-Kamera)"
-
-                logging.info(f"Gebe {cap_name_internal}-Kamera frei ('{cam_display_name}')...");
-                try: cap.release()
-                except Exception as e: logging.error(f"Fehler Freigabe {cap_name_internal} ('{cam_display_name}'): {e}")
-                finally:
-                    if cap_type == "preview": self.preview_cap = None
-                    else: self.tracking_cap = None
-                    logging.info(f"{cap_name_internal}-Kamera ('{cam_display_name}') freigegeben.")
-
     def _stop_preview_thread(self):
-        if self.preview_running:
-            logging.info("Stoppe Vorschau-Thread..."); self.preview_running = False
+        if self.preview_running or self.preview_thread is not None:
+            logging.info("Stoppe Vorschau-Thread...")
+            stop_t0 = time.perf_counter()
+            self.preview_running = False
+            if self.preview_channel is not None: self.preview_channel.stop()
+            logging.info(f"Stopp-Anfrage an Vorschau-Kamera in {(time.perf_counter() - stop_t0) * 1000:.3f} ms gestellt.")
             thread = self.preview_thread; self.preview_thread = None
             if thread is not None:
-                thread.join(timeout=3.5);
+                thread.join(timeout=THREAD_JOIN_TIMEOUT_S);
                 if thread and thread.is_alive(): logging.warning("Vorschau-Thread nicht beendet.")
                 else: logging.info("Vorschau-Thread beendet.")
             else:
                  logging.info("Kein Vorschau-Thread zum Stoppen gefunden.")
 
-            self._release_camera("preview");
             if not self.tracking_running:
                  while not self.frame_queue.empty():
                      try: self.frame_queue.get_nowait()
                      except queue.Empty: break
             logging.info("Vorschau Stop abgeschlossen.")
+            if not self.is_closing: self.root.after(0, self._show_preview_placeholder)
+        return LIFECYCLE_TRACKING if self.tracking_running else LIFECYCLE_IDLE
 
-            if not self.is_closing and hasattr(self, 'preview_label') and self.placeholder_photo:
-                 try:
-                     self.preview_label.config(image=self.placeholder_photo)
-                     self.preview_label.imgtk = None
-                 except tk.TclError: pass
+    def _show_preview_placeholder(self):
+        if self.is_closing or self.preview_running or self.tracking_running: return
+        if hasattr(self, 'preview_label') and self.placeholder_photo:
+             try:
+                 self.preview_label.config(image=self.placeholder_photo)
+                 self.preview_label.imgtk = None
+             except tk.TclError: pass
 
-    def _start_preview_thread(self):
+    def request_preview(self, command=LIFECYCLE_CMD_START_PREVIEW):
         if self.tracking_running or self.is_closing or not self.show_preview_var.get():
             if self.tracking_running: logging.debug("Vorschau nicht gestartet (Tracking läuft).")
             if self.is_closing: logging.debug("Vorschau nicht gestartet (App schließt).")
             if not self.show_preview_var.get(): logging.debug("Vorschau nicht gestartet (explizit deaktiviert).")
             return
 
-        self._stop_preview_thread();
-
         cam_idx = self.selected_camera_index.get()
         cam_name = self.selected_camera_name.get()
         if cam_idx == -1:
@@ -738,64 +3657,65 @@ class EyeTrackerApp:
         if hasattr(self, 'preview_outer_frame') and not self.preview_outer_frame.winfo_viewable():
              self.preview_outer_frame.grid(row=1, column=0, pady=10, sticky="nsew")
              self.main_container.rowconfigure(1, weight=1)
+        self.lifecycle.submit(command, cam_idx, cam_name)
+
+    def _start_preview_thread(self, cam_idx, cam_name):
+        if self.tracking_running or self.is_closing: return None
+        self.lifecycle.set_state(LIFECYCLE_STARTING)
+        self._stop_preview_thread()
 
         logging.info(f"Starte Vorschau für '{cam_name}' (Index {cam_idx})..."); self.preview_running = True
-        name = f"PreviewThread-{cam_idx}"; self.preview_thread = threading.Thread(target=self._preview_worker, args=(cam_idx, cam_name), name=name, daemon=True)
+        self._camera_users['preview'] = cam_idx
+        self.preview_channel = CaptureChannel()
+        name = f"PreviewThread-{cam_idx}"; self.preview_thread = threading.Thread(target=self._preview_worker, args=(cam_idx, cam_name, self.preview_channel), name=name, daemon=True)
         self.preview_thread.start()
+        return LIFECYCLE_PREVIEW
 
-    def _preview_worker(self, camera_index, camera_name):
+    def _preview_worker(self, camera_index, camera_name, channel):
         logging.info(f"Vorschau-Worker für '{camera_name}' gestartet.")
         cap = None
         try:
-            with self.camera_lock:
-                logging.info(f"Öffne Vorschau-Kamera '{camera_name}'...");
-                cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW if platform.system() == "Windows" else None)
-                if not cap or not cap.isOpened():
-                    logging.warning(f"Fallback: Versuche Kamera {camera_index} ohne DSHOW...")
-                    cap = cv2.VideoCapture(camera_index)
-
-                if cap and cap.isOpened():
-                     cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.applied_cam_width)
-                     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.applied_cam_height)
-                     cap.set(cv2.CAP_PROP_FPS, self.applied_cam_fps)
-                     actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                     actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                     actual_fps = cap.get(cv2.CAP_PROP_FPS)
-                     if actual_fps <= 0: actual_fps = self.applied_cam_fps
-                     logging.info(f"Vorschau-Kamera '{camera_name}' offen. Angefordert: {self.applied_cam_width}x{self.applied_cam_height} @{self.applied_cam_fps}FPS. Tatsächlich: {actual_w}x{actual_h} @{actual_fps:.2f}FPS")
-                     self.preview_cap = cap
-                else:
-                    logging.error(f"Fehler Öffnen Vorschau '{camera_name}'."); self.preview_running = False;
-                    err_title = self.translations[self.current_language].get('camera_error_title', "Kamerafehler")
-                    err_text_tmpl = self.translations[self.current_language].get('camera_error_text_template', "Kamera '{}' konnte nicht geöffnet werden.")
-                    if not self.is_closing: self.root.after(0, lambda cn=camera_name: messagebox.showerror(err_title, err_text_tmpl.format(cn)))
-                    if not self.is_closing and hasattr(self, 'preview_outer_frame'):
-                         self.root.after(0, lambda: self.preview_outer_frame.grid_remove())
-                         self.root.after(0, lambda: self.main_container.rowconfigure(1, weight=0))
-                    return
-
-            last_t = time.monotonic()
+            logging.info(f"Öffne Vorschau-Kamera '{camera_name}'...");
+            cap, actual = open_camera(camera_index, self.config.cam_width, self.config.cam_height, self.config.cam_fps)
+
+            if cap is not None:
+                 actual_w, actual_h, actual_fps = actual
+                 logging.info(f"Vorschau-Kamera '{camera_name}' offen. Angefordert: {self.config.cam_width}x{self.config.cam_height} @{self.config.cam_fps}FPS. Tatsächlich: {actual_w}x{actual_h} @{actual_fps:.2f}FPS")
+                 self.metrics.record_camera_open()
+            else:
+                logging.error(f"Fehler Öffnen Vorschau '{camera_name}'."); self.preview_running = False;
+                err_title = self.translations[self.current_language].get('camera_error_title', "Kamerafehler")
+                err_text_tmpl = self.translations[self.current_language].get('camera_error_text_template', "Kamera '{}' konnte nicht geöffnet werden.")
+                if not self.is_closing: self.root.after(0, lambda cn=camera_name: messagebox.showerror(err_title, err_text_tmpl.format(cn)))
+                if not self.is_closing and hasattr(self, 'preview_outer_frame'):
+                     self.root.after(0, lambda: self.preview_outer_frame.grid_remove())
+                     self.root.after(0, lambda: self.main_container.rowconfigure(1, weight=0))
+                return
+
+            pacer = FramePacer(actual_fps, name=f"Vorschau-Kamera '{camera_name}'")
             error_logged = False
-            while self.preview_running:
-                curr_t = time.monotonic();
-                if curr_t - last_t < 0.015: time.sleep(0.005); continue
-                last_t = curr_t
-
-                frame = None
-                success = False
-                with self.camera_lock:
-                    if not self.preview_cap or not self.preview_cap.isOpened():
-                        if self.preview_running:
-                             logging.warning(f"Vorschau-Kamera '{camera_name}' ist unerwartet geschlossen.")
-                        break
-                    success, frame = self.preview_cap.read()
+            while pacer.wait(lambda: self.preview_running):
+                pacer.log_stats_if_due()
+                stop_requested = False
+                for command, args in channel.pending():
+                    if command == CAPTURE_CMD_STOP: stop_requested = True
+                    elif command == CAPTURE_CMD_CONFIGURE:
+                        cap, actual = reconfigure_camera(cap, camera_index, *args[:3], (actual_w, actual_h), "Vorschau", camera_name, args[3])
+                        if cap is None: stop_requested = True; break
+                        actual_w, actual_h, actual_fps = actual
+                        pacer = FramePacer(actual_fps, name=f"Vorschau-Kamera '{camera_name}'")
+                if stop_requested: break
+                if not cap.isOpened():
+                    if self.preview_running:
+                         logging.warning(f"Vorschau-Kamera '{camera_name}' ist unerwartet geschlossen.")
+                    break
+                success, frame = cap.read()
 
                 if success and frame is not None and frame.size > 0:
-                    frame_to_show = cv2.flip(frame, 1)
-                    if self.show_preview_var.get():
-                        self._enqueue_frame(frame_to_show)
+                    self._emit_frame(frame)
                     error_logged = False
                 elif not success:
+                    self.metrics.record_read_failure()
                     if not error_logged: logging.warning(f"Lesefehler Vorschau '{camera_name}'."); error_logged = True
                     time.sleep(0.1)
                 elif frame is None or frame.size == 0:
@@ -806,10 +3726,11 @@ class EyeTrackerApp:
             if self.preview_running:
                 logging.error(f"Fehler in Preview-Loop '{camera_name}': {e}", exc_info=True)
         finally:
+            release_camera(cap, "Vorschau", camera_name)
             logging.info(f"Vorschau-Worker '{camera_name}' beendet.");
-            if self.preview_cap:
-                self._release_camera("preview")
-            self.preview_running = False
+            if self.preview_channel is channel: self.preview_running = False
+            if self._camera_users.get('preview') == camera_index and not self.preview_running:
+                self._camera_users.pop('preview', None)
 
     def on_camera_select(self, event=None):
         name = self.selected_camera_name.get()
@@ -823,7 +3744,7 @@ class EyeTrackerApp:
             logging.info(f"Kamera '{name}' (Index {idx}) ausgewählt.")
             if not self.tracking_running:
                 if self.show_preview_var.get():
-                    self._start_preview_thread()
+                    self.request_preview(LIFECYCLE_CMD_SWITCH_CAMERA)
         elif idx == -1 and name != no_cam_text:
              logging.warning(f"Ungültiger Kameraname ausgewählt: {name}")
         elif idx != -1 and idx == self.selected_camera_index.get():
@@ -832,23 +3753,20 @@ class EyeTrackerApp:
              logging.info("Auswahl 'Keine Kamera'. Stoppe Vorschau.")
              self.selected_camera_index.set(-1)
              if not self.tracking_running:
-                 self._stop_preview_thread()
+                 self.lifecycle.submit(LIFECYCLE_CMD_STOP_PREVIEW)
                  if hasattr(self, 'preview_outer_frame'):
                      self.preview_outer_frame.grid_remove()
                      self.main_container.rowconfigure(1, weight=0)
 
 
     def start_tracking(self):
-        if self.is_closing or self.tracking_running: return
+        if self.is_closing or self.tracking_running or self.lifecycle.state in (LIFECYCLE_STARTING, LIFECYCLE_STOPPING): return
         logging.info("Start Tracking Klick."); idx = self.selected_camera_index.get()
         name = self.selected_camera_name.get()
         warn_title = self.translations[self.current_language].get('no_camera_warning_title', "Keine Kamera")
         warn_text = self.translations[self.current_language].get('no_camera_warning_text', "Bitte Kamera wählen.")
         if idx == -1: messagebox.showwarning(warn_title, warn_text); return
 
-        logging.info(f"Starte Tracking für '{name}' (Index {idx})...");
-        self._stop_preview_thread();
-
         if self.show_preview_var.get():
             if hasattr(self, 'preview_outer_frame') and not self.preview_outer_frame.winfo_viewable():
                 self.preview_outer_frame.grid(row=1, column=0, pady=10, sticky="nsew")
@@ -858,59 +3776,71 @@ class EyeTrackerApp:
                 self.preview_outer_frame.grid_remove()
                 self.main_container.rowconfigure(1, weight=0)
 
-        logging.info("Warte auf Kamera..."); time.sleep(0.5)
-        self.left_eye_closed_state = False; self.right_eye_closed_state = False
-        self.x_key_down = False; self.c_key_down = False
-        self.both_were_closed = False; self.face_detected_status = False
-        logging.info("Augen- und Tasten-Status Reset.")
-
-        self.tracking_running = True
-        self.start_button.config(state=DISABLED); self.stop_button.config(state=NORMAL)
+        self.start_button.config(state=DISABLED); self.stop_button.config(state=DISABLED)
         self.exit_button.config(state=DISABLED); self.camera_combobox.config(state=DISABLED)
-        self.overlay_checkbutton.config(state=NORMAL)
-        self.preview_toggle_button.config(state=NORMAL)
         self.advanced_settings_button.config(state=DISABLED)
         self.language_combobox.config(state=DISABLED)
+        self.lifecycle.submit(LIFECYCLE_CMD_START_TRACKING, idx, name)
+
+    def _restoring_gui(self, handler):
+        # Start/Stopp fehlgeschlagen oder ohne Wirkung: Zustand korrigieren und GUI nicht gesperrt lassen
+        def run(*args):
+            state = None
+            try:
+                state = handler(*args)
+                return state
+            finally:
+                if state is None and not self.is_closing:
+                    if not self.tracking_running: self._camera_users.pop('tracking', None)
+                    self.lifecycle.set_state(LIFECYCLE_TRACKING if self.tracking_running else LIFECYCLE_PREVIEW if self.preview_running else LIFECYCLE_IDLE)
+                    self.root.after(0, self._update_gui_after_start if self.tracking_running else self.update_gui_after_stop)
+        return run
+
+    def _start_tracking_worker(self, idx, name):
+        if self.is_closing or self.tracking_running: return None
+        self.lifecycle.set_state(LIFECYCLE_STARTING)
+        self._camera_users['tracking'] = idx
+        self._stop_preview_thread()
+        self.engine.start(idx, name)
+        if not self.is_closing: self.root.after(0, self._update_gui_after_start)
+        return LIFECYCLE_TRACKING
 
-        self.root.after(0, self.update_eye_status_display)
-        thread_name = f"TrackingThread-{idx}"; self.tracking_thread = threading.Thread(target=self.eye_tracker_loop, args=(idx, name), name=thread_name, daemon=True)
-        self.tracking_thread.start()
+    def _update_gui_after_start(self):
+        if self.is_closing or not self.tracking_running: return
+        self.stop_button.config(state=NORMAL)
+        self.overlay_checkbutton.config(state=NORMAL)
+        self.preview_toggle_button.config(state=NORMAL)
+        self.update_eye_status_display()
 
     def stop_tracking(self):
         if self.is_closing or not self.tracking_running: return
-        logging.info("Stop Tracking Klick."); self.tracking_running = False
-
-        thread = self.tracking_thread; self.tracking_thread = None
-        if thread is not None:
-            logging.info("Warte auf Tracking-Thread...");
-            thread.join(timeout=3.5);
-            if thread.is_alive(): logging.warning("Tracking-Thread nicht beendet.")
-            else: logging.info("Tracking-Thread beendet.")
-        else:
-            logging.info("Kein Tracking-Thread zum Stoppen gefunden.")
+        logging.info("Stop Tracking Klick.")
+        self.stop_button.config(state=DISABLED)
+        self.lifecycle.submit(LIFECYCLE_CMD_STOP_TRACKING)
 
-        self._release_camera("tracking")
+    def _stop_tracking_worker(self):
+        # Auch nach selbst beendetem Worker aufräumen, solange die GUI noch im Tracking-Zustand ist
+        if not self.tracking_running and self.lifecycle.state != LIFECYCLE_TRACKING: return None
+        self.lifecycle.set_state(LIFECYCLE_STOPPING)
+        self.engine.stop()
+        self._camera_users.pop('tracking', None)
 
         while not self.frame_queue.empty():
              try: self.frame_queue.get_nowait()
              except queue.Empty: break
-
-        if self.x_key_down:
-            try: pydirectinput.keyUp('x'); logging.info("Stop: Gehaltenes 'x' losgelassen.")
-            except Exception as e: logging.warning(f"Fehler keyUp('x') beim Stoppen: {e}")
-            self.x_key_down = False
-        if self.c_key_down:
-            try: pydirectinput.keyUp('c'); logging.info("Stop: Gehaltenes 'c' losgelassen.")
-            except Exception as e: logging.warning(f"Fehler keyUp('c') beim Stoppen: {e}")
-            self.c_key_down = False
-
-        self.left_eye_closed_state = False; self.right_eye_closed_state = False;
-        self.left_ear_value = 0.0; self.right_ear_value = 0.0; self.face_detected_status = False;
-        self.both_were_closed = False
         logging.info("Tracking-Status Reset.")
 
         if not self.is_closing: self.root.after(0, self.update_gui_after_stop)
         logging.info("Tracking Stop abgeschlossen.")
+        return LIFECYCLE_IDLE
+
+    def _on_lifecycle_transition(self, command, before, after, t0, t1):
+        def report():
+            stall = self.ui_monitor.worst_since(t0)
+            self.transition_stall_s[command] = max(stall, self.transition_stall_s.get(command, 0.0))
+            logging.info(f"Lebenszyklus '{command}': {before} -> {after} in {(t1 - t0) * 1000:.0f} ms, max. UI-Blockade {stall * 1000:.1f} ms")
+        if command == LIFECYCLE_CMD_CLOSE or self.is_closing: report()
+        else: self.root.after(UI_STALL_PROBE_MS * 3, report)
 
     def update_gui_after_stop(self):
         if self.is_closing: return
@@ -931,7 +3861,7 @@ class EyeTrackerApp:
 
         if available and self.selected_camera_index.get() != -1 and self.show_preview_var.get():
              logging.info("Starte Vorschau neu nach Stop.");
-             self._start_preview_thread()
+             self.request_preview()
              if hasattr(self, 'preview_outer_frame') and not self.preview_outer_frame.winfo_viewable():
                   self.preview_outer_frame.grid(row=1, column=0, pady=10, sticky="nsew")
                   self.main_container.rowconfigure(1, weight=1)
@@ -948,275 +3878,115 @@ class EyeTrackerApp:
         self.root.after(0, self.update_eye_status_display);
         logging.info("GUI Update nach Stop fertig.")
 
+    def _poll_camera_events(self):
+        if self.is_closing: return
+        changed = False
+        while True:
+            try: kind, index, name = self.camera_events.get_nowait()
+            except queue.Empty: break
+            self._apply_camera_event(kind, index, name); changed = True
+        if changed: self._refresh_camera_list()
+        self.root.after(CAMERA_EVENT_POLL_MS, self._poll_camera_events)
+
+    def _apply_camera_event(self, kind, index, name):
+        if kind == 'added':
+            if index in self.camera_name_to_index.values(): return
+            name = name or self.translations[self.current_language].get('cam_generic_name', "Kamera {}").format(index)
+            name = unique_camera_name(name, self.camera_name_to_index)
+            self.camera_name_to_index[name] = index
+            self.camera_display_names.append(name)
+            logging.info(f"Kamera '{name}' (Index {index}) zur Liste hinzugefügt.")
+        elif kind == 'removed':
+            for name, idx in list(self.camera_name_to_index.items()):
+                if idx != index: continue
+                del self.camera_name_to_index[name]
+                self.camera_display_names.remove(name)
+                logging.info(f"Kamera '{name}' (Index {index}) aus der Liste entfernt.")
+                if self.selected_camera_index.get() == index and not self.tracking_running:
+                    self.lifecycle.submit(LIFECYCLE_CMD_STOP_PREVIEW)
+                    self.selected_camera_index.set(-1)
+                    self.selected_camera_name.set("")
+
+    def _refresh_camera_list(self):
+        lang_texts = self.translations[self.current_language]
+        available = bool(self.camera_display_names)
+        self.camera_combobox.config(values=self.camera_display_names if available else [lang_texts['no_camera_found']])
+        if self.tracking_running: return
+        self.camera_combobox.config(state="readonly" if available else DISABLED)
+        self.start_button.config(state=NORMAL if available else DISABLED)
+        self.preview_toggle_button.config(state=NORMAL if available else DISABLED)
+        self.advanced_settings_button.config(state=NORMAL if available else DISABLED)
+        if self.selected_camera_index.get() != -1: return
+        if available:
+            self.selected_camera_name.set(self.camera_display_names[0])
+            self.on_camera_select()
+        else:
+            self.selected_camera_name.set(lang_texts['no_camera_found'])
+            self.on_camera_select()
+
+    def _poll_eye_state(self):
+        if self.is_closing: return
+        self.update_eye_status_display()
+        self.root.after(STATUS_UPDATE_DELAY_MS, self._poll_eye_state)
+
+    def _on_engine_event(self, event):
+        if event.kind == ENGINE_EVENT_STATE:
+            if event.data.face_detected: self.ear_history.append(event.timestamp, event.data.left_ear, event.data.right_ear)
+        elif event.kind == ENGINE_EVENT_CAMERA_FAILED and not self.is_closing:
+            lang_texts = self.translations[self.current_language]
+            err_title = lang_texts.get('camera_error_title', "Kamerafehler")
+            err_text = lang_texts.get('camera_error_text_template', "Kamera '{}' konnte nicht geöffnet werden.").format(event.data)
+            self.root.after(0, lambda: messagebox.showerror(err_title, err_text))
+        elif event.kind == ENGINE_EVENT_STOPPED and event.data and not self.is_closing:
+            self.lifecycle.submit(LIFECYCLE_CMD_STOP_TRACKING)
+
+    def _on_engine_frame(self, frame, preview_due):
+        self.recorder.submit(frame)
+        if preview_due: self._emit_frame(frame)
+
+    def _set_status_label(self, label, text, style):
+        if self._status_label_cache.get(label) == (text, style): return
+        if label.winfo_exists():
+            label.config(text=text, bootstyle=style)
+            self._status_label_cache[label] = (text, style)
+
     def update_eye_status_display(self):
         if not self.root or not self.root.winfo_exists() or self.is_closing: return
 
-        left_text, right_text = "Links: ---", "Rechts: ---"
+        lang_texts = self.translations[self.current_language]
+        left_prefix, right_prefix = lang_texts['left_eye_status_prefix'], lang_texts['right_eye_status_prefix']
         left_style, right_style = DEFAULT, DEFAULT
 
         if self.tracking_running:
-             if not self.face_detected_status:
-                 left_text, right_text = "Links: Suche Gesicht...", "Rechts: Suche Gesicht..."
+             state = self.engine.state
+             if self.engine.camera_reconnecting:
+                 left_text = f"{left_prefix} {lang_texts['camera_reconnecting']}"
+                 right_text = f"{right_prefix} {lang_texts['camera_reconnecting']}"
+                 left_style, right_style = WARNING, WARNING
+             elif not state.face_detected:
+                 left_text = f"{left_prefix} {lang_texts['searching_face']}"
+                 right_text = f"{right_prefix} {lang_texts['searching_face']}"
                  left_style, right_style = SECONDARY, SECONDARY
              else:
-                 lc = self.left_eye_closed_state
-                 rc = self.right_eye_closed_state
-                 left_ear_display = f"(EAR: {self.left_ear_value:.3f})" if not lc else ""
-                 right_ear_display = f"(EAR: {self.right_ear_value:.3f})" if not rc else ""
-                 left_text = f"Links: {'GESCHLOSSEN' if lc else 'OFFEN'} {left_ear_display}".strip()
+                 lc, rc = state.left_closed, state.right_closed
+                 left_ear_display = f"({lang_texts['ear_label']} {state.left_ear:.3f})" if not lc else ""
+                 right_ear_display = f"({lang_texts['ear_label']} {state.right_ear:.3f})" if not rc else ""
+                 left_text = f"{left_prefix} {lang_texts['status_closed'] if lc else lang_texts['status_open']} {left_ear_display}".strip()
                  left_style = DANGER if lc else SUCCESS
-                 right_text = f"Rechts: {'GESCHLOSSEN' if rc else 'OFFEN'} {right_ear_display}".strip()
+                 right_text = f"{right_prefix} {lang_texts['status_closed'] if rc else lang_texts['status_open']} {right_ear_display}".strip()
                  right_style = DANGER if rc else SUCCESS
-
-        elif not self.tracking_running:
-             lang_texts = self.translations[self.current_language]
+        else:
              left_text = lang_texts['left_eye_status_initial']
              right_text = lang_texts['right_eye_status_initial']
 
         try:
-            if hasattr(self, 'left_eye_status_label') and self.left_eye_status_label.winfo_exists():
-                self.left_eye_status_label.config(text=left_text, bootstyle=left_style)
-            if hasattr(self, 'right_eye_status_label') and self.right_eye_status_label.winfo_exists():
-                self.right_eye_status_label.config(text=right_text, bootstyle=right_style)
+            if hasattr(self, 'left_eye_status_label'):
+                self._set_status_label(self.left_eye_status_label, left_text, left_style)
+            if hasattr(self, 'right_eye_status_label'):
+                self._set_status_label(self.right_eye_status_label, right_text, right_style)
         except Exception as e:
              if not self.is_closing: logging.error(f"Fehler Status Update: {e}", exc_info=True)
 
-
-    def eye_tracker_loop(self, camera_index, camera_name):
-        logging.info(f"Tracking-Worker für '{camera_name}' gestartet.")
-        global face_mesh
-        if face_mesh is None:
-            logging.error("FaceMesh ist None im Tracking-Worker!")
-            if not self.is_closing: self.root.after(0, self.stop_tracking)
-            return
-
-        cap = None; frame_count = 0
-        error_logged = False
-        face_mesh_initialized = False
-
-        try:
-            with self.camera_lock:
-                logging.info(f"Öffne Tracking-Kamera '{camera_name}'...");
-                cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW if platform.system() == "Windows" else None)
-                if not cap or not cap.isOpened():
-                    logging.warning(f"Fallback: Versuche Tracking-Kamera {camera_index} ohne DSHOW...")
-                    cap = cv2.VideoCapture(camera_index)
-
-                if cap and cap.isOpened():
-                     cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.applied_cam_width)
-                     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.applied_cam_height)
-                     cap.set(cv2.CAP_PROP_FPS, self.applied_cam_fps)
-                     actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                     actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                     actual_fps = cap.get(cv2.CAP_PROP_FPS)
-                     if actual_fps <= 0: actual_fps = self.applied_cam_fps
-                     logging.info(f"Tracking-Kamera '{camera_name}' offen. Angefordert: {self.applied_cam_width}x{self.applied_cam_height} @{self.applied_cam_fps}FPS. Tatsächlich: {actual_w}x{actual_h} @{actual_fps:.2f}FPS")
-                     self.tracking_cap = cap
-                else:
-                    logging.error(f"FEHLER Öffnen Tracking '{camera_name}'!")
-                    err_title = self.translations[self.current_language].get('camera_error_title', "Kamerafehler")
-                    err_text_tmpl = self.translations[self.current_language].get('camera_error_text_template', "Kamera '{}' konnte nicht geöffnet werden.")
-                    if not self.is_closing:
-                         self.root.after(0, lambda cn=camera_name: messagebox.showerror(err_title, err_text_tmpl.format(cn)))
-                         self.root.after(0, self.stop_tracking)
-                    return
-
-            logging.info("Starte Tracking Loop...");
-            last_process_time = time.monotonic()
-            frame_skip_counter = 0
-
-            while self.tracking_running:
-                frame_original = None; current_time = time.monotonic()
-
-                try:
-                     success = False; frame_original = None
-                     with self.camera_lock:
-                         if not self.tracking_cap or not self.tracking_cap.isOpened():
-                             if self.tracking_running:
-                                logging.warning(f"Tracking-Kamera '{camera_name}' wurde unerwartet geschlossen.")
-                             break
-                         success, frame_original = self.tracking_cap.read()
-
-                     if not success or frame_original is None or frame_original.size == 0:
-                         if not error_logged:
-                             logging.warning(f"Lesefehler oder leerer Frame beim Tracking '{camera_name}'. Warte kurz."); error_logged = True
-                         time.sleep(0.1); continue
-                     error_logged = False
-
-                     last_process_time = current_time;
-                     frame_original = cv2.flip(frame_original, 1)
-                     frame_to_show = frame_original.copy()
-
-                     frame_skip_counter += 1
-                     if frame_skip_counter >= self.applied_process_interval:
-                         frame_skip_counter = 0
-
-                         rgb_frame = cv2.cvtColor(frame_original, cv2.COLOR_BGR2RGB)
-                         rgb_frame.flags.writeable = False
-                         results = face_mesh.process(rgb_frame)
-                         rgb_frame.flags.writeable = True
-
-                         current_face_detected = bool(results.multi_face_landmarks)
-                         needs_gui_status_update = False
-
-                         if self.face_detected_status != current_face_detected:
-                             self.face_detected_status = current_face_detected
-                             needs_gui_status_update = True
-                             if not current_face_detected:
-                                  logging.info("Gesicht verloren.")
-                                  if self.x_key_down:
-                                      try: pydirectinput.keyUp('x')
-                                      except Exception as e: logging.error(f"Fehler keyUp('x') bei Gesichtsverlust: {e}")
-                                      self.x_key_down = False
-                                  if self.c_key_down:
-                                      try: pydirectinput.keyUp('c')
-                                      except Exception as e: logging.error(f"Fehler keyUp('c') bei Gesichtsverlust: {e}")
-                                      self.c_key_down = False
-                                  self.left_eye_closed_state = False; self.right_eye_closed_state = False
-                                  self.both_were_closed = False
-                                  self.left_ear_value, self.right_ear_value = 0.0, 0.0
-                             else:
-                                  logging.info("Gesicht gefunden.")
-                                  self.left_eye_closed_state = False; self.right_eye_closed_state = False
-                                  self.both_were_closed = False
-                                  self.x_key_down = False; self.c_key_down = False
-
-                         if current_face_detected:
-                             face_landmarks = results.multi_face_landmarks[0]
-                             landmarks = face_landmarks.landmark
-                             h, w = frame_original.shape[:2]
-
-                             if self.show_overlay_var.get():
-                                  try:
-                                      mp_drawing.draw_landmarks(image=frame_to_show, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_TESSELATION, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style())
-                                      mp_drawing.draw_landmarks(image=frame_to_show, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_CONTOURS, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style())
-                                      mp_drawing.draw_landmarks(image=frame_to_show, landmark_list=face_landmarks, connections=mp_face_mesh.FACEMESH_IRISES, landmark_drawing_spec=None, connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_iris_connections_style())
-                                  except AttributeError:
-                                      logging.warning("Konnte Overlay nicht zeichnen (mp_drawing Fehler).")
-                                  except Exception as e:
-                                      logging.error(f"Unbekannter Fehler beim Overlay zeichnen: {e}")
-
-                             try:
-                                 left_lm_pixels = np.array([(landmarks[idx].x * w, landmarks[idx].y * h) for idx in LEFT_EAR_IDX], dtype=np.float32)
-                                 right_lm_pixels = np.array([(landmarks[idx].x * w, landmarks[idx].y * h) for idx in RIGHT_EAR_IDX], dtype=np.float32)
-
-                                 self.left_ear_value = calculate_ear(left_lm_pixels) if len(left_lm_pixels) == 6 else 0.0
-                                 self.right_ear_value = calculate_ear(right_lm_pixels) if len(right_lm_pixels) == 6 else 0.0
-
-                                 left_state_changed = False
-                                 is_left_now = self.left_eye_closed_state
-                                 if self.left_eye_closed_state:
-                                     if self.left_ear_value > self.applied_ear_open:
-                                         is_left_now = False; left_state_changed = True
-                                 else:
-                                     if self.left_ear_value < self.applied_ear_close:
-                                         is_left_now = True; left_state_changed = True
-
-                                 right_state_changed = False
-                                 is_right_now = self.right_eye_closed_state
-                                 if self.right_eye_closed_state:
-                                     if self.right_ear_value > self.applied_ear_open:
-                                         is_right_now = False; right_state_changed = True
-                                 else:
-                                     if self.right_ear_value < self.applied_ear_close:
-                                         is_right_now = True; right_state_changed = True
-
-                                 if left_state_changed or right_state_changed:
-                                     needs_gui_status_update = True
-
-                                 both_closed_now = is_left_now and is_right_now
-
-                                 if both_closed_now != self.both_were_closed:
-                                     needs_gui_status_update = True
-                                     try:
-                                         if self.x_key_down: pydirectinput.keyUp('x'); self.x_key_down = False; logging.debug("Beide Augen Wechsel: Löse 'x'.")
-                                         if self.c_key_down: pydirectinput.keyUp('c'); self.c_key_down = False; logging.debug("Beide Augen Wechsel: Löse 'c'.")
-
-                                         if both_closed_now:
-                                             logging.info("BEIDE AUGEN GESCHLOSSEN -> Drücke X & C")
-                                             pydirectinput.keyDown('x'); pydirectinput.keyDown('c')
-                                             time.sleep(0.05)
-                                             pydirectinput.keyUp('x'); pydirectinput.keyUp('c')
-                                         else:
-                                             logging.info("BEIDE AUGEN GEÖFFNET (von geschlossen) -> Drücke X")
-                                             pydirectinput.press('x')
-
-                                     except Exception as e: logging.error(f"Fehler pydirectinput bei 'beide Augen' Wechsel: {e}")
-                                     self.both_were_closed = both_closed_now
-
-                                 elif is_left_now and not is_right_now:
-                                     if not self.x_key_down:
-                                         if self.c_key_down:
-                                             try: pydirectinput.keyUp('c'); self.c_key_down = False; logging.debug("Wechsel zu Links: Löse 'c'.")
-                                             except Exception as e: logging.error(f"Fehler keyUp('c') beim Wechsel zu links: {e}")
-                                         try:
-                                             logging.info("NUR LINKS GESCHLOSSEN -> Halte X")
-                                             pydirectinput.keyDown('x'); self.x_key_down = True; needs_gui_status_update = True
-                                         except Exception as e: logging.error(f"Fehler pydirectinput.keyDown('x'): {e}")
-
-                                 elif is_right_now and not is_left_now:
-                                     if not self.c_key_down:
-                                         if self.x_key_down:
-                                             try: pydirectinput.keyUp('x'); self.x_key_down = False; logging.debug("Wechsel zu Rechts: Löse 'x'.")
-                                             except Exception as e: logging.error(f"Fehler keyUp('x') beim Wechsel zu rechts: {e}")
-                                         try:
-                                             logging.info("NUR RECHTS GESCHLOSSEN -> Halte C")
-                                             pydirectinput.keyDown('c'); self.c_key_down = True; needs_gui_status_update = True
-                                         except Exception as e: logging.error(f"Fehler pydirectinput.keyDown('c'): {e}")
-
-                                 elif not is_left_now and not is_right_now:
-                                     released_key = False
-                                     if self.x_key_down:
-                                         try: pydirectinput.keyUp('x'); self.x_key_down = False; released_key = True; logging.info("Beide Augen offen: Löse 'x'.")
-                                         except Exception as e: logging.error(f"Fehler pydirectinput.keyUp('x'): {e}")
-                                     if self.c_key_down:
-                                         try: pydirectinput.keyUp('c'); self.c_key_down = False; released_key = True; logging.info("Beide Augen offen: Löse 'c'.")
-                                         except Exception as e: logging.error(f"Fehler pydirectinput.keyUp('c'): {e}")
-                                     if released_key: needs_gui_status_update = True
-
-                                 self.left_eye_closed_state = is_left_now
-                                 self.right_eye_closed_state = is_right_now
-
-                             except Exception as e:
-                                logging.error(f"Fehler bei EAR/Keypress Verarbeitung: {e}", exc_info=True);
-                                if self.x_key_down:
-                                    try: pydirectinput.keyUp('x'); self.x_key_down = False
-                                    except: pass
-                                if self.c_key_down:
-                                    try: pydirectinput.keyUp('c'); self.c_key_down = False
-                                    except: pass
-                                needs_gui_status_update = True
-
-                         if self.show_preview_var.get() or self.show_overlay_var.get():
-                              self._enqueue_frame(frame_to_show)
-
-                         if needs_gui_status_update and self.tracking_running:
-                             self.root.after(0, self.update_eye_status_display)
-
-                     elif self.show_preview_var.get() and not self.show_overlay_var.get():
-                          self._enqueue_frame(frame_to_show)
-
-                except Exception as e:
-                    if self.tracking_running: logging.error(f"Schwerer Fehler in Tracking-Loop-Body: {e}", exc_info=True)
-                    if self.x_key_down:
-                         try: pydirectinput.keyUp('x'); self.x_key_down = False
-                         except: pass
-                    if self.c_key_down:
-                         try: pydirectinput.keyUp('c'); self.c_key_down = False
-                         except: pass
-                    time.sleep(0.5)
-        finally:
-            logging.info(f"Tracking-Worker '{camera_name}' wird beendet...");
-            if self.x_key_down:
-                try: pydirectinput.keyUp('x'); logging.info("Worker Ende: Löse 'x'.")
-                except Exception as e: logging.warning(f"Fehler keyUp('x') am Worker Ende: {e}")
-            if self.c_key_down:
-                try: pydirectinput.keyUp('c'); logging.info("Worker Ende: Löse 'c'.")
-                except Exception as e: logging.warning(f"Fehler keyUp('c') am Worker Ende: {e}")
-
-            self._release_camera("tracking")
-            logging.info(f"Tracking-Worker '{camera_name}' sauber beendet.")
-
     def on_close(self):
         if self.is_closing: return
         self.is_closing = True; logging.info("Schließsequenz gestartet...")
@@ -1233,42 +4003,74 @@ class EyeTrackerApp:
         except tk.TclError: pass
         except Exception as e: logging.warning(f"Fehler beim Deaktivieren der GUI beim Schließen: {e}")
 
-        self.tracking_running = False; self.preview_running = False;
-        time.sleep(0.1)
+        self.preview_running = False
+        if self.preview_channel is not None: self.preview_channel.stop()
+        self.lifecycle.submit(LIFECYCLE_CMD_CLOSE)
 
-        tracking_thread_local = self.tracking_thread
-        if tracking_thread_local and tracking_thread_local.is_alive():
-            logging.info("Warte auf Tracking-Thread (on_close)...")
-            tracking_thread_local.join(timeout=5.0)
-            if tracking_thread_local.is_alive(): logging.warning("Tracking-Thread nach on_close nicht beendet.")
-            else: logging.info("Tracking-Thread (on_close) beendet.")
+    def _shutdown(self):
+        self.lifecycle.set_state(LIFECYCLE_CLOSING)
+        self.engine.close()
 
-        if self.x_key_down:
-            try: pydirectinput.keyUp('x'); logging.info("On Close: Löse evtl. hängendes 'x'.")
-            except Exception as e: logging.warning(f"On Close: Fehler keyUp('x'): {e}")
-        if self.c_key_down:
-            try: pydirectinput.keyUp('c'); logging.info("On Close: Löse evtl. hängendes 'c'.")
-            except Exception as e: logging.warning(f"On Close: Fehler keyUp('c'): {e}")
+        self.actuator.release_all("On Close")
+        self.actuator.close()
+        self.camera_watcher.stop()
+        self.settings_watcher.stop()
 
         self._stop_preview_thread()
-
-        global face_mesh
-        if face_mesh:
-            try:
-                logging.info("Schließe Mediapipe FaceMesh...")
-                face_mesh.close();
-                logging.info("Mediapipe geschlossen.")
-            except Exception as e: logging.warning(f"Fehler beim Schließen von Mediapipe: {e}")
-            finally: face_mesh = None
-
+        if self.mjpeg_stream is not None:
+            self.mjpeg_stream.stop(); self.mjpeg_stream = None
+        self.recorder.stop()
+        if self.engine.publisher is not None:
+            self.engine.publisher.stop()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+
+        if self.transition_stall_s:
+            logging.info("Größte UI-Blockade je Übergang: " + ", ".join(f"{cmd} {stall * 1000:.1f} ms" for cmd, stall in sorted(self.transition_stall_s.items())))
+        logging.info(f"Größte UI-Blockade insgesamt: {self.ui_monitor.max_s * 1000:.1f} ms")
+        try: self.root.after(0, self.finish_close)
+        except (tk.TclError, RuntimeError): pass
+        return LIFECYCLE_CLOSED
+
+    def finish_close(self):
+        self.ui_monitor.stop()
         logging.info("Zerstöre Hauptfenster...")
-        if self.root and self.root.winfo_exists():
-            try: self.root.destroy()
-            except tk.TclError: logging.info("Hauptfenster bereits zerstört.")
+        try:
+            if self.root and self.root.winfo_exists(): self.root.destroy()
+        except tk.TclError: logging.info("Hauptfenster bereits zerstört.")
         logging.info("--- Eye Tracker Application Closed ---")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LockdownEyeProtocol Eyetracker")
+    parser.add_argument("--mjpeg-port", type=int, default=None, help=f"MJPEG-Vorschau auf http://127.0.0.1:PORT/ starten (Standard-Port im GUI: {MJPEG_DEFAULT_PORT})")
+    parser.add_argument("--no-preview", action="store_true", help="Tk-Vorschau beim Start deaktivieren")
+    parser.add_argument("--metrics-port", type=int, default=None, help=f"Metrics unter http://127.0.0.1:PORT/metrics bereitstellen (üblich: {METRICS_DEFAULT_PORT})")
+    parser.add_argument("--metrics-file", default=None, help="Metrics periodisch als JSON-Snapshot in diese Datei schreiben")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_SNAPSHOT_INTERVAL_S, help="Intervall der JSON-Snapshots in Sekunden")
+    parser.add_argument("--max-faces", type=int, default=DEFAULT_MAX_FACES, help="Maximale Anzahl gleichzeitig verfolgter Gesichter")
+    parser.add_argument("--face-policy", choices=FACE_POLICIES, default=None, help="Welches Gesicht steuert die Tasten (bei --max-faces > 1, überschreibt das Profil)")
+    parser.add_argument("--gaze", choices=GAZE_MODES, default=GAZE_MODE_OFF, help="Blicksteuerung: cursor (Maus, Zwinkern = Klick) oder keys (Pfeiltasten)")
+    parser.add_argument("--min-closed-ms", type=float, default=BLINK_MIN_CLOSED_MS, help="Mindestdauer, die ein Auge als geschlossen gilt (ms, unabhängig von der FPS)")
+    parser.add_argument("--min-open-ms", type=float, default=BLINK_MIN_OPEN_MS, help="Mindestdauer, die ein Auge nach dem Öffnen als offen gilt (ms)")
+    parser.add_argument("--debounce-ms", type=float, default=BLINK_DEBOUNCE_MS, help="So lange muss ein neuer Augenzustand anliegen, bevor er übernommen wird (ms)")
+    parser.add_argument("--predict-ms", type=float, nargs='?', const=PREDICT_HORIZON_MS, default=0, help=f"Blinzel-Beginn aus der EAR-Geschwindigkeit vorhersagen; Horizont in ms (ohne Wert: {PREDICT_HORIZON_MS}, 0 = aus)")
+    parser.add_argument("--inference-width", type=int, default=None, help="Breite des Bildes für FaceMesh (Seitenverhältnis bleibt, 0 = Aufnahmeauflösung, überschreibt das Profil). Aufnahme und Vorschau bleiben scharf")
+    parser.add_argument("--optical-flow", action="store_true", default=None, help="Bei Frame-Intervall > 1 Lidpunkte auf übersprungenen Frames per Lucas-Kanade weiterführen (überschreibt das Profil)")
+    parser.add_argument("--self-benchmark", dest="self_benchmark", action="store_true", default=None, help="Beim Start Leistung messen und Kamera-Auflösung, FPS und Intervall im Profil speichern (sonst nur beim ersten Start)")
+    parser.add_argument("--no-self-benchmark", dest="self_benchmark", action="store_false", help="Auch beim ersten Start keinen Leistungstest ausführen")
+    parser.add_argument("--settings-file", default=SETTINGS_FILE, help="JSON-Datei mit Einstellungsprofilen; Änderungen werden im laufenden Betrieb übernommen")
+    parser.add_argument("--profile", default=None, help="Dieses Profil statt des in der Datei aktiven verwenden")
+    parser.add_argument("--actuator", choices=['auto'] + sorted(ACTUATOR_BACKENDS), default='auto', help="Backend für Tastenausgabe (auto: pydirectinput, dann uinput, sonst null)")
+    parser.add_argument("--publish-shm", nargs='?', const=PUBLISH_SHM_NAME, default=None, help=f"Augenzustand je Frame in einen Shared-Memory-Ring schreiben (ohne Wert: '{PUBLISH_SHM_NAME}')")
+    parser.add_argument("--publish-udp", type=int, nargs='?', const=PUBLISH_UDP_PORT, default=None, help=f"Augenzustand je Frame als UDP-Datagramm an 127.0.0.1:PORT senden (ohne Wert: {PUBLISH_UDP_PORT})")
+    parser.add_argument("--publish-landmarks", action="store_true", help="Augen- und Iris-Punkte mitveröffentlichen")
+    parser.add_argument("--record-video", action="store_true", help=f"Vorschaubild inkl. Overlay als Video nach {RECORD_DIR} aufzeichnen (auch über den Schalter 'Aufnahme')")
+    parser.add_argument("--replay-seconds", type=float, nargs='?', const=RECORD_REPLAY_DEFAULT_S, default=0, help=f"Die letzten N Sekunden im Speicher halten und per F9/Knopf speichern (ohne Wert: {RECORD_REPLAY_DEFAULT_S}, 0 = aus)")
+    parser.add_argument("--record-keys", action="store_true", help="Tastenereignisse mit Zeitstempel mitschreiben und beim Beenden ins Log ausgeben")
+    args = parser.parse_args()
+
+    setup_logging()
     if platform.system() == "Windows":
         try:
             from ctypes import windll
@@ -1279,15 +4081,18 @@ if __name__ == "__main__":
 
     logging.info("Starte Applikations-Hauptblock.")
 
+    config = EngineConfig(max_faces=max(1, args.max_faces), gaze_mode=args.gaze,
+                          min_closed_ms=max(0.0, args.min_closed_ms), min_open_ms=max(0.0, args.min_open_ms),
+                          debounce_ms=max(0.0, args.debounce_ms), predict_ms=max(0.0, args.predict_ms))
     try:
-        logging.info("Initialisiere Mediapipe FaceMesh (CPU)...")
-        face_mesh = mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5)
-        logging.info("Mediapipe FaceMesh initialisiert.")
+        actuator = create_actuator(args.actuator, record=args.record_keys)
+    except Exception as e:
+        logging.error(f"Tastenausgabe '{args.actuator}' konnte nicht gestartet werden: {e}. Verwende Null-Backend.")
+        actuator = create_actuator('null', record=args.record_keys)
 
+    engine = TrackerEngine(config, actuator=actuator)
+    try:
+        engine.load_model()
     except Exception as e:
         logging.error(f"Fehler Initialisierung Mediapipe: {e}", exc_info=True)
         try:
@@ -1297,7 +4102,7 @@ if __name__ == "__main__":
         except Exception as e2:
             print(f"FEHLER: Mediapipe konnte nicht initialisiert werden: {e}")
             print(f"FEHLER: Konnte keine Fehler-MessageBox anzeigen: {e2}")
-        face_mesh = None; exit(1)
+        exit(1)
 
     theme_name = 'darkly'
     logging.info(f"Verwende ttkbootstrap Theme: '{theme_name}'")
@@ -1307,10 +4112,36 @@ if __name__ == "__main__":
         logging.error(f"Fehler beim Laden von ttkbootstrap Theme '{theme_name}': {e}. Fallback auf Standard Tk.")
         root = tk.Tk()
 
-    app = EyeTrackerApp(root)
+    metrics_exporter = None
+    if args.metrics_port is not None or args.metrics_file:
+        metrics_exporter = MetricsExporter(engine.metrics, port=args.metrics_port, snapshot_path=args.metrics_file, snapshot_interval=args.metrics_interval)
+        try: metrics_exporter.start()
+        except OSError as e:
+            logging.error(f"Metrics-Export konnte nicht gestartet werden: {e}")
+            metrics_exporter = None
+
+    publisher = None
+    if args.publish_shm or args.publish_udp is not None:
+        publisher = StatePublisher(shm_name=args.publish_shm, udp_port=args.publish_udp, landmarks=args.publish_landmarks)
+        try: publisher.start()
+        except OSError as e:
+            logging.error(f"Zustands-Veröffentlichung konnte nicht gestartet werden: {e}")
+            publisher.stop(); publisher = None
+    engine.publisher = publisher
+
+    profile_overrides = {'face_policy': args.face_policy, 'optical_flow': args.optical_flow,
+                         'inference_width': None if args.inference_width is None else max(0, args.inference_width)}
+    app = EyeTrackerApp(root, engine=engine, mjpeg_port=args.mjpeg_port, show_preview=not args.no_preview, metrics_exporter=metrics_exporter,
+                        settings_store=SettingsStore(args.settings_file, args.profile), profile_overrides=profile_overrides,
+                        record_video=args.record_video, replay_s=max(0.0, args.replay_seconds), self_benchmark=args.self_benchmark)
     try:
         root.mainloop()
     except KeyboardInterrupt:
         logging.info("KeyboardInterrupt empfangen. Beende Anwendung...")
         app.on_close()
+        app.lifecycle.closed.wait(CLOSE_JOIN_TIMEOUT_S + THREAD_JOIN_TIMEOUT_S)
+        app.finish_close()
+    if isinstance(actuator, RecordingActuator):
+        logging.info(f"Aufgezeichnete Tastenereignisse: {len(actuator.events)}")
+        for t, action, key in actuator.events: logging.info(f"  {t:.4f} {action:<4} {key}")
     logging.info("Applikations-Hauptschleife beendet.")
\ No newline at end of file
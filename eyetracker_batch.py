@@ -0,0 +1,269 @@
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from LockdownEyetracker import (
+    calculate_ear, eye_index_sets, landmarks_to_pixels, mp_face_mesh,
+    DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN,
+)
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v')
+DEFAULT_CHUNK_FRAMES = 1800
+DEFAULT_OVERLAP_FRAMES = 30
+PROGRESS_INTERVAL_S = 2.0
+
+_worker_mesh = None
+
+
+def _init_worker():
+    global _worker_mesh
+    logging.disable(logging.INFO)
+    cv2.setNumThreads(1)
+    _worker_mesh = mp_face_mesh.FaceMesh(
+        max_num_faces=1, refine_landmarks=True,
+        min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def find_videos(paths):
+    # (Pfad, Ausgabename): Ausgabename ist der Pfad relativ zum Eingabeverzeichnis ohne Endung
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for f in sorted(files):
+                    if not f.lower().endswith(VIDEO_EXTENSIONS): continue
+                    video = os.path.join(root, f)
+                    videos.append((video, os.path.splitext(os.path.relpath(video, path))[0]))
+        elif os.path.isfile(path):
+            videos.append((path, os.path.splitext(os.path.basename(path))[0]))
+        else:
+            logging.warning(f"Pfad nicht gefunden: {path}")
+    return videos
+
+
+def output_collisions(videos):
+    by_name = {}
+    for path, name in videos:
+        by_name.setdefault(os.path.normcase(os.path.normpath(name)), []).append(path)
+    return {name: paths for name, paths in by_name.items() if len(paths) > 1}
+
+
+def probe_video(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened(): return 0, 0.0
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if frames <= 0:
+            frames = 0
+            while cap.grab(): frames += 1
+        return frames, fps
+    finally:
+        cap.release()
+
+
+def plan_chunks(path, frames, chunk_frames, overlap):
+    chunks = []
+    for start in range(0, frames, chunk_frames):
+        end = min(frames, start + chunk_frames)
+        chunks.append((path, max(0, start - overlap), start, end))
+    return chunks
+
+
+def annotate_chunk(path, read_start, start, end):
+    n = end - start
+    left = np.full(n, np.nan, dtype=np.float32)
+    right = np.full(n, np.nan, dtype=np.float32)
+    face = np.zeros(n, dtype=bool)
+    left_idx, right_idx = eye_index_sets()
+    cap = cv2.VideoCapture(path)
+    t0 = time.perf_counter()
+    processed = 0
+    try:
+        if read_start > 0: cap.set(cv2.CAP_PROP_POS_FRAMES, read_start)
+        for frame_idx in range(read_start, end):
+            ret, frame = cap.read()
+            if not ret: break
+            processed += 1
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            rgb.flags.writeable = False
+            results = _worker_mesh.process(rgb)
+            if frame_idx < start or not results.multi_face_landmarks: continue
+            h, w = frame.shape[:2]
+            landmarks = results.multi_face_landmarks[0].landmark
+            i = frame_idx - start
+            face[i] = True
+            left[i] = calculate_ear(landmarks_to_pixels(landmarks, left_idx, w, h))
+            right[i] = calculate_ear(landmarks_to_pixels(landmarks, right_idx, w, h))
+    finally:
+        cap.release()
+    return path, start, left, right, face, processed, time.perf_counter() - t0
+
+
+def detect_closures(ear, face, ear_close, ear_open):
+    closed = np.zeros(len(ear), dtype=bool)
+    is_closed = False
+    for i in range(len(ear)):
+        if not face[i]: is_closed = False
+        elif is_closed: is_closed = not ear[i] > ear_open
+        else: is_closed = ear[i] < ear_close
+        closed[i] = is_closed
+    return closed
+
+
+def closure_intervals(closed):
+    padded = np.concatenate(([False], closed, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def blink_events(left, right, face, fps, ear_close, ear_open):
+    left_closed = detect_closures(left, face, ear_close, ear_open)
+    right_closed = detect_closures(right, face, ear_close, ear_open)
+    both = left_closed & right_closed
+    events = []
+    for kind, mask, ears in (('both', both, np.fmin(left, right)),
+                             ('left', left_closed & ~right_closed, left),
+                             ('right', right_closed & ~left_closed, right)):
+        for s, e in closure_intervals(mask):
+            events.append((kind, int(s), int(e), float(s / fps), float((e - s) / fps), float(np.nanmin(ears[s:e]))))
+    events.sort(key=lambda ev: (ev[1], ev[0]))
+    return events
+
+
+def write_outputs(out_dir, name, fps, left, right, face, events):
+    ear_path = os.path.join(out_dir, f"{name}.ear.csv")
+    events_path = os.path.join(out_dir, f"{name}.blinks.csv")
+    os.makedirs(os.path.dirname(ear_path), exist_ok=True)
+    with open(ear_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['frame', 'time_s', 'face', 'left_ear', 'right_ear'])
+        for i in range(len(left)):
+            writer.writerow([i, f"{i / fps:.4f}", int(face[i]),
+                             '' if np.isnan(left[i]) else f"{left[i]:.4f}",
+                             '' if np.isnan(right[i]) else f"{right[i]:.4f}"])
+    with open(events_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['type', 'start_frame', 'end_frame', 'start_s', 'duration_s', 'min_ear'])
+        for kind, s, e, start_s, duration_s, min_ear in events:
+            writer.writerow([kind, s, e, f"{start_s:.4f}", f"{duration_s:.4f}", f"{min_ear:.4f}"])
+    return ear_path, events_path
+
+
+def run_batch(videos, out_dir, workers, chunk_frames, overlap, ear_close, ear_open, quiet=False):
+    meta, chunks = {}, []
+    names = dict(videos)
+    for path, _ in videos:
+        frames, fps = probe_video(path)
+        if frames <= 0:
+            logging.warning(f"Video nicht lesbar oder leer: {path}")
+            continue
+        meta[path] = (frames, fps)
+        chunks.extend(plan_chunks(path, frames, chunk_frames, overlap))
+    total_frames = sum(frames for frames, _ in meta.values())
+    if not chunks:
+        print("Keine Videos zu verarbeiten.")
+        return None
+
+    series = {path: (np.full(frames, np.nan, np.float32), np.full(frames, np.nan, np.float32), np.zeros(frames, bool))
+              for path, (frames, _) in meta.items()}
+    remaining = {path: sum(1 for c in chunks if c[0] == path) for path in meta}
+    done_frames = decoded_frames = 0
+    worker_s = 0.0
+    t0 = last_report = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(annotate_chunk, *chunk) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, start, left, right, face, processed, elapsed = future.result()
+            l, r, fc = series[path]
+            l[start:start + len(left)] = left; r[start:start + len(right)] = right; fc[start:start + len(face)] = face
+            done_frames += len(left); decoded_frames += processed; worker_s += elapsed
+            remaining[path] -= 1
+            if remaining[path] == 0:
+                frames, fps = meta[path]
+                events = blink_events(l, r, fc, fps, ear_close, ear_open)
+                ear_path, _ = write_outputs(out_dir, names[path], fps, l, r, fc, events)
+                if not quiet: print(f"  fertig: {os.path.basename(path)} ({frames} Frames, {len(events)} Ereignisse, Gesicht in {fc.mean() * 100:.0f}%) -> {ear_path}")
+            now = time.perf_counter()
+            if not quiet and (now - last_report >= PROGRESS_INTERVAL_S or done == len(futures)):
+                rate = done_frames / max(now - t0, 1e-9)
+                eta = (total_frames - done_frames) / rate if rate > 0 else 0.0
+                print(f"  {done}/{len(futures)} Chunks, {done_frames}/{total_frames} Frames, {rate:.1f} FPS, ETA {eta:.0f} s")
+                last_report = now
+
+    wall = time.perf_counter() - t0
+    return {
+        'videos': len(meta), 'chunks': len(chunks), 'frames': total_frames, 'wall_s': wall,
+        'fps': total_frames / wall, 'per_worker_fps': decoded_frames / worker_s if worker_s > 0 else 0.0,
+        'overlap_overhead': decoded_frames / max(1, total_frames) - 1.0,
+    }
+
+
+def print_report(workers, report):
+    print(f"\n{report['videos']} Videos, {report['chunks']} Chunks, {report['frames']} Frames in {report['wall_s']:.1f} s")
+    print(f"  Durchsatz: {report['fps']:.1f} FPS mit {workers} Prozessen ({report['per_worker_fps']:.1f} FPS je Prozess)")
+    print(f"  Effizienz: {report['fps'] / max(1e-9, report['per_worker_fps'] * workers) * 100:.0f}%, Overlap-Mehraufwand {report['overlap_overhead'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blinzel-Annotation aufgezeichneter Videos (FaceMesh + EAR) parallel über alle CPU-Kerne.")
+    parser.add_argument("inputs", nargs='+', help="Videodateien oder Verzeichnisse")
+    parser.add_argument("-o", "--output", default="annotations", help="Ausgabeverzeichnis")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="Anzahl Worker-Prozesse")
+    parser.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES, help="Frames pro Chunk")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP_FRAMES, help="Vorlauf-Frames pro Chunk (Tracking-Aufwärmphase)")
+    parser.add_argument("--ear-close", type=float, default=DEFAULT_EAR_CLOSE)
+    parser.add_argument("--ear-open", type=float, default=DEFAULT_EAR_OPEN)
+    parser.add_argument("--scaling", action="store_true", help="Durchsatz mit 1, 2, 4 ... Prozessen messen")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if not 0 < args.ear_close < args.ear_open:
+        parser.error("Es muss gelten: 0 < --ear-close < --ear-open")
+    if args.workers < 1: parser.error("--workers muss >= 1 sein")
+    if args.chunk_frames < 1: parser.error("--chunk-frames muss >= 1 sein")
+    if args.overlap < 0: parser.error("--overlap muss >= 0 sein")
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("Keine Videos gefunden.")
+        return 1
+    collisions = output_collisions(videos)
+    if collisions:
+        print("Mehrere Videos würden dieselben Ausgabedateien schreiben:", file=sys.stderr)
+        for name, paths in sorted(collisions.items()):
+            print(f"  {name}.ear.csv <- {', '.join(paths)}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    if args.scaling:
+        counts, n = [], 1
+        while n < args.workers: counts.append(n); n *= 2
+        counts.append(args.workers)
+        base = None
+        print(f"{'Prozesse':>8} | {'FPS':>8} | {'Speedup':>8} | {'Effizienz':>9}")
+        for workers in counts:
+            report = run_batch(videos, args.output, workers, args.chunk_frames, args.overlap, args.ear_close, args.ear_open, quiet=True)
+            if report is None: return 1
+            base = base or report['fps']
+            speedup = report['fps'] / base
+            print(f"{workers:>8} | {report['fps']:8.1f} | {speedup:7.2f}x | {speedup / workers * 100:8.0f}%")
+        return 0
+
+    print(f"{len(videos)} Videos, {args.workers} Prozesse, Chunks à {args.chunk_frames} Frames (+{args.overlap} Vorlauf)")
+    report = run_batch(videos, args.output, args.workers, args.chunk_frames, args.overlap, args.ear_close, args.ear_open)
+    if report is None: return 1
+    print_report(args.workers, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
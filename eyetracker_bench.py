@@ -0,0 +1,733 @@
+import argparse
+import json
+import logging
+import platform
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from LockdownEyetracker import (
+    calculate_ear, eye_index_sets, landmarks_to_pixels, mirror_for_display, prepare_preview_image,
+    draw_face_overlay, InferenceScaler, EyeFlowTracker, EarRingBuffer, sparkline_coords, SPARKLINE_WINDOW_S,
+    StatePublisher, EyeStateSnapshot, mp_face_mesh, FramePacer, BlinkStateMachine, TrackerMetrics,
+    CaptureChannel, CAPTURE_CMD_STOP, LifecycleController, LIFECYCLE_CMD_CLOSE, UI_STALL_PROBE_MS,
+    faces_eye_points, batch_calculate_ear, FaceTracker, gaze_offsets, GazeController, GAZE_MODE_CURSOR, GAZE_MODE_KEYS,
+    GUI_PREVIEW_WIDTH, GUI_PREVIEW_HEIGHT, OVERLAY_DETAIL_FULL, OVERLAY_DETAIL_MINIMAL,
+    synthetic_face_frame, measure_capability, choose_capability_settings, DEFAULT_CPU_BUDGET_PERCENT,
+)
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+    LANDMARK_PB2_AVAILABLE = True
+except ImportError:
+    LANDMARK_PB2_AVAILABLE = False
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+FACE_COUNTS = (1, 2, 4, 8)
+NUM_LANDMARKS = 478
+DEFAULT_BASELINE_FILE = "bench_baseline.json"
+DEFAULT_THRESHOLD_PERCENT = 15.0
+MIN_SAMPLE_S = 200e-6
+INFERENCE_CAPTURE = (1280, 720)
+INFERENCE_WIDTHS = (0, 640, 480, 320, 256, 192, 160)
+INFERENCE_FRAMES = 120
+SENSOR_NOISE_SIGMA = 6.0
+FLOW_FPS = 30
+FLOW_SIZE = (640, 480)
+FLOW_BLINKS_MS = ((0.6, 100), (1.5, 133), (2.4, 167), (3.3, 200), (4.2, 300), (5.1, 100))
+FLOW_DURATION_S = 6.0
+FLOW_INTERVALS = (2, 3, 4)
+FLOW_EAR_CLOSE = 0.28
+FLOW_EAR_OPEN = 0.34
+
+BENCHMARKS = {}
+_CLEANUP = []
+
+
+def benchmark(name):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+class NullKeys:
+    def keyDown(self, key): pass
+    def keyUp(self, key): pass
+    def press(self, key): pass
+    def move_to(self, x, y): pass
+
+
+def synthetic_frame(w, h, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+
+def noisy(frame, rng, sigma=SENSOR_NOISE_SIGMA):
+    return np.clip(frame + rng.normal(0.0, sigma, frame.shape), 0, 255).astype(np.uint8)
+
+
+def synthetic_points(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.3, 0.7, size=(NUM_LANDMARKS, 3))
+
+
+def synthetic_landmarks(seed=0):
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in synthetic_points(seed)]
+
+
+def synthetic_landmark_list(seed=0):
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in synthetic_points(seed):
+        landmark_list.landmark.add(x=float(x), y=float(y), z=float(z))
+    return landmark_list
+
+
+def synthetic_ear_sequence(length=240, seed=0):
+    rng = np.random.default_rng(seed)
+    pattern = [(0.30, 0.30)] * 6 + [(0.10, 0.30)] * 4 + [(0.30, 0.30)] * 4 + [(0.30, 0.10)] * 4 + [(0.30, 0.30)] * 4 + [(0.10, 0.10)] * 3
+    seq = np.array([pattern[i % len(pattern)] for i in range(length)], dtype=np.float64)
+    return seq + rng.normal(0.0, 0.005, size=seq.shape)
+
+
+def display_size(w, h):
+    scale = min((GUI_PREVIEW_WIDTH - 10) / w, (GUI_PREVIEW_HEIGHT - 30) / h, 1.0)
+    return int(w * scale), int(h * scale)
+
+
+def measure(fn, iterations, warmup=10):
+    for _ in range(warmup): fn()
+    batch = 1
+    t0 = time.perf_counter(); fn(); single = time.perf_counter() - t0
+    if single < MIN_SAMPLE_S: batch = max(1, int(MIN_SAMPLE_S / max(single, 1e-8)))
+    samples = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        for _ in range(batch): fn()
+        samples[i] = (time.perf_counter() - t0) / batch
+    return float(np.median(samples) * 1e6), float(np.percentile(samples, 95) * 1e6)
+
+
+@benchmark("ear/calculate_ear")
+def _bench_calculate_ear():
+    pts = landmarks_to_pixels(synthetic_landmarks(), eye_index_sets()[0], 640, 480)
+    return lambda: calculate_ear(pts)
+
+
+@benchmark("landmarks/to_pixels_both_eyes")
+def _bench_landmarks_to_pixels():
+    landmarks = synthetic_landmarks()
+    left_idx, right_idx = eye_index_sets()
+    def run():
+        landmarks_to_pixels(landmarks, left_idx, 640, 480)
+        landmarks_to_pixels(landmarks, right_idx, 640, 480)
+    return run
+
+
+def _register_frame_benchmarks():
+    for w, h in RESOLUTIONS:
+        def flip_factory(w=w, h=h):
+            frame = synthetic_frame(w, h)
+            return lambda: cv2.flip(frame, 1)
+
+        def cvt_factory(w=w, h=h):
+            frame = synthetic_frame(w, h)
+            return lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        def preview_factory(w=w, h=h):
+            frame = synthetic_frame(w, h)
+            return lambda: prepare_preview_image(frame, GUI_PREVIEW_WIDTH - 10, GUI_PREVIEW_HEIGHT - 30)
+
+        benchmark(f"frame/flip_{w}x{h}")(flip_factory)
+        benchmark(f"frame/cvtcolor_{w}x{h}")(cvt_factory)
+        benchmark(f"preview/display_chain_{w}x{h}")(preview_factory)
+
+_register_frame_benchmarks()
+
+
+@benchmark("flow/propagate_640x480")
+def _bench_flow_propagate():
+    frames = [synthetic_face_frame(640, 480, openness) for openness in (1.0, 0.7)]
+    points = faces_eye_points([SimpleNamespace(landmark=synthetic_landmarks())], 640, 480)[0]
+    (x0, y0), (x1, y1) = points.reshape(-1, 2).min(axis=0), points.reshape(-1, 2).max(axis=0)
+    points = (points - (x0, y0)) / max(x1 - x0, 1.0) * (140, 40) + (250, 190)
+    flow = EyeFlowTracker()
+    state = {'i': 0}
+    def run():
+        state['i'] += 1
+        if not flow.active: flow.anchor(frames[0], points)
+        flow.propagate(frames[state['i'] % 2])
+    return run
+
+
+def _inference_prepare_factory(width):
+    def factory():
+        frame = synthetic_frame(*INFERENCE_CAPTURE)
+        scaler = InferenceScaler(width)
+        return lambda: scaler.prepare(frame)
+    return factory
+
+for _width in (0, 320):
+    benchmark(f"inference/prepare_{INFERENCE_CAPTURE[0]}x{INFERENCE_CAPTURE[1]}_to_{_width or 'full'}")(_inference_prepare_factory(_width))
+
+
+def _overlay_factory(detail):
+    def factory():
+        if not LANDMARK_PB2_AVAILABLE: return None
+        landmark_list = synthetic_landmark_list()
+        frame = synthetic_frame(640, 480)
+        return lambda: draw_face_overlay(frame, landmark_list, detail)
+    return factory
+
+benchmark("overlay/full_640x480")(_overlay_factory(OVERLAY_DETAIL_FULL))
+benchmark("overlay/minimal_640x480")(_overlay_factory(OVERLAY_DETAIL_MINIMAL))
+
+
+@benchmark("multiface/legacy_single_face")
+def _bench_legacy_single_face():
+    landmarks = synthetic_landmarks()
+    left_idx, right_idx = eye_index_sets()
+    def run():
+        calculate_ear(landmarks_to_pixels(landmarks, left_idx, 640, 480))
+        calculate_ear(landmarks_to_pixels(landmarks, right_idx, 640, 480))
+    return run
+
+
+def _register_multiface_benchmarks():
+    for n in FACE_COUNTS:
+        def factory(n=n):
+            faces = [SimpleNamespace(landmark=synthetic_landmarks(seed)) for seed in range(n)]
+            tracker = FaceTracker()
+            state = {'t': 0.0}
+            def run():
+                state['t'] += 0.033
+                points = faces_eye_points(faces, 640, 480)
+                batch_calculate_ear(points)
+                ids, centroids, sizes = tracker.update(points, state['t'])
+                tracker.select(ids, centroids, sizes, 640, 480)
+            return run
+        benchmark(f"multiface/ear_track_select_{n}faces")(factory)
+
+_register_multiface_benchmarks()
+
+
+def _gaze_factory(mode):
+    def factory():
+        faces = [SimpleNamespace(landmark=synthetic_landmarks())]
+        controller = GazeController(NullKeys(), mode, (1920, 1080))
+        state = {'t': 0.0}
+        def run():
+            state['t'] += 0.033
+            points = faces_eye_points(faces, 640, 480, with_iris=True)
+            batch_calculate_ear(points)
+            controller.update(gaze_offsets(points[0]), state['t'])
+        return run
+    return factory
+
+benchmark("gaze/frame_cursor")(_gaze_factory(GAZE_MODE_CURSOR))
+benchmark("gaze/frame_keys")(_gaze_factory(GAZE_MODE_KEYS))
+
+
+@benchmark("gaze/offsets_only")
+def _bench_gaze_offsets():
+    points = faces_eye_points([SimpleNamespace(landmark=synthetic_landmarks())], 640, 480, with_iris=True)
+    return lambda: gaze_offsets(points[0])
+
+
+def _state_machine_factory(predict_ms):
+    def factory():
+        machine = BlinkStateMachine(NullKeys(), predict_ms=predict_ms)
+        machine.set_face_detected(True)
+        seq = synthetic_ear_sequence()
+        state = {'i': 0, 't': 0.0}
+        def run():
+            i = state['i']; state['i'] = (i + 1) % len(seq); state['t'] += 1.0 / 30.0
+            machine.update(seq[i, 0], seq[i, 1], state['t'])
+        return run
+    return factory
+
+benchmark("state_machine/step")(_state_machine_factory(0))
+benchmark("state_machine/step_predictive")(_state_machine_factory(40))
+
+
+@benchmark("sparkline/ring_append")
+def _bench_sparkline_append():
+    history = EarRingBuffer()
+    return lambda: history.append(time.monotonic(), 0.3, 0.31)
+
+
+@benchmark("sparkline/window_and_coords_60fps")
+def _bench_sparkline_coords():
+    history = EarRingBuffer()
+    seq = synthetic_ear_sequence(history.capacity)
+    for i, (left, right) in enumerate(seq): history.append(i / 60.0, left, right)
+    now = (history.capacity - 1) / 60.0
+    def run():
+        t, left, right = history.window(now - SPARKLINE_WINDOW_S)
+        sparkline_coords(t, left, now, 400, 64)
+        sparkline_coords(t, right, now, 400, 64)
+    return run
+
+
+def _publish_factory(shm, udp):
+    def factory():
+        publisher = StatePublisher(shm_name="eyetracker_bench" if shm else None, udp_port=9 if udp else None, landmarks=True)
+        publisher.start()
+        state = EyeStateSnapshot(1, time.monotonic(), True, 0.31, 0.12, False, True, False, False, True)
+        points = faces_eye_points([SimpleNamespace(landmark=synthetic_landmarks())], 640, 480, with_iris=True)[0]
+        _CLEANUP.append(publisher.stop)
+        return lambda: publisher.publish(state, points, (640, 480))
+    return factory
+
+benchmark("publish/shm_with_landmarks")(_publish_factory(True, False))
+benchmark("publish/udp_with_landmarks")(_publish_factory(False, True))
+
+
+@benchmark("metrics/record_frame_and_inference")
+def _bench_metrics():
+    metrics = TrackerMetrics()
+    def run():
+        metrics.record_frame(1.0)
+        metrics.record_inference(0.01, True)
+    return run
+
+
+def run_suite(iterations, name_filter=None):
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if name_filter and name_filter not in name: continue
+        fn = factory()
+        if fn is None:
+            print(f"  {name:<40} übersprungen (Abhängigkeit fehlt)")
+            continue
+        median_us, p95_us = measure(fn, iterations)
+        results[name] = {'median_us': median_us, 'p95_us': p95_us}
+        print(f"  {name:<40} {median_us:12.2f} µs  (p95 {p95_us:10.2f} µs)")
+        while _CLEANUP: _CLEANUP.pop()()
+    return results
+
+
+def save_baseline(path, results):
+    data = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+        },
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=2)
+    print(f"Baseline gespeichert: {path}")
+
+
+def compare_with_baseline(path, results, threshold_percent):
+    with open(path, encoding='utf-8') as f: baseline = json.load(f).get('results', {})
+    regressions = []
+    print(f"\nVergleich mit Baseline '{path}' (Schwelle +{threshold_percent:.1f}%)")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"  {name:<40} neu (keine Baseline)")
+            continue
+        change = (current['median_us'] - base['median_us']) / base['median_us'] * 100.0 if base['median_us'] > 0 else 0.0
+        flag = "REGRESSION" if change > threshold_percent else "ok"
+        print(f"  {name:<40} {base['median_us']:10.2f} -> {current['median_us']:10.2f} µs  {change:+7.1f}%  {flag}")
+        if change > threshold_percent: regressions.append(name)
+    if regressions:
+        print(f"\n{len(regressions)} Benchmark(s) über der Schwelle: {', '.join(regressions)}")
+    else:
+        print("\nKeine Regression.")
+    return not regressions
+
+
+def bench_mirror(iterations):
+    landmarks = synthetic_landmarks()
+    rows = []
+    for w, h in RESOLUTIONS:
+        frame = synthetic_frame(w, h)
+        dw, dh = display_size(w, h)
+
+        def legacy():
+            flipped = cv2.flip(frame, 1)
+            shown = flipped.copy()
+            cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB)
+            calculate_ear(np.array([(landmarks[i].x * w, landmarks[i].y * h) for i in eye_index_sets(False)[0]], dtype=np.float32))
+            calculate_ear(np.array([(landmarks[i].x * w, landmarks[i].y * h) for i in eye_index_sets(False)[1]], dtype=np.float32))
+            cv2.cvtColor(cv2.resize(shown, (dw, dh), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+
+        def mirrored():
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            left_idx, right_idx = eye_index_sets()
+            calculate_ear(landmarks_to_pixels(landmarks, left_idx, w, h))
+            calculate_ear(landmarks_to_pixels(landmarks, right_idx, w, h))
+            small = cv2.resize(frame, (dw, dh), interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(mirror_for_display(small), cv2.COLOR_BGR2RGB)
+
+        def mirrored_hidden():
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            left_idx, right_idx = eye_index_sets()
+            calculate_ear(landmarks_to_pixels(landmarks, left_idx, w, h))
+            calculate_ear(landmarks_to_pixels(landmarks, right_idx, w, h))
+
+        rows.append((f"{w}x{h}", measure(legacy, iterations), measure(mirrored, iterations), measure(mirrored_hidden, iterations)))
+    return rows
+
+
+def report_mirror(iterations):
+    print("Spiegelung: Pixel-Flip (alt) vs. Landmark-Spiegelung (neu), Median/p95 in µs pro Frame")
+    print(f"{'Auflösung':>10} | {'alt (Flip+Kopie)':>20} | {'neu (Vorschau an)':>20} | {'neu (Vorschau aus)':>20}")
+    for res, legacy, mirrored, hidden in bench_mirror(iterations):
+        print(f"{res:>10} | {legacy[0]:9.1f} / {legacy[1]:8.1f} | {mirrored[0]:9.1f} / {mirrored[1]:8.1f} | {hidden[0]:9.1f} / {hidden[1]:8.1f}")
+
+
+def bench_pacing(duration=2.0, fps=30):
+    frame = synthetic_frame(640, 480)
+
+    def fake_read():
+        return cv2.resize(frame, (320, 240), interpolation=cv2.INTER_AREA)
+
+    def busy_wait():
+        last_t = time.monotonic(); frames = 0; end = last_t + duration
+        while time.monotonic() < end:
+            curr_t = time.monotonic()
+            if curr_t - last_t < 0.015: time.sleep(0.005); continue
+            last_t = curr_t; fake_read(); frames += 1
+        return frames
+
+    def paced():
+        pacer = FramePacer(fps); frames = 0; end = time.monotonic() + duration
+        while pacer.wait(lambda: time.monotonic() < end):
+            fake_read(); frames += 1
+        return frames, pacer.stats()
+
+    cpu0 = time.process_time(); frames_old = busy_wait(); cpu_old = time.process_time() - cpu0
+    cpu0 = time.process_time(); frames_new, (_, jitter_new) = paced(); cpu_new = time.process_time() - cpu0
+    return (frames_old / duration, cpu_old / duration * 100), (frames_new / duration, cpu_new / duration * 100, jitter_new)
+
+
+def report_pacing(iterations):
+    (old_rate, old_cpu), (new_rate, new_cpu, new_jitter) = bench_pacing()
+    print("Vorschau-Pacing mit nicht blockierender Kamera (Ziel 30 FPS)")
+    print(f"  Busy-Wait (alt): {old_rate:6.1f} FPS, CPU {old_cpu:5.1f}%")
+    print(f"  FramePacer (neu): {new_rate:6.1f} FPS, CPU {new_cpu:5.1f}%, Jitter {new_jitter:.2f} ms")
+
+
+def bench_inference(frames=INFERENCE_FRAMES, capture=INFERENCE_CAPTURE, widths=INFERENCE_WIDTHS):
+    w, h = capture
+    base = synthetic_face_frame(w, h)
+    left_idx, right_idx = eye_index_sets()
+    rows, reference = [], None
+    for width in widths:
+        scaler = InferenceScaler(width)
+        mesh = mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        rng = np.random.default_rng(0)
+        times, prepare_times, ears = [], [], []
+        try:
+            for i in range(frames + 5):
+                frame = noisy(base, rng)
+                t0 = time.perf_counter()
+                rgb = scaler.prepare(frame)
+                t1 = time.perf_counter()
+                results = mesh.process(rgb)
+                t2 = time.perf_counter()
+                if i < 5 or not results.multi_face_landmarks: continue
+                landmarks = results.multi_face_landmarks[0].landmark
+                times.append(t2 - t0); prepare_times.append(t1 - t0)
+                ears.append((calculate_ear(landmarks_to_pixels(landmarks, left_idx, w, h)), calculate_ear(landmarks_to_pixels(landmarks, right_idx, w, h))))
+        finally:
+            mesh.close()
+        size = scaler.target_size(w, h)
+        if not ears:
+            rows.append((size, None, None, None, None, 0.0)); continue
+        ears = np.array(ears)
+        mean = ears.mean(axis=0)
+        if reference is None: reference = mean
+        rows.append((size, float(np.median(times) * 1000), float(np.median(prepare_times) * 1000), float(ears.std(axis=0).mean()), float(np.abs(mean - reference).mean()), len(ears) / frames))
+    return rows
+
+
+def report_inference(iterations):
+    print(f"Inferenz-Auflösung bei Aufnahme {INFERENCE_CAPTURE[0]}x{INFERENCE_CAPTURE[1]} (synthetisches Gesicht, Sensorrauschen σ={SENSOR_NOISE_SIGMA:.0f}, {INFERENCE_FRAMES} Frames)")
+    print(f"{'Inferenz':>10} | {'gesamt (ms)':>11} | {'davon Skalierung':>16} | {'EAR-Rauschen σ':>14} | {'EAR-Abweichung':>14} | {'Erkannt':>7}")
+    for (iw, ih), ms, prepare_ms, noise, bias, found in bench_inference():
+        if ms is None:
+            print(f"{f'{iw}x{ih}':>10} | {'-':>11} | {'-':>16} | {'-':>14} | {'-':>14} | {found * 100:6.0f}%"); continue
+        print(f"{f'{iw}x{ih}':>10} | {ms:11.2f} | {prepare_ms:16.2f} | {noise:14.4f} | {bias:14.4f} | {found * 100:6.0f}%")
+
+
+def blink_openness(t, blinks=FLOW_BLINKS_MS):
+    for start, duration_ms in blinks:
+        phase = (t - start) / (duration_ms / 1000.0)
+        if 0.0 <= phase <= 1.0: return abs(1.0 - 2.0 * phase) ** 0.7
+    return 1.0
+
+
+def flow_sequence(fps=FLOW_FPS, size=FLOW_SIZE, duration=FLOW_DURATION_S):
+    w, h = size
+    rng = np.random.default_rng(1)
+    frames, openness = [], []
+    for i in range(int(duration * fps)):
+        t = i / fps
+        openness.append(blink_openness(t))
+        shift = np.float32([[1, 0, 6.0 * np.sin(2 * np.pi * t / 2.0)], [0, 1, 3.0 * np.sin(2 * np.pi * t / 3.0)]])
+        frame = cv2.warpAffine(synthetic_face_frame(w, h, openness[-1]), shift, (w, h), borderMode=cv2.BORDER_REPLICATE)
+        frames.append(noisy(frame, rng))
+    return frames, np.array(openness)
+
+
+def count_blinks(ears, fps=FLOW_FPS, blinks=FLOW_BLINKS_MS):
+    closed, detected = False, np.zeros(len(ears), dtype=bool)
+    for i, ear in enumerate(ears):
+        if not np.isnan(ear): closed = not ear > FLOW_EAR_OPEN if closed else ear < FLOW_EAR_CLOSE
+        detected[i] = closed
+    windows = [(int(start * fps), int(np.ceil((start + duration_ms / 1000.0) * fps)) + 1) for start, duration_ms in blinks]
+    hits = sum(bool(detected[s:e].any()) for s, e in windows)
+    onsets = np.flatnonzero(np.diff(np.concatenate(([False], detected)).astype(np.int8)) == 1)
+    false_fires = sum(1 for i in onsets if not any(s <= i < e for s, e in windows))
+    return hits, len(windows), false_fires
+
+
+def run_flow_mode(frames, interval, use_flow):
+    h, w = frames[0].shape[:2]
+    mesh = mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    flow = EyeFlowTracker() if use_flow else None
+    ears = np.full(len(frames), np.nan)
+    inference_cpu = flow_cpu = 0.0
+    try:
+        for i, frame in enumerate(frames):
+            if i % interval == 0:
+                c0 = time.process_time()
+                results = mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                if not results.multi_face_landmarks:
+                    if flow is not None: flow.reset()
+                    inference_cpu += time.process_time() - c0; continue
+                points = faces_eye_points(results.multi_face_landmarks, w, h)[0]
+                ears[i] = batch_calculate_ear(points).min()
+                inference_cpu += time.process_time() - c0
+                if flow is not None:
+                    c0 = time.process_time(); flow.anchor(frame, points); flow_cpu += time.process_time() - c0
+            elif flow is not None:
+                c0 = time.process_time()
+                points = flow.propagate(frame)
+                if points is not None: ears[i] = batch_calculate_ear(points).min()
+                flow_cpu += time.process_time() - c0
+    finally:
+        mesh.close()
+    n = len(frames)
+    return ears, inference_cpu / n * 1000, flow_cpu / n * 1000, (flow.propagated, flow.lost) if flow else (0, 0)
+
+
+def bench_flow(intervals=FLOW_INTERVALS):
+    frames, _ = flow_sequence()
+    reference, ref_cpu, _, _ = run_flow_mode(frames, 1, False)
+    rows = [("1", reference, ref_cpu, 0.0, (0, 0))]
+    for interval in intervals:
+        for use_flow in (False, True):
+            ears, inference_ms, flow_ms, stats = run_flow_mode(frames, interval, use_flow)
+            rows.append((f"{interval}{' + Fluss' if use_flow else ''}", ears, inference_ms, flow_ms, stats))
+    report = []
+    for label, ears, inference_ms, flow_ms, (propagated, lost) in rows:
+        hits, episodes, false_fires = count_blinks(ears)
+        valid = ~np.isnan(ears) & ~np.isnan(reference)
+        mae = float(np.abs(ears[valid] - reference[valid]).mean()) if valid.any() else float('nan')
+        report.append((label, hits, episodes, false_fires, float(valid.mean()), mae, inference_ms, flow_ms, propagated, lost))
+    return report
+
+
+def report_flow(iterations):
+    print(f"Lidpunkt-Propagation per Lucas-Kanade zwischen FaceMesh-Läufen ({FLOW_SIZE[0]}x{FLOW_SIZE[1]} @{FLOW_FPS} FPS, "
+          f"{len(FLOW_BLINKS_MS)} Blinzler {min(d for _, d in FLOW_BLINKS_MS)}-{max(d for _, d in FLOW_BLINKS_MS)} ms, Kopfbewegung, Rauschen)")
+    print(f"{'Intervall':>11} | {'Blinzler':>8} | {'Fehlausl.':>9} | {'EAR/Frame':>9} | {'MAE ggü. 1':>10} | {'CPU FaceMesh':>12} | {'CPU Fluss':>9} | {'verloren':>8}")
+    for label, hits, episodes, false_fires, coverage, mae, inference_ms, flow_ms, propagated, lost in bench_flow():
+        print(f"{label:>11} | {hits:>4}/{episodes:<3} | {false_fires:>9} | {coverage * 100:8.0f}% | {mae:10.4f} | {inference_ms:9.2f} ms | {flow_ms:6.2f} ms | {lost:>8}")
+
+
+class BlockingCapture:
+    def __init__(self, fps):
+        self.period = 1.0 / fps
+        self.opened = True
+
+    def isOpened(self): return self.opened
+
+    def read(self):
+        time.sleep(self.period)
+        return True, None
+
+    def release(self):
+        self.opened = False
+
+
+def bench_camera_stop(trials=20, fps=30):
+    def legacy_trial():
+        lock, state = threading.Lock(), {'cap': BlockingCapture(fps), 'running': True}
+        def worker():
+            while state['running']:
+                with lock:
+                    if state['cap'] is None: break
+                    state['cap'].read()
+        thread = threading.Thread(target=worker, daemon=True); thread.start()
+        time.sleep(random.uniform(0.05, 0.15))
+        t0 = time.perf_counter()
+        state['running'] = False
+        with lock:
+            state['cap'].release(); state['cap'] = None
+        stall = time.perf_counter() - t0
+        thread.join()
+        return stall
+
+    def channel_trial():
+        channel, state = CaptureChannel(), {'running': True}
+        def worker():
+            cap = BlockingCapture(fps)
+            try:
+                while state['running']:
+                    if any(command == CAPTURE_CMD_STOP for command, _ in channel.pending()): break
+                    cap.read()
+            finally:
+                cap.release()
+        thread = threading.Thread(target=worker, daemon=True); thread.start()
+        time.sleep(random.uniform(0.05, 0.15))
+        t0 = time.perf_counter()
+        state['running'] = False
+        channel.stop()
+        stall = time.perf_counter() - t0
+        thread.join()
+        return stall
+
+    legacy = np.array([legacy_trial() for _ in range(trials)]) * 1000.0
+    channel = np.array([channel_trial() for _ in range(trials)]) * 1000.0
+    return legacy, channel
+
+
+def report_camera_stop(iterations):
+    fps = 30
+    legacy, channel = bench_camera_stop(fps=fps)
+    print(f"GUI-Blockade beim Stopp einer Kamera mit blockierendem read() ({fps} FPS, {len(legacy)} Versuche)")
+    print(f"  camera_lock (alt):      Median {np.median(legacy):8.3f} ms, max {legacy.max():8.3f} ms")
+    print(f"  CaptureChannel (neu):   Median {np.median(channel):8.3f} ms, max {channel.max():8.3f} ms")
+
+
+def bench_lifecycle(cycles=5, fps=30):
+    def start_worker(state, channel):
+        def worker():
+            cap = BlockingCapture(fps)
+            time.sleep(0.2)
+            try:
+                while state['running']:
+                    if any(command == CAPTURE_CMD_STOP for command, _ in channel.pending()): break
+                    cap.read()
+            finally:
+                time.sleep(0.1)
+                cap.release()
+        thread = threading.Thread(target=worker, daemon=True); thread.start()
+        return thread
+
+    def legacy_start(ctx):
+        time.sleep(0.5)
+        ctx['state'] = {'running': True}; ctx['channel'] = CaptureChannel()
+        ctx['thread'] = start_worker(ctx['state'], ctx['channel'])
+
+    def legacy_stop(ctx):
+        ctx['state']['running'] = False; ctx['channel'].stop()
+        ctx['thread'].join(timeout=3.5)
+
+    def ui_loop(actions):
+        interval = UI_STALL_PROBE_MS / 1000.0
+        worst, last = 0.0, time.monotonic()
+        for due, action in actions:
+            while time.monotonic() < due:
+                time.sleep(interval)
+                now = time.monotonic(); worst = max(worst, now - last - interval); last = now
+            action()
+            now = time.monotonic(); worst = max(worst, now - last - interval); last = now
+        end = time.monotonic() + 1.0
+        while time.monotonic() < end:
+            time.sleep(interval)
+            now = time.monotonic(); worst = max(worst, now - last - interval); last = now
+        return worst
+
+    def schedule(start, stop):
+        t0 = time.monotonic() + 0.1
+        actions = []
+        for i in range(cycles):
+            actions.append((t0 + i * 1.5, start)); actions.append((t0 + i * 1.5 + 0.9, stop))
+        return actions
+
+    ctx = {}
+    legacy = ui_loop(schedule(lambda: legacy_start(ctx), lambda: legacy_stop(ctx)))
+
+    controller, ctx = LifecycleController(), {}
+    controller.register('start', lambda: legacy_start(ctx))
+    controller.register('stop', lambda: legacy_stop(ctx))
+    controller.register(LIFECYCLE_CMD_CLOSE, lambda: None)
+    controller.start()
+    queued = ui_loop(schedule(lambda: controller.submit('start'), lambda: controller.submit('stop')))
+    controller.submit(LIFECYCLE_CMD_CLOSE); controller.closed.wait(5.0)
+    return legacy, queued
+
+
+def report_lifecycle(iterations):
+    legacy, queued = bench_lifecycle()
+    print(f"Größte UI-Blockade bei Start/Stopp-Zyklen (Tk-ähnliche Schleife, Takt {UI_STALL_PROBE_MS} ms)")
+    print(f"  sleep/join im UI-Thread (alt): {legacy * 1000:8.1f} ms")
+    print(f"  LifecycleController (neu):     {queued * 1000:8.1f} ms")
+
+
+def report_capability(iterations):
+    t0 = time.perf_counter()
+    costs = measure_capability()
+    elapsed = time.perf_counter() - t0
+    print(f"Leistungstest für die Standardeinstellungen ({elapsed:.2f} s inkl. Laden von FaceMesh)")
+    print(f"{'Aufnahme':>10} | {'Inferenz (ms)':>13} | {'Overlay (ms)':>12} | {'Vorschau (ms)':>13} | {'CPU Inferenz':>12}")
+    for (w, h), cost in costs.items():
+        print(f"{f'{w}x{h}':>10} | {cost.inference_ms:13.2f} | {cost.overlay_ms:12.2f} | {cost.preview_ms:13.2f} | {cost.inference_cpu_ms:9.2f} ms")
+    for budget in (DEFAULT_CPU_BUDGET_PERCENT, 0):
+        choice = choose_capability_settings(costs, budget)
+        print(f"  CPU-Budget {f'{budget}%' if budget else 'aus':>4}: {choice.width}x{choice.height} @{choice.fps}FPS, Intervall {choice.process_interval} "
+              f"({choice.frame_ms:.1f} ms pro Frame, CPU {choice.cpu_percent:.0f}%{'' if choice.fits else ', über Budget'})")
+
+
+REPORTS = {
+    'mirror': report_mirror,
+    'pacing': report_pacing,
+    'camera-stop': report_camera_stop,
+    'lifecycle': report_lifecycle,
+    'inference': report_inference,
+    'flow': report_flow,
+    'capability': report_capability,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mikrobenchmarks für den Tracking-Hot-Path (ohne Kamera/Display).")
+    parser.add_argument("--iterations", type=int, default=200, help="Messungen pro Benchmark")
+    parser.add_argument("--filter", default=None, help="Nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--save-baseline", nargs='?', const=DEFAULT_BASELINE_FILE, default=None, metavar="DATEI", help="Ergebnisse als Baseline speichern")
+    parser.add_argument("--compare", nargs='?', const=DEFAULT_BASELINE_FILE, default=None, metavar="DATEI", help="Mit Baseline vergleichen, Exit-Code 1 bei Regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT, help="Erlaubte Verschlechterung in Prozent")
+    parser.add_argument("--report", choices=sorted(REPORTS), action='append', default=[], help="Zusätzlichen Vergleichsbericht ausgeben")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    if args.report:
+        for name in args.report:
+            REPORTS[name](args.iterations); print()
+        if not (args.save_baseline or args.compare): return 0
+
+    print(f"Benchmark-Suite ({args.iterations} Messungen, Median pro Aufruf)")
+    results = run_suite(args.iterations, args.filter)
+    if args.save_baseline: save_baseline(args.save_baseline, results)
+    if args.compare and not compare_with_baseline(args.compare, results, args.threshold): return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
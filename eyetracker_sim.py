@@ -0,0 +1,353 @@
+import argparse
+import csv
+import logging
+import sys
+import time
+
+import numpy as np
+
+from LockdownEyetracker import (
+    BlinkStateMachine, NullActuator, RecordingActuator, LinuxInputActuator, EVDEV_AVAILABLE,
+    ACTUATOR_KEYS, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN, BLINK_MIN_CLOSED_MS, BLINK_MIN_OPEN_MS, BLINK_DEBOUNCE_MS,
+    PREDICT_HORIZON_MS, TrackerMetrics,
+)
+
+EAR_OPEN_LEVEL = 0.30
+EAR_CLOSED_LEVEL = 0.10
+SEGMENTS = ('open', 'left', 'right', 'both', 'lost')
+SIM_FPS = 30.0
+COMPARE_RATES = (15.0, 30.0, 60.0)
+BLINK_KINDS = ('both', 'left', 'right', 'partial')
+EXPECTED_KEYS = {'both': 'x', 'left': 'x', 'right': 'c', 'partial': None}
+
+
+def scripted_sequence(steps, seed=0, noise=0.01, min_len=2, max_len=12):
+    rng = np.random.default_rng(seed)
+    ears = np.empty((steps, 2), dtype=np.float64)
+    face = np.ones(steps, dtype=bool)
+    i = 0
+    while i < steps:
+        kind = SEGMENTS[rng.integers(len(SEGMENTS))]
+        n = min(steps - i, int(rng.integers(min_len, max_len + 1)))
+        left = EAR_CLOSED_LEVEL if kind in ('left', 'both') else EAR_OPEN_LEVEL
+        right = EAR_CLOSED_LEVEL if kind in ('right', 'both') else EAR_OPEN_LEVEL
+        ears[i:i + n] = (left, right)
+        if kind == 'lost': face[i:i + n] = False
+        i += n
+    ears += rng.normal(0.0, noise, size=ears.shape)
+    return ears, face
+
+
+class SimClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+
+def timed_scenario(duration_s, seed=0, min_s=0.15, max_s=0.6):
+    rng = np.random.default_rng(seed)
+    segments, t = [], 0.0
+    while t < duration_s:
+        length = float(rng.uniform(min_s, max_s))
+        segments.append((t, SEGMENTS[rng.integers(len(SEGMENTS))]))
+        t += length
+    return segments, duration_s
+
+
+def sample_scenario(segments, duration_s, fps, seed=0, noise=0.01):
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, duration_s, 1.0 / fps)
+    starts = np.array([start for start, _ in segments])
+    kinds = [segments[i][1] for i in np.searchsorted(starts, times, side='right') - 1]
+    ears = np.array([(EAR_CLOSED_LEVEL if k in ('left', 'both') else EAR_OPEN_LEVEL,
+                      EAR_CLOSED_LEVEL if k in ('right', 'both') else EAR_OPEN_LEVEL) for k in kinds])
+    ears += rng.normal(0.0, noise, size=ears.shape)
+    return times, ears, np.array([k != 'lost' for k in kinds])
+
+
+def load_replay(path):
+    times, ears, face = [], [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            times.append(float(row['time_s']))
+            has_face = row['face'] == '1' and row['left_ear'] != '' and row['right_ear'] != ''
+            face.append(has_face)
+            ears.append((float(row['left_ear']), float(row['right_ear'])) if has_face else (0.0, 0.0))
+    return np.array(times), np.array(ears, dtype=np.float64).reshape(-1, 2), np.array(face, dtype=bool)
+
+
+def drive(machine, ears, face, on_step=None, times=None, fps=SIM_FPS, clock=None):
+    for i in range(len(ears)):
+        now = float(times[i]) if times is not None else i / fps
+        if clock is not None: clock.now = now
+        machine.set_face_detected(bool(face[i]))
+        if face[i]: machine.update(ears[i, 0], ears[i, 1], now)
+        else: machine.tick(now)
+        if on_step is not None: on_step(i)
+    machine.release_keys("Simulation Ende")
+
+
+def key_timeline(times, ears, face, timing_ms):
+    clock = SimClock()
+    recorder = RecordingActuator(NullActuator(), clock=clock)
+    min_closed_ms, min_open_ms, debounce_ms = timing_ms
+    machine = BlinkStateMachine(recorder, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN,
+                                min_closed_ms=min_closed_ms, min_open_ms=min_open_ms, debounce_ms=debounce_ms)
+    drive(machine, ears, face, times=times, clock=clock)
+    return [(t, key) for t, action, key in recorder.events if action == 'down']
+
+
+def compare_frame_rates(segments, duration_s, timing_ms, rates=COMPARE_RATES, seed=0):
+    timelines = {fps: key_timeline(*sample_scenario(segments, duration_s, fps, seed=seed), timing_ms) for fps in rates}
+    ref_fps = max(rates)
+    reference = timelines[ref_fps]
+    results = []
+    for fps in rates:
+        timeline = timelines[fps]
+        same = [key for _, key in timeline] == [key for _, key in reference]
+        deltas = np.array([t - t_ref for (t, _), (t_ref, _) in zip(timeline, reference)]) if same and timeline else np.zeros(0)
+        tolerance = 1.0 / fps + 1.0 / ref_fps
+        ok = same and (deltas.size == 0 or float(np.abs(deltas).max()) <= tolerance + 1e-9)
+        results.append((fps, len(timeline), same, deltas, tolerance, ok))
+    return results
+
+
+def blink_curve(t, start, close_s, hold_s, open_s, high, low):
+    closing = np.clip((t - start) / close_s, 0.0, 1.0)
+    opening = np.clip((t - start - close_s - hold_s) / open_s, 0.0, 1.0)
+    depth = 0.5 - 0.5 * np.cos(np.pi * closing) - (0.5 - 0.5 * np.cos(np.pi * opening))
+    return high - (high - low) * depth
+
+
+def natural_blinks(count, seed=0, resolution_s=0.001):
+    rng = np.random.default_rng(seed)
+    events, t = [], 0.3
+    for _ in range(count):
+        kind = BLINK_KINDS[rng.integers(len(BLINK_KINDS))]
+        close_s, hold_s, open_s = rng.uniform(0.06, 0.10), rng.uniform(0.06, 0.20), rng.uniform(0.10, 0.16)
+        low = rng.uniform(0.19, 0.23) if kind == 'partial' else rng.uniform(0.06, 0.10)
+        events.append((t, kind, close_s, hold_s, open_s, low))
+        t += close_s + hold_s + open_s + rng.uniform(0.3, 0.8)
+    fine_t = np.arange(0.0, t, resolution_s)
+    ears = np.full((len(fine_t), 2), EAR_OPEN_LEVEL)
+    for start, kind, close_s, hold_s, open_s, low in events:
+        window = (fine_t >= start) & (fine_t <= start + close_s + hold_s + open_s)
+        curve = blink_curve(fine_t[window], start, close_s, hold_s, open_s, EAR_OPEN_LEVEL, low)
+        if kind != 'right': ears[window, 0] = np.minimum(ears[window, 0], curve)
+        if kind != 'left': ears[window, 1] = np.minimum(ears[window, 1], curve)
+    return fine_t, ears, events
+
+
+def threshold_crossing(fine_t, ears, event):
+    start, kind, close_s, hold_s, open_s, _ = event
+    eye = 1 if kind == 'right' else 0
+    window = (fine_t >= start) & (fine_t <= start + close_s + hold_s)
+    below = np.flatnonzero(ears[window, eye] < DEFAULT_EAR_CLOSE)
+    return float(fine_t[window][below[0]]) if below.size else None
+
+
+def onset_latencies(fine_t, fine_ears, events, fps, predict_ms, seed=0, noise=0.004):
+    rng = np.random.default_rng(seed)
+    step = max(1, int(round(1.0 / (fps * (fine_t[1] - fine_t[0])))))
+    offset = int(rng.integers(step))
+    times, ears = fine_t[offset::step], fine_ears[offset::step] + rng.normal(0.0, noise, size=fine_ears[offset::step].shape)
+    clock, metrics = SimClock(), TrackerMetrics()
+    recorder = RecordingActuator(NullActuator(), clock=clock)
+    machine = BlinkStateMachine(recorder, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN, metrics=metrics, predict_ms=predict_ms)
+    drive(machine, ears, np.ones(len(times), dtype=bool), times=times, clock=clock)
+    downs = [(t, key) for t, action, key in recorder.events if action == 'down']
+    latencies, false_fires, wrong_keys, missed = [], 0, 0, 0
+    for start, kind, close_s, hold_s, open_s, low in events:
+        end = start + close_s + hold_s + open_s
+        first = next(((t, key) for t, key in downs if start <= t <= end), None)
+        if kind == 'partial':
+            false_fires += first is not None
+            continue
+        if first is None: missed += 1; continue
+        wrong_keys += first[1] != EXPECTED_KEYS[kind]
+        latencies.append(first[0] - threshold_crossing(fine_t, fine_ears, (start, kind, close_s, hold_s, open_s, low)))
+    return np.array(latencies), false_fires, wrong_keys, missed, metrics.predicted_false_fires
+
+
+def compare_prediction(count, rates, predict_ms, seed=0):
+    fine_t, fine_ears, events = natural_blinks(count, seed=seed)
+    partial = sum(1 for e in events if e[1] == 'partial')
+    rows = []
+    for fps in rates:
+        base = onset_latencies(fine_t, fine_ears, events, fps, 0, seed=seed)
+        pred = onset_latencies(fine_t, fine_ears, events, fps, predict_ms, seed=seed)
+        rows.append((fps, base, pred))
+    return len(events) - partial, partial, rows
+
+
+def slow_blink(creep_s, start=0.3, resolution_s=0.001):
+    fine_t = np.arange(0.0, start + creep_s + 0.8, resolution_s)
+    t = fine_t - start
+    drop = blink_curve(t, 0.0, 0.05, 1.0, 1.0, 0.0, 0.105)
+    creep = 0.03 * np.clip((t - 0.05) / creep_s, 0.0, 1.0)
+    close = blink_curve(t, 0.05 + creep_s, 0.04, 0.12, 0.12, 0.0, 0.08)
+    reopen = blink_curve(t, 0.21 + creep_s, 0.12, 1.0, 1.0, 1.0, 0.0)
+    ears = np.full((len(fine_t), 2), EAR_OPEN_LEVEL)
+    ears[:, 0] -= (drop + creep) * reopen + close
+    crossing = float(fine_t[np.argmax(ears[:, 0] < DEFAULT_EAR_CLOSE)])
+    return fine_t, ears, crossing
+
+
+def check_slow_blinks(rates, predict_ms, creeps=(0.10, 0.15, 0.20)):
+    results = []
+    for fps in rates:
+        double, extra = 0, 0.0
+        for creep_s in creeps:
+            fine_t, fine_ears, crossing = slow_blink(creep_s)
+            step = max(1, int(round(1.0 / (fps * (fine_t[1] - fine_t[0])))))
+            for offset in range(step):
+                times, ears = fine_t[offset::step], fine_ears[offset::step]
+                firsts = []
+                for horizon in (0, predict_ms):
+                    clock = SimClock()
+                    recorder = RecordingActuator(NullActuator(), clock=clock)
+                    machine = BlinkStateMachine(recorder, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN, predict_ms=horizon)
+                    drive(machine, ears, np.ones(len(times), dtype=bool), times=times, clock=clock)
+                    downs = [t for t, action, key in recorder.events if action == 'down']
+                    firsts.append(downs[-1] - crossing if downs else float('inf'))
+                double += len(downs) != 1
+                extra = max(extra, firsts[1] - firsts[0])
+        results.append((fps, double, extra, double == 0 and extra <= 1e-9))
+    return results
+
+
+def check_invariants(ears, face):
+    recorder = RecordingActuator(NullActuator())
+    machine = BlinkStateMachine(recorder, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN)
+    violations = []
+
+    def on_step(i):
+        if machine.x_key_down != ('x' in recorder.held) or machine.c_key_down != ('c' in recorder.held):
+            violations.append(f"Schritt {i}: Zustand (x={machine.x_key_down}, c={machine.c_key_down}) != gehalten {sorted(recorder.held)}")
+        if not face[i] and recorder.held:
+            violations.append(f"Schritt {i}: Gesicht verloren, aber gehalten {sorted(recorder.held)}")
+        if face[i] and not machine.left_closed and not machine.right_closed and recorder.held:
+            violations.append(f"Schritt {i}: Beide Augen offen, aber gehalten {sorted(recorder.held)}")
+
+    drive(machine, ears, face, on_step)
+
+    held = set()
+    last_t = float('-inf')
+    for n, (t, action, key) in enumerate(recorder.events):
+        if t < last_t: violations.append(f"Ereignis {n}: Zeitstempel nicht monoton")
+        last_t = t
+        if action not in ('down', 'up'): continue
+        if key not in ACTUATOR_KEYS: violations.append(f"Ereignis {n}: unerwartete Taste '{key}'")
+        if action == 'down':
+            if key in held: violations.append(f"Ereignis {n}: '{key}' doppelt gedrückt")
+            held.add(key)
+        else:
+            if key not in held: violations.append(f"Ereignis {n}: '{key}' losgelassen ohne Drücken")
+            held.discard(key)
+    if held: violations.append(f"Hängende Tasten am Ende: {sorted(held)}")
+    if recorder.held: violations.append(f"Backend meldet hängende Tasten: {sorted(recorder.held)}")
+    return len(recorder.events), violations
+
+
+def time_drive(actuator, ears, face, repeats=3):
+    best = float('inf')
+    events = 0
+    for _ in range(repeats):
+        counter = RecordingActuator(actuator, clock=lambda: 0.0)
+        machine = BlinkStateMachine(counter, DEFAULT_EAR_CLOSE, DEFAULT_EAR_OPEN)
+        t0 = time.perf_counter()
+        drive(machine, ears, face)
+        best = min(best, time.perf_counter() - t0)
+        events = len(counter.events)
+    return best, events
+
+
+def time_actuator_calls(actuator, calls=20000):
+    t0 = time.perf_counter()
+    for _ in range(calls // 2):
+        actuator.keyDown('x'); actuator.keyUp('x')
+    return (time.perf_counter() - t0) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation der Blinzel-Zustandsmaschine mit skriptbaren EAR-Sequenzen.")
+    parser.add_argument("--steps", type=int, default=50000, help="Frames pro Sequenz")
+    parser.add_argument("--seeds", type=int, default=5, help="Anzahl zufälliger Sequenzen")
+    parser.add_argument("--uinput", action="store_true", help="Overhead zusätzlich mit echtem uinput-Gerät messen (Linux, evdev)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Dauer des zeitbasierten Szenarios für den FPS-Vergleich (s)")
+    parser.add_argument("--min-closed-ms", type=float, default=BLINK_MIN_CLOSED_MS)
+    parser.add_argument("--min-open-ms", type=float, default=BLINK_MIN_OPEN_MS)
+    parser.add_argument("--debounce-ms", type=float, default=BLINK_DEBOUNCE_MS)
+    parser.add_argument("--predict-ms", type=float, default=PREDICT_HORIZON_MS, help="Vorhersagehorizont für den Vergleich Schwelle vs. Vorhersage (ms)")
+    parser.add_argument("--blinks", type=int, default=400, help="Anzahl natürlicher Blinzel-/Zwinker-Ereignisse im Vorhersage-Vergleich")
+    parser.add_argument("--replay", nargs='+', default=[], help=".ear.csv-Dateien aus eyetracker_batch.py zusätzlich mit 15/30/60 FPS abspielen")
+    args = parser.parse_args()
+    timing_ms = (args.min_closed_ms, args.min_open_ms, args.debounce_ms)
+
+    logging.disable(logging.CRITICAL)
+
+    failed = False
+    print(f"Invarianten ({args.seeds} Sequenzen à {args.steps} Frames)")
+    for seed in range(args.seeds):
+        ears, face = scripted_sequence(args.steps, seed=seed)
+        events, violations = check_invariants(ears, face)
+        status = "ok" if not violations else f"{len(violations)} Verletzungen"
+        print(f"  Seed {seed}: {events} Tastenereignisse, {status}")
+        for v in violations[:5]: print(f"    {v}")
+        failed |= bool(violations)
+
+    print(f"\nFPS-Unabhängigkeit ({args.duration:.0f} s Szenario, Mindestdauer zu/offen {args.min_closed_ms:.0f}/{args.min_open_ms:.0f} ms, Entprellung {args.debounce_ms:.0f} ms)")
+    for seed in range(args.seeds):
+        segments, duration_s = timed_scenario(args.duration, seed=seed)
+        for fps, count, same, deltas, tolerance, ok in compare_frame_rates(segments, duration_s, timing_ms, seed=seed):
+            offset = f"Versatz zu {max(COMPARE_RATES):.0f} FPS Median {np.median(deltas) * 1000:6.1f} ms, max {np.abs(deltas).max() * 1000:6.1f} ms (Toleranz {tolerance * 1000:.0f} ms)" if deltas.size else ""
+            print(f"  Seed {seed} @{fps:4.0f} FPS: {count:4d} Tastendrücke, {'gleiche Folge' if same else 'ABWEICHENDE Folge'}, {offset}")
+            failed |= not ok
+
+    closures, partial, rows = compare_prediction(args.blinks, COMPARE_RATES, args.predict_ms)
+    print(f"\nVorhersage ({closures} Schließungen, {partial} Beinahe-Schließungen, Horizont {args.predict_ms:.0f} ms, Latenz ab Schwellwert-Unterschreitung)")
+    for fps, base, pred in rows:
+        (b_lat, b_ff, b_wrong, b_miss, _), (p_lat, p_ff, p_wrong, p_miss, p_rejected) = base, pred
+        print(f"  @{fps:4.0f} FPS  Schwelle:  Median {np.median(b_lat) * 1000:6.1f} ms, p90 {np.percentile(b_lat, 90) * 1000:6.1f} ms, Fehlauslösungen {b_ff}, falsche Taste {b_wrong}, verpasst {b_miss}")
+        print(f"             Vorhersage: Median {np.median(p_lat) * 1000:6.1f} ms, p90 {np.percentile(p_lat, 90) * 1000:6.1f} ms, Fehlauslösungen {p_ff}, falsche Taste {p_wrong}, verpasst {p_miss}, verworfen {p_rejected}")
+        print(f"             Gewinn {(np.median(b_lat) - np.median(p_lat)) * 1000:5.1f} ms (Median)")
+
+    print(f"\nLangsames Schließen (Vorhersage {args.predict_ms:.0f} ms, letzter Tastendruck ggü. Schwelle)")
+    for fps, double, extra, ok in check_slow_blinks(COMPARE_RATES, args.predict_ms):
+        print(f"  @{fps:4.0f} FPS: {double} Mehrfachauslösungen, Mehrlatenz max {extra * 1000:5.1f} ms, {'ok' if ok else 'FEHLER'}")
+        failed |= not ok
+
+    for path in args.replay:
+        times, ears_rec, face_rec = load_replay(path)
+        print(f"\nReplay {path} ({len(times)} Frames)")
+        src_fps = (len(times) - 1) / max(1e-9, times[-1] - times[0]) if len(times) > 1 else SIM_FPS
+        reference = [k for _, k in key_timeline(times, ears_rec, face_rec, timing_ms)]
+        for fps in COMPARE_RATES:
+            step = max(1, int(round(src_fps / fps)))
+            timeline = key_timeline(times[::step], ears_rec[::step], face_rec[::step], timing_ms)
+            same = [k for _, k in timeline] == reference
+            print(f"  @{src_fps / step:5.1f} FPS: {len(timeline)} Tastendrücke, {'gleiche Folge' if same else 'abweichende Folge'} wie Quelle @{src_fps:.1f} FPS")
+
+    ears, face = scripted_sequence(args.steps, seed=0)
+    backends = [('null', NullActuator()), ('recording', RecordingActuator())]
+    if args.uinput:
+        if EVDEV_AVAILABLE:
+            try: backends.append(('uinput', LinuxInputActuator()))
+            except Exception as e: print(f"uinput nicht nutzbar: {e}")
+        else:
+            print("evdev nicht installiert, uinput wird übersprungen.")
+
+    print("\nDurchsatz und Overhead")
+    time_drive(NullActuator(), ears, face, repeats=1)
+    base_s, _ = time_drive(NullActuator(), ears, face, repeats=5)
+    for name, actuator in backends:
+        elapsed, events = (base_s, 0) if name == 'null' else time_drive(actuator, ears, face, repeats=5)
+        per_call = time_actuator_calls(actuator)
+        extra = "" if name == 'null' else f", Mehraufwand ggü. null {max(0.0, elapsed - base_s) / max(1, events) * 1e6:7.3f} µs/Ereignis"
+        print(f"  {name:<10} {len(ears) / elapsed:12.0f} Schritte/s, {per_call * 1e6:7.3f} µs/Aufruf{extra}")
+        actuator.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())